@@ -3,29 +3,44 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import pygame
-from dotenv import load_dotenv
-from helper.load_img import LoadImage
+from functools import lru_cache
+from helper.load_img import images, scale_image
+from helper.game_clock import real_clock
+from helper.settings import game_settings
+from agents.judgement import MISS
 
-# loading width and height of pygame and game difficulty from .env
-load_dotenv()
-WIDTH = int(os.getenv("WIDTH", 400))
-HEIGHT = int(os.getenv("HEIGHT", 600))
-GAME_DIFFICULTY = os.getenv("GAME_DIFFICULTY", "easy").lower() # directly influences the speed of the arrow
+# width and height of the arrow sprites in pixels, and the number of pixels the BW arrows grow by when they show a judgement
+ARROW_SIZE = 50
+JUDGED_GROWTH = 2
 
-# dictionary storing the difficulty levels and corresponding arrow speeds
-difficulty_speeds = {
-    "easy": 3,
-    "medium": 3.5,
-    "hard": 4,
-    "extreme": 5
-}
+# width of the tail drawn below the arrow of a hold note, and the alpha value it is drawn with
+HOLD_TAIL_WIDTH = 16
+HOLD_TAIL_ALPHA = 160
 
-ARROW_SPEED = difficulty_speeds[GAME_DIFFICULTY]
 
+@lru_cache(maxsize=64)
+def hold_image(image, tail_length: int):
+    """
+    This function creates the sprite of a hold note: the arrow with a tail below it that is tail_length pixels long. The tail has the average colour of the arrow.
+
+    The sprites are cached, as every hold note of the same lane, owner and length shares the same sprite.
+
+    Args:
+        image (Surface): the scaled sprite of the arrow
+        tail_length (int): length of the tail in pixels
+
+    Returns:
+        Surface of the arrow with its tail
+    """
+    width, height = image.get_size()
+    surface = pygame.Surface((width, height + tail_length), pygame.SRCALPHA)
+
+    # drawing the tail from the middle of the arrow down, so that the arrow is drawn over its top end
+    tail_colour = pygame.transform.average_color(image, consider_alpha=True)[:3] + (HOLD_TAIL_ALPHA,)
+    surface.fill(tail_colour, pygame.Rect((width - HOLD_TAIL_WIDTH) // 2, height // 2, HOLD_TAIL_WIDTH, height // 2 + tail_length))
+    surface.blit(image, (0, 0))
+    return surface
 
-# loading in images
-images = LoadImage()
-images.load_images()
 
 class Arrow(pygame.sprite.Sprite):
     """
@@ -36,47 +51,231 @@ class Arrow(pygame.sprite.Sprite):
     Args:
         centerx (float): This is a float determing the center x coordinate of the arrow sprite
         image (Surface): This is a pygame surface that determines the sprite of the arrow
+        arrow_dir (str): This is a string determining the direction of the arrow
+        spawn_time (float | None): This is the timestamp at which the arrow was sent out. The current timestamp of the clock is used if None.
+        clock (GameClock): This is the clock used to obtain the current timestamp
+        hold (int): This is the number of milliseconds the arrow key should be held down for, or 0 for a single tap
+        pool (ArrowPool | None): This is the pool the arrow is returned to once it is killed, if any
+        settings (GameSettings): This is the settings of the game difficulty, which determine the speed of the arrow and the height of the display it travels up
+        size (int): This is the width and height of the arrow sprite in pixels, which is smaller when the lanes are too narrow for ARROW_SIZE
+
+    The arrow of a hold note has a tail below it, which reaches the BW arrow hold milliseconds after the arrow itself. The image and rect include the tail, while y is always the bottom of the arrow.
 
     Attributes:
         image (Surface): Pygame Surface that is the arrow sprite image
         rect (Rect): Pygame Rect object that is converted from the arrow sprite image
-        speedy (int): Integer determining the speed of the arrow as it ascends in the screen
+        speedy (float): Float determining the speed of the arrow in pixels per second as it ascends in the screen
+        travel_time (float): milliseconds the arrow takes from being sent out to reaching its BW arrow
+        size (int): width and height of the arrow sprite in pixels
         arrow_dir (Surface): Pygame Surface determining the direction of the arrow. This is used to determine what to do with the sprite in the game. 
+        clock (GameClock): clock used to obtain the current timestamp
+        spawn_time (float): timestamp at which the arrow was sent out
+        start_y (float): bottom y coordinate of the arrow at spawn_time, 10 pixels above the bottom of the display
+        y (float): exact bottom y coordinate of the arrow. rect.bottom is this value rounded to the nearest pixel, plus the length of the tail.
+        hold (int): number of milliseconds the arrow key should be held down for, or 0 for a single tap
+        tail_length (int): length of the tail of a hold note in pixels, or 0 for a single tap
+        hit_time (float): timestamp at which the arrow reaches its BW arrow, which key presses are judged against
+        exit_time (float): timestamp at which the end of the tail leaves the top of the screen
+        hold_end (float): timestamp at which the end of the tail reaches the BW arrow. For a single tap, this is the same as hit_time.
+        judgement (str | None): the judgement the arrow has been hit with, or None if it has not been hit
+        pool (ArrowPool | None): the pool the arrow is returned to once it is killed, if any
+        in_pool (bool): boolean value indicating that the arrow is currently waiting in its pool to be reused
+        pool_key (tuple | None): tuple of the arrow direction and owner identifying the free list of the pool the arrow is returned to
+        note_index (int | None): index of the chart note the arrow was sent out for in its NoteStore, or None if it was sent out randomly
     """
 
-    def __init__(self, centerx = WIDTH/4, image = images.up_arrow_player, arrow_dir: str = "up"):
+    def __init__(self, centerx = game_settings.width/4, image = images.up_arrow_player, arrow_dir: str = "up", spawn_time: float = None, clock = real_clock, hold: int = 0, pool = None, settings = game_settings, size: int = ARROW_SIZE):
         pygame.sprite.Sprite.__init__(self)
 
-        self.image = pygame.transform.scale(image, (50, 50))
-        self.rect = self.image.get_rect()
-        self.speedy = ARROW_SPEED
+        self.speedy = settings.arrow_speed
+        self.travel_time = settings.arrow_travel_time
+        self.start_y = settings.height - 10
+        self.size = size
+        self.clock = clock
+        self.pool = pool
+        self.in_pool = False
+        self.pool_key = None
+        self.reset(centerx, image, arrow_dir, spawn_time, hold)
+
+    def reset(self, centerx: float, image, arrow_dir: str, spawn_time: float = None, hold: int = 0):
+        """
+        This method places the arrow back at the bottom of the screen as a newly sent out arrow. It is used both when the arrow is created and when it is reused from its pool.
+
+        Args:
+            centerx (float): center x coordinate of the arrow sprite
+            image (Surface): sprite of the arrow
+            arrow_dir (str): direction of the arrow
+            spawn_time (float | None): timestamp at which the arrow was sent out. The current timestamp of the clock is used if None.
+            hold (int): number of milliseconds the arrow key should be held down for, or 0 for a single tap
+
+        Returns:
+            None
+        """
+        self.image = scale_image(image, (self.size, self.size))
         self.arrow_dir = arrow_dir
+        self.hold = hold
+
+        # if statement checking if the arrow is a hold note, which is drawn with a tail the distance the arrow travels in hold milliseconds
+        self.tail_length = round(self.speedy * hold / 1000)
+        if self.tail_length:
+            self.image = hold_image(self.image, self.tail_length)
+        self.rect = self.image.get_rect()
+        self.spawn_time = spawn_time if spawn_time is not None else self.clock.get_ticks()
+        self.hit_time = self.spawn_time + self.travel_time
+        self.hold_end = self.hit_time + hold
+        self.judgement = None
+        self.note_index = None
 
         # setting the center x coordinate of the image rect to centerx input
         self.rect.centerx = centerx
 
         # setting the bottom y coordinate 
-        self.rect.bottom = HEIGHT - 10
+        self.y = self.start_y
+        self.rect.bottom = self.start_y + self.tail_length
+
+        # the arrow has left the screen once it has travelled the full height of the screen and its tail
+        self.exit_time = self.spawn_time + (self.start_y + self.tail_length) / self.speedy * 1000
+
+    def kill(self):
+        """
+        This method removes the arrow from all of its sprite groups and returns it to its pool, if it has one, to be reused.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        super().kill()
+
+        # if statement checking if the arrow belongs to a pool and has not been returned to it yet
+        if self.pool is not None and not self.in_pool:
+            self.pool.release(self)
 
     
     def update(self):
         """
         This method update() is used to update the position of the Arrow sprite when the Sprite Group updates
 
+        The position is calculated from the time passed since the arrow was sent out instead of being moved a fixed amount every frame, so the arrow moves at the same speed regardless of the frame rate.
+
         Args:
             None
         
         Returns:
             None
         """
-        # Updating the y coordinate of the image with the speed of the arrow
-        self.rect.y -= self.speedy
+        self.move(self.clock.get_ticks())
+
+    def move(self, curr_time: float):
+        """
+        This method places the arrow at its position at a given timestamp, killing it once it has left the top of the screen.
+
+        Args:
+            curr_time (float): the current timestamp
 
-        if self.rect.bottom < HEIGHT/2-self.speedy:
+        Returns:
+            None
+        """
+        # killing the arrow if it has left the screen without being handled by the game
+        if curr_time > self.exit_time:
             self.kill()
+            return
+
+        # Updating the y coordinate of the image with the distance travelled since the arrow was sent out
+        self.y = self.start_y - self.speedy * (curr_time - self.spawn_time) / 1000
+        self.rect.bottom = round(self.y) + self.tail_length
 
         
 
+class ArrowPool:
+    """
+    The ArrowPool class recycles Arrow sprites so that sending out an arrow does not need to create a new sprite.
+
+    Killed arrows are kept in a free list for their lane and owner, and are reset and handed out again the next time an arrow is sent out in the same lane by the same owner.
+
+    Args:
+        clock (GameClock): optional argument for the clock used by the arrows of the pool
+        settings (GameSettings): optional argument for the settings of the game difficulty used by the arrows of the pool
+
+    Attributes:
+        clock (GameClock): clock used by the arrows of the pool
+        settings (GameSettings): settings of the game difficulty used by the arrows of the pool
+        free_arrows (dict): dictionary mapping a tuple of the arrow direction and owner (True for the player) to the list of killed arrows waiting to be reused
+        created (int): number of arrows the pool has had to create
+        reused (int): number of times an arrow has been reused from the pool
+    """
+    def __init__(self, clock = real_clock, settings = game_settings):
+        self.clock = clock
+        self.settings = settings
+        self.free_arrows = {}
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, is_player: bool, centerx: float, image, arrow_dir: str, spawn_time: float = None, hold: int = 0, size: int = ARROW_SIZE):
+        """
+        This method hands out an arrow for the given lane and owner, reusing a killed arrow if there is one.
+
+        Args:
+            is_player (bool): boolean value indicating if the arrow is sent out for the player or for the enemy
+            centerx (float): center x coordinate of the arrow sprite
+            image (Surface): sprite of the arrow
+            arrow_dir (str): direction of the arrow
+            spawn_time (float | None): timestamp at which the arrow was sent out
+            hold (int): number of milliseconds the arrow key should be held down for, or 0 for a single tap
+            size (int): width and height of the arrow sprite in pixels. Arrows of the same lane always have the same size, so reused arrows keep theirs.
+
+        Returns:
+            Arrow placed at the bottom of the screen
+        """
+        pool_key = (arrow_dir, is_player)
+        free_arrows = self.free_arrows.get(pool_key)
+
+        # if statement checking if there is a killed arrow waiting to be reused
+        if free_arrows:
+            arrow = free_arrows.pop()
+            arrow.in_pool = False
+            arrow.reset(centerx, image, arrow_dir, spawn_time, hold)
+            self.reused += 1
+            return arrow
+
+        self.created += 1
+        arrow = Arrow(centerx, image, arrow_dir, spawn_time, self.clock, hold, pool = self, settings = self.settings, size = size)
+
+        # remembering the free list the arrow is returned to once it is killed
+        arrow.pool_key = pool_key
+        return arrow
+
+    def release(self, arrow):
+        """
+        This method takes back a killed arrow so that it can be reused.
+
+        Args:
+            arrow (Arrow): the arrow that has been killed
+
+        Returns:
+            None
+        """
+        arrow.in_pool = True
+        self.free_arrows.setdefault(arrow.pool_key, []).append(arrow)
+
+    def stats(self):
+        """
+        This method returns the statistics of the pool.
+
+        Args:
+            None
+
+        Returns:
+            dictionary of the number of arrows created, the number of times an arrow was reused and the number of arrows currently waiting in the pool
+        """
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "free": sum(len(free_arrows) for free_arrows in self.free_arrows.values())
+        }
+
+
 class ArrowBW(Arrow):
     """
     The ArrowBW class is used to store all methods unique to the ArrowBW sprite.
@@ -88,6 +287,9 @@ class ArrowBW(Arrow):
         image (Surface): This is a pygame surface that determines the sprite of the arrow
         hit_image (Surface): This is a pygame surface that determines the hit image of the arrow
         miss_image (Surface): This is a pygame surface that determines the miss image of the arrow
+        clock (GameClock): optional argument for the clock used to obtain the current timestamp
+        size (int): optional argument for the width and height of the BW arrow in pixels. It grows by JUDGED_GROWTH pixels when it shows a judgement.
+        settings (GameSettings): optional argument for the settings of the game, whose display height the BW arrow is placed in the middle of
 
     Attributes:
         idle (Surface): Pygame Surface that is the arrow sprite image
@@ -99,21 +301,25 @@ class ArrowBW(Arrow):
 
         arrow_miss (bool): determines if the arrow sprite is in "miss" status
         last_arrow_miss (int): stores the timestamp of the last arrow "miss"
+
+        judgement (str | None): the last judgement shown on the BW arrow
+
+        clock (GameClock): clock used to obtain the current timestamp
     """
-    def __init__(self, centerx = WIDTH / 4, image = images.up_arrow_bw, hit_image = images.up_arrow_hit, miss_image = images.down_arrow_miss):
-        super().__init__(centerx, image)
-        self.idle = pygame.transform.scale(image, (50, 50))
-        self.hit = pygame.transform.scale(hit_image, (52, 52))
-        self.miss = pygame.transform.scale(miss_image, (52, 52))
+    def __init__(self, centerx = game_settings.width / 4, image = images.up_arrow_bw, hit_image = images.up_arrow_hit, miss_image = images.down_arrow_miss, clock = real_clock, size: int = ARROW_SIZE, settings = game_settings):
+        super().__init__(centerx, image, clock = clock, settings = settings, size = size)
+        self.idle = scale_image(image, (size, size))
+        self.hit = scale_image(hit_image, (size + JUDGED_GROWTH, size + JUDGED_GROWTH))
+        self.miss = scale_image(miss_image, (size + JUDGED_GROWTH, size + JUDGED_GROWTH))
 
         # setting the bottom y coordinate of the image rect
-        self.rect.bottom = HEIGHT/2
+        self.rect.bottom = settings.height/2
 
         self.arrow_hit = False
-        self.last_arrow_hit = pygame.time.get_ticks()
+        self.last_arrow_hit = self.clock.get_ticks()
 
         self.arrow_miss = False
-        self.last_arrow_miss = pygame.time.get_ticks()
+        self.last_arrow_miss = self.clock.get_ticks()
     
     def update(self):
         """
@@ -128,7 +334,7 @@ class ArrowBW(Arrow):
             None
         """
         # obtaining the current time stamp
-        curr_time = pygame.time.get_ticks()
+        curr_time = self.clock.get_ticks()
 
         # if statement determining if the arrow is in "hit" status, then checking if the time difference between the current time stamp and the last arrow hit exceeds 300
         if self.arrow_hit and curr_time - self.last_arrow_hit > 300:
@@ -146,48 +352,36 @@ class ArrowBW(Arrow):
             # arrow_hit updated to false as the arrow is now in idle
             self.arrow_miss= False
     
-    def score(self):
+    def judge(self, judgement: str):
         """
-        The method score() is used to update the arrow sprite image to "hit"
+        The method judge() is used to show the judgement of an arrow on the BW arrow. The arrow sprite image changes to "hit" for any judgement of a hit, and to "miss" for a miss.
 
         Args:
-            None
+            judgement (str): the judgement, being one of the keys of JUDGEMENT_WINDOWS or MISS
 
         Returns:
             None
         """
         # obtaining the current timestamp
-        curr_time = pygame.time.get_ticks()
-
-        # setting the image of the arrow sprite to "hit"
-        self.image = self.hit
-
-        # updating arrow_hit to True as the sprite is now in "hit" status
-        self.arrow_hit = True
+        curr_time = self.clock.get_ticks()
+        self.judgement = judgement
 
-        # updating the last arrow hit to current timestamp for future reference
-        self.last_arrow_hit = curr_time
-
-    def fail(self):
-        """
-        This method is used to change the BW arrow sprite to a fail sprite, indicating a failed goal
-
-        Args:
-            None
-
-        Returns:
-            None
-        """
-        # obtaining the current timestamp
-        curr_time = pygame.time.get_ticks()
+        # if statement checking if the arrow has been missed
+        if judgement == MISS:
+            # setting the image of the arrow sprite to "miss"
+            self.image = self.miss
 
-        # setting the image of the arrow sprite to "miss"
-        self.image = self.miss
+            # updating arrow_miss to True as the sprite is now in the "miss" status
+            self.arrow_miss = True
 
-        # updating arrow_miss to True as the sprite is now in the "miss" status
-        self.arrow_miss = True
+            # updating the last arrow miss line
+            self.last_arrow_miss = curr_time
+        else:
+            # setting the image of the arrow sprite to "hit"
+            self.image = self.hit
 
-        # updating the last arrow miss line
-        self.last_arrow_miss = curr_time
+            # updating arrow_hit to True as the sprite is now in "hit" status
+            self.arrow_hit = True
 
-        
\ No newline at end of file
+            # updating the last arrow hit to current timestamp for future reference
+            self.last_arrow_hit = curr_time
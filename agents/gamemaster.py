@@ -3,57 +3,18 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import pygame
-from helper.load_img import LoadImage
 import random
-from agents.arrows import Arrow
-from dotenv import load_dotenv
-
-# initializing width and game difficiulty variables stored in .env
-load_dotenv()
-WIDTH = int(os.getenv("WIDTH", 400))
-GAME_DIFFICULTY = os.getenv("GAME_DIFFICULTY", "easy").lower() # directly influences the arrow intervals and the enemy success probability
-
-# game difficulty dict storing the arrow interval and enemy success probability
-game_difficulty = {
-            "easy": {
-                "arrow interval":  500, # arrows come in intervals of 500 milliseconds
-                "enemy success probability": 0.3 # enemy's probability of success is 1-0.3 = 0.7
-            },
-            "medium": {
-                "arrow interval":  450, # arrows come in intervals of 450 milliseconds
-                "enemy success probability": 0.2 # enemy's probability of success is 1-0.2 = 0.8
-            },
-            "hard": {
-                "arrow interval":  400, # arrows come in intervals of 400 milliseconds
-                "enemy success probability": 0.1 # enemy's probability of success is 1-0.1 = 0.9
-            },
-            "extreme": {
-                "arrow interval":  300, # arrows come in intervals of 300 milliseconds
-                "enemy success probability": 0.05 # enemy's probability of success is 1-0.05 = 0.95
-            }
-        }
-
-# obtaining the appropriate game difficulty
-difficulty_dict = game_difficulty[GAME_DIFFICULTY]
-
-# duration of a round for player/bot is set to 20 arrows
-ROUND_DURATION = difficulty_dict["arrow interval"]*20
+from agents.arrows import ArrowPool
+from agents.lanes import create_lanes
+from helper.game_clock import real_clock
+from helper.settings import game_settings
 
 # interval between each switch over, which is 2000 milliseconds
 PLAYER_INTERVAL = 2000
 
-# loading images 
-images = LoadImage()
-images.load_images()
+# number of milliseconds two durations may differ by and still be taken as equal. The simulation clock adds up ticks of 1000/60 milliseconds, so a duration of a whole number of ticks, e.g. the default arrow intervals, comes out slightly above or below its exact value depending on rounding, which would otherwise decide whether an arrow is sent out on that tick or the next.
+TIME_TOLERANCE = 1e-6
 
-# arrow dictionary containing a tuple, which contains the image sprite for player's arrow, image sprite for enemy's arrow, and x coordinate of the arrow
-# each tuple is stored based on keys for each of the 4 arrow keys.
-arrow_dict = {
-    "left": (images.left_arrow_player, images.left_arrow_enemy, WIDTH/5),
-    "right": (images.right_arrow_player, images.right_arrow_enemy, 4*WIDTH/5),
-    "up": (images.up_arrow_player, images.up_arrow_enemy, 2*WIDTH/5),
-    "down": (images.down_arrow_player, images.down_arrow_enemy, 3*WIDTH/5)
-}
 
 class GameMaster:
     """
@@ -63,16 +24,44 @@ class GameMaster:
 
     Args:
         is_player (bool): boolean value indicating if the gamemaster object is for player or for enemy. This directly influences the type of arrow being sent out.
+        clock (GameClock): optional argument for the clock used to obtain the current timestamp
+        lanes (list): optional argument for the lanes that arrows are sent out in. The default lane layout is used if None.
+        chart (NoteCursor | None): optional argument for the cursor of the chart that arrows are sent out from. Arrows are sent out randomly if None.
+        pool (ArrowPool | None): optional argument for the pool that arrows are taken from. A new pool is created if None.
+        rng (Random | None): optional argument for the random number generator used to choose arrows and decide the enemy's success. A new unseeded generator is created if None.
+        spawn_offset (float): optional argument for the number of milliseconds chart notes are sent out later by, which keeps them in time with the music on this machine
+        chart_start (float | None): optional argument for the timestamp the song started playing at, which the times of the chart are counted from so that its notes stay in time with the song. The chart only moves forward during this gamemaster's rounds if None.
+        settings (GameSettings): optional argument for the settings of the game difficulty, which determine the arrow interval, the round duration and the enemy's success probability
 
     Attributes:
-        last_arrow (int): stores the time stamp of the last arrow that has been sent out
+        last_arrow (int | None): stores the time stamp of the last arrow that has been sent out, or None if no arrow has been sent out yet
         round_start (int | None): stores the timestamp of the start of the game
         start (bool): determines if the game has started. If True, arrows will start being sent out
         is_player (bool): boolean value indicating if the gamemaster object is for player or for enemy
         player_end (int): integer indicating the timestamp in which the player's round has ended. This is used to determine if it's time for the opponent sprite to start.
+        clock (GameClock): clock used to obtain the current timestamp
+        lanes (list): the lanes that arrows are sent out in
+        lane_dict (dict): dictionary mapping the name of each lane to its Lane object
+        chart (NoteCursor | None): the cursor of the chart that arrows are sent out from, if any
+        chart_offset (float): chart time at which the current round started, if the chart only moves forward during this gamemaster's rounds
+        chart_start (float | None): timestamp the song started playing at, which the times of the chart are counted from, if the chart follows a song
+        pool (ArrowPool): the pool that arrows are taken from
+        rng (Random): random number generator used to choose arrows and decide the enemy's success
+        spawn_offset (float): number of milliseconds chart notes are sent out later by. Randomly sent out arrows are not in time with any music, so they are not moved.
+        settings (GameSettings): settings of the game difficulty
     """
-    def __init__(self, is_player: str):
-        self.last_arrow = pygame.time.get_ticks()
+    def __init__(self, is_player: str, clock = real_clock, lanes: list = None, chart = None, pool: ArrowPool = None, rng: random.Random = None, spawn_offset: float = 0, settings = game_settings, chart_start: float = None):
+        self.clock = clock
+        self.lanes = lanes if lanes is not None else create_lanes(clock = clock, settings = settings)
+        self.lane_dict = {lane.name: lane for lane in self.lanes}
+        self.chart = chart
+        self.chart_offset = 0
+        self.chart_start = chart_start
+        self.pool = pool if pool is not None else ArrowPool(clock, settings)
+        self.rng = rng if rng is not None else random.Random()
+        self.spawn_offset = spawn_offset
+        self.settings = settings
+        self.last_arrow = None
         self.round_start = None
         self.start = False
         self.is_player = is_player
@@ -82,7 +71,7 @@ class GameMaster:
         """
         The choose_next_arrow() method is used to decide which arrow to send out next.
 
-        This is done through using the random.choice which randomly decides which arrow to send out from arrow_dict
+        This is done through using the rng.choice of the gamemaster which randomly decides which lane to send the next arrow out in, unless the gamemaster is playing a chart.
 
         Args:
             None
@@ -93,40 +82,121 @@ class GameMaster:
             else
                 None
         """
+        # if statement checking if the arrows are sent out from a chart instead
+        if self.chart is not None:
+            return self.choose_next_chart_arrow()
+
         # obtaining the current timestamp in game
-        curr_time = pygame.time.get_ticks()
+        curr_time = self.clock.get_ticks()
 
-        # if statement checking if the time difference between the current timestamp and the last arrow timestamp exceeds the arrow interval time stamp and if self.start is True
-        if curr_time-self.last_arrow > difficulty_dict["arrow interval"] and self.start:
+        # if statement checking if the time difference between the current timestamp and the last arrow timestamp has reached the arrow interval and if self.start is True. The first arrow of the game is sent out as soon as the game starts, the same as the first arrow of every later round, however long ago the gamemaster was created.
+        if (self.last_arrow is None or curr_time-self.last_arrow >= self.settings.arrow_interval - TIME_TOLERANCE) and self.start:
 
             # if statement checking if this player's round has exceeded the set duration of a single round. This logic helps decide when it's time for the gamemaster to stop.
-            if curr_time - self.round_start >= ROUND_DURATION:
-                # gamemaster is stopping
-                self.start = False
-
-                # round_start is set to None again as this player's round has ended
-                self.round_start = None
-
-                # set the player_end timestamp to the current time stamp
-                self.player_end = curr_time
+            if curr_time - self.round_start >= self.settings.round_duration - TIME_TOLERANCE:
+                self.end_round(curr_time)
 
                 # returning None as no arrows have been sent out
                 return None
             
-            # choosing a random arrow from the 4 choices
-            next_arrow = random.choice(list(arrow_dict.keys()))
+            # choosing a random lane from the lanes of the game
+            lane = self.rng.choice(self.lanes)
 
             # updating the last_arrow timestamp with the current timestamp
             self.last_arrow = curr_time
 
             # returning an Arrow class with the correct sprite and x coordinate
-            if self.is_player:
-                return Arrow(arrow_dir= next_arrow, image = arrow_dict[next_arrow][0], centerx= arrow_dict[next_arrow][2])
-            else:
-                return Arrow(arrow_dir= next_arrow, image = arrow_dict[next_arrow][1], centerx= arrow_dict[next_arrow][2])
+            image = lane.player_image if self.is_player else lane.enemy_image
+            return self.pool.acquire(self.is_player, arrow_dir= lane.name, image = image, centerx= lane.centerx, spawn_time = curr_time, size = lane.arrow_size)
         else:
             # returns none if it's not yet time to send out the next arrow
             return None
+
+    def choose_next_chart_arrow(self):
+        """
+        This method sends out the next arrow of the chart once it is due.
+
+        Each note is sent out the arrow travel time before its time in the chart so that it reaches its BW arrow exactly on time. The spawn timestamp is taken from the chart instead of the current timestamp, so arrows stay on schedule even if this method is called late.
+
+        If the chart follows a song, its times are counted from the start of the song, so the chart keeps moving through the other side's rounds and the gaps between rounds, and the notes that fall in them are skipped. Otherwise the chart only moves forward during this gamemaster's rounds, continuing from where its last round stopped.
+
+        Only the next note of the chart is looked at, so this method should be called until it returns None to send out every note that is due, e.g. all notes of a chord.
+
+        Args:
+            None
+
+        Returns:
+            if arrow is sent out
+                Arrow from the pool with the correct sprite, x coordinate and hold length
+            else
+                None
+        """
+        # returns None if the gamemaster has not started
+        if not self.start:
+            return None
+
+        # obtaining the current timestamp in game and the time into the round
+        curr_time = self.clock.get_ticks()
+        round_time = curr_time - self.round_start
+
+        # if statement checking if this player's round has exceeded the set duration of a single round
+        if round_time >= self.settings.round_duration - TIME_TOLERANCE:
+            # the chart continues from where this round has stopped in the gamemaster's next round
+            self.chart_offset += self.settings.round_duration
+            self.end_round(curr_time)
+            return None
+
+        # obtaining the timestamp the times of the chart are counted from, being the start of the song if the chart follows one, or the start of the round moved back by the chart time played in earlier rounds otherwise
+        chart_origin = self.chart_start if self.chart_start is not None else self.round_start - self.chart_offset
+
+        note = self.chart.peek()
+
+        # while loop skipping every note of a chart following a song that was due to be sent out before this round started, which fell in the other side's round or between rounds
+        while self.chart_start is not None and note is not None and chart_origin + note.time + self.spawn_offset - self.settings.arrow_travel_time < self.round_start:
+            self.chart.skip()
+            note = self.chart.peek()
+
+        # returns None if the chart has ended or if its next note is not due yet
+        if note is None or note.time + self.spawn_offset - self.settings.arrow_travel_time > curr_time - chart_origin:
+            return None
+
+        # if statement checking if the note is in a lane that does not exist in this game. The note is left in the chart, as charts are normally checked before they are played.
+        if note.lane not in self.lane_dict:
+            raise ValueError(f"chart note at {note.time} ms is in unknown lane {note.lane!r}")
+
+        # the index of the note is kept with its arrow, so that the judgement of the arrow can be stored with the note
+        note_index = self.chart.position
+        self.chart.pop()
+
+        # obtaining the scheduled spawn timestamp of the note, moved by the calibrated spawn offset. Notes scheduled before the round started are sent out at the start of the round instead.
+        spawn_time = max(chart_origin + note.time + self.spawn_offset - self.settings.arrow_travel_time, self.round_start)
+        self.last_arrow = spawn_time
+
+        # returning an Arrow class with the correct sprite, x coordinate and hold length
+        lane = self.lane_dict[note.lane]
+        image = lane.player_image if self.is_player else lane.enemy_image
+        arrow = self.pool.acquire(self.is_player, arrow_dir= lane.name, image = image, centerx= lane.centerx, spawn_time = spawn_time, hold = note.hold, size = lane.arrow_size)
+        arrow.note_index = note_index
+        return arrow
+
+    def end_round(self, curr_time: float):
+        """
+        This method stops the gamemaster at the end of its round.
+
+        Args:
+            curr_time (float): the current timestamp in game
+
+        Returns:
+            None
+        """
+        # gamemaster is stopping
+        self.start = False
+
+        # round_start is set to None again as this player's round has ended
+        self.round_start = None
+
+        # set the player_end timestamp to the current time stamp
+        self.player_end = curr_time
     
     def switch_player(self):
         """
@@ -140,12 +210,12 @@ class GameMaster:
             False otherwise
         """
         # obtaining the current game timestamp
-        curr_time = pygame.time.get_ticks()
+        curr_time = self.clock.get_ticks()
 
         # if statement checking if there is any timestamp stored under player_end
         if self.player_end:
             # if statement that then checks if sufficient time has passed between the timestamp of the player's end and the current timestamp
-            if curr_time - self.player_end >= PLAYER_INTERVAL:
+            if curr_time - self.player_end >= PLAYER_INTERVAL - TIME_TOLERANCE:
                 # sets player_end to None as it's no longer the player's turn and it has moved to the opponents
                 self.player_end = None
 
@@ -176,17 +246,16 @@ class GameMaster:
         # if statement checking if the gamemaster is controlling a bot
         if not self.is_player:
             # obtaining the enemy's chance for success
-            enemy_chance = random.random()
+            enemy_chance = self.rng.random()
 
-            # obtaining the enemy's probability of success based on the game's difficulty setting
-            enemy_success_probability = difficulty_dict["enemy success probability"]
+            # obtaining the enemy's probability of missing based on the game's difficulty setting
+            enemy_miss_probability = self.settings.enemy_miss_probability
 
             # returns True if enemy succeeds else False
-            return True if enemy_chance >= enemy_success_probability else False
+            return True if enemy_chance >= enemy_miss_probability else False
         else:
             # returns False as the gamemaster is not contraolling a plyer
             return False
 
 
-
         
@@ -3,47 +3,26 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import pygame
-from dotenv import load_dotenv
-from helper.load_img import LoadImage
-
-# Initializing the width and heigh variables for the pygame display and the game difficulty from the .env
-load_dotenv()
-WIDTH = int(os.getenv("WIDTH", 400))
-HEIGHT = int(os.getenv("HEIGHT", 600))
-GAME_DIFFICULTY = os.getenv("GAME_DIFFICULTY", "easy").lower()
-
-# match case for setting the appropriate game difficulty variables
-match GAME_DIFFICULTY:
-    case "easy":
-        difficulty_dict = {
-            "percentage_loss": 40, # percentage loss is an integer that scales inversely with the player's hp loss.
-            "percentage_gain": 20 # percentage gain is an integer that scales inversely with the player's hp gain.
-        }
-    case "medium":
-        difficulty_dict = {
-            "percentage_loss": 30,
-            "percentage_gain": 25
-        }
-    case "hard":
-        difficulty_dict = {
-            "percentage_loss": 20,
-            "percentage_gain": 30
-        }
-    case "extreme":
-        difficulty_dict = {
-            "percentage_loss": 15,
-            "percentage_gain": 40
-        }
-# maximum possible length of the HP bar will be 2/3 that of the display width
-MAX_HP_BAR_LENGTH = WIDTH*2/3
+from helper.settings import game_settings
+from agents.judgement import PERFECT
+
+
+def max_hp_bar_length(settings = game_settings):
+    """
+    This function obtains the maximum possible length of the HP bar, which is 2/3 of the display width of the settings.
+
+    Args:
+        settings (GameSettings): optional argument for the settings of the game, whose display width is used
+
+    Returns:
+        float of the maximum length of the HP bar in pixels
+    """
+    return settings.width*2/3
 
 # tuple representing the RGB values of red and green colours
 RED = (255,0,0)
 GREEN = (0,255,0)
 
-# loading in images
-images = LoadImage()
-images.load_images()
 
 class HealthBar(pygame.sprite.Sprite):
     """
@@ -56,9 +35,10 @@ class HealthBar(pygame.sprite.Sprite):
     This is also a child class of the pygame Sprite class.
 
     Args:
-        width (int): optional argument for the width of the health bar
-        height(int): optional argument for the height of the health bar
+        width (int | None): optional argument for the width of the health bar. The maximum length of the HP bar is used if None.
+        height(int | None): optional argument for the height of the health bar. 1/30 of the display height is used if None.
         color (str): optional argument for colour of the health bar representing the lost player hp
+        settings (GameSettings): optional argument for the settings of the game, whose display size the health bar is placed in
 
     Attributes:
         width (int): width of the health bar
@@ -68,10 +48,10 @@ class HealthBar(pygame.sprite.Sprite):
         rect (Rect): pygame Rect object of the healthbar
 
     """
-    def __init__(self, width: int = MAX_HP_BAR_LENGTH, height: int = HEIGHT/30, color: str = RED):
+    def __init__(self, width: int = None, height: int = None, color: str = RED, settings = game_settings):
         pygame.sprite.Sprite.__init__(self)
-        self.width = width
-        self.height = height
+        self.width = width if width is not None else max_hp_bar_length(settings)
+        self.height = height if height is not None else settings.height/30
         self.color = color
         self.image = pygame.Surface((self.width, self.height))
         self.rect = self.image.get_rect()
@@ -80,62 +60,85 @@ class HealthBar(pygame.sprite.Sprite):
         self.image.fill(self.color)
 
         # setting center x coordinate of the healthbar to center of the display
-        self.rect.centerx = WIDTH/2
+        self.rect.centerx = settings.width/2
 
         # setting the bottom y coordinate of the image rect to 2/5 of the display height
-        self.rect.bottom = HEIGHT*2/5
+        self.rect.bottom = settings.height*2/5
 
 class GreenHealthBar(HealthBar):
     """
     This class creates the green health bar, representing the remaining hp of the player.
 
-    A player losing hp is represented by reducing the width of this healthbar. 
+    The hp of the player is kept as a whole number between 0 and the max_hp of the settings, separately from the width of the healthbar in pixels. A player losing hp is represented by showing less of a full length green bar, which is drawn once and then shown through a subsurface of the current width, so no new Surface is created when the hp changes.
     
     This is a child class of the HealthBar class.
 
     Args:
-        width (int): optional argument for the width of the health bar
-        height(int): optional argument for the height of the health bar
+        width (int | None): optional argument for the starting width of the health bar, which determines the starting hp. Half the maximum length of the HP bar is used if None.
+        height(int | None): optional argument for the height of the health bar. 1/30 of the display height is used if None.
         color (str): optional argument for colour of the health bar representing the lost player hp
+        settings (GameSettings): optional argument for the settings of the game difficulty, which determine the maximum hp, every hp change and the display size the health bar is placed in
 
     Attributes:
         rect.centerx (float): the center x coordinate of the healthbar
+        settings (GameSettings): the settings of the game difficulty
+        max_length (float): the length of the health bar at the maximum hp, in pixels
+        hp (int): the remaining hp of the player
+        full_image (Surface): pygame Surface of the health bar at its maximum length. image is a subsurface of this Surface.
 
         Kindly refer to attributes documented in the HealthBar class for other attributes pertaining to this class
     """
-    def __init__(self, width = MAX_HP_BAR_LENGTH/2, height = HEIGHT / 30, color = GREEN):
-        super().__init__(width, height, color)
-        self.rect.centerx = WIDTH/2 - width/2
-    
-    def lose_health(self):
+    def __init__(self, width = None, height = None, color = GREEN, settings = game_settings):
+        # the settings and maximum length are stored first, as setting the width in the HealthBar constructor sets the hp
+        self.settings = settings
+        self.max_length = max_hp_bar_length(settings)
+        width = width if width is not None else self.max_length/2
+        super().__init__(width, height, color, settings)
+        self.rect.centerx = settings.width/2 - width/2
+
+        # drawing the health bar at its maximum length once
+        self.full_image = pygame.Surface((self.max_length, self.height))
+        self.full_image.fill(self.color)
+        self.set_hp(self.hp)
+
+    @property
+    def width(self):
         """
-        This function is used when a player loses hp due to missing an arrow.
+        The width of the health bar in pixels, calculated from the hp of the player.
+        """
+        return self.hp / self.settings.max_hp * self.max_length
 
-        The scale of healthbar reduction is dependent on the percentage loss attribute.
+    @width.setter
+    def width(self, width):
+        # setting the width sets the hp that the width represents
+        self.hp = round(width / self.max_length * self.settings.max_hp)
+
+    def set_hp(self, hp: int):
+        """
+        This function sets the hp of the player, keeping it between 0 and the maximum hp, and updates the health bar to show it.
 
         Args:
-            None
+            hp (int): the new hp of the player
 
         Return:
-            None        
+            None
         """
-        # reducing the width of the health bar
-        self.width -= MAX_HP_BAR_LENGTH/2/difficulty_dict["percentage_loss"]
+        # taking the hp between 0 and the maximum hp. This ensures that the health bar does not drop below 0 or grow past its maximum length.
+        self.hp = min(max(hp, 0), self.settings.max_hp)
 
-        # taking the maximum between 0 and the width of the health bar. This ensures that the width of the health bar does not drop below 0. 
-        self.width = max(self.width, 0)
+        # obtaining the length of the health bar in whole pixels
+        pixel_width = int(self.width)
 
-        # recreating the healthbar as a pygame Surface 
-        self.image = pygame.Surface((self.width, self.height))
-
-        # filling the pygame Surface with the color
-        self.image.fill(self.color)
+        # if statement checking if the health bar has changed length, in which case the image becomes a subsurface of the full length bar. No pixels are copied.
+        if pixel_width != self.image.get_width() or self.image.get_parent() is not self.full_image:
+            self.image = self.full_image.subsurface((0, 0, pixel_width, self.height))
+            self.rect.width = pixel_width
 
-    def gain_health(self):
+    def lose_health(self):
         """
-        This function is used when a player gains hp.
+        This function is used when a player loses hp due to missing an arrow.
 
-        The scale of healthbar gained is dependent on the percentage loss attribute.
+        The scale of healthbar reduction is dependent on the percentage loss attribute.
 
         Args:
             None
@@ -143,17 +146,21 @@ class GreenHealthBar(HealthBar):
         Return:
             None        
         """
-        # increasing the width of the health bar
-        self.width += MAX_HP_BAR_LENGTH/2/difficulty_dict["percentage_gain"]
+        self.set_hp(self.hp - self.settings.hp_loss)
+
+    def gain_health(self, judgement: str = PERFECT):
+        """
+        This function is used when a player gains hp.
 
-        # taking the minimum between the new width of the health bar and the maximum possible length of the healthbar
-        self.width = min(self.width, MAX_HP_BAR_LENGTH)
+        The scale of healthbar gained is dependent on the percentage gain attribute and on how accurately the arrow was hit.
 
-        # recreating the healthbar as a pygame Surface 
-        self.image = pygame.Surface((self.width, self.height))
+        Args:
+            judgement (str): optional argument for the judgement of the hit, being one of the keys of the judgement_gain of the settings
 
-        # filling the pygame Surface with the color
-        self.image.fill(self.color)
+        Return:
+            None        
+        """
+        self.set_hp(self.hp + self.settings.judgement_gain[judgement])
     
     def enemy_score(self):
         """
@@ -169,15 +176,4 @@ class GreenHealthBar(HealthBar):
         Return:
             None        
         """
-        # reducing the width of the health bar
-        self.width -= MAX_HP_BAR_LENGTH/10/difficulty_dict["percentage_loss"]
-
-        # taking the maximum between 0 and the width of the health bar. This ensures that the width of the health bar does not drop below 0. 
-        self.width = max(self.width, 0)
-
-        # recreating the healthbar as a pygame Surface 
-        self.image = pygame.Surface((self.width, self.height))
-
-        # filling the pygame Surface with the color
-        self.image.fill(self.color)
-
+        self.set_hp(self.hp - self.settings.enemy_score_loss)
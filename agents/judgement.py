@@ -0,0 +1,42 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from collections import namedtuple
+
+# judgements of a key press, from the most to the least accurate
+PERFECT = "perfect"
+GREAT = "great"
+GOOD = "good"
+MISS = "miss"
+
+# dictionary mapping each judgement of a hit to the number of milliseconds a key press can be away from the time its arrow reaches the BW arrow, ordered from the tightest window
+JUDGEMENT_WINDOWS = {
+    PERFECT: 40,
+    GREAT: 90,
+    GOOD: 150,
+}
+
+# number of milliseconds after the time an arrow reaches its BW arrow that it can still be hit. An arrow that has not been hit by then is missed.
+HIT_WINDOW = JUDGEMENT_WINDOWS[GOOD]
+
+# a single input action of a GameSession together with the timestamp it happened at, in milliseconds of the session's clock
+InputEvent = namedtuple("InputEvent", ["action", "time"])
+
+
+def judge(offset: float):
+    """
+    This function judges a key press by how far it was from the time its arrow reached the BW arrow.
+
+    Args:
+        offset (float): number of milliseconds between the key press and the time the arrow reached the BW arrow. This is negative for an early press.
+
+    Returns:
+        the tightest judgement whose window the offset is within, or MISS if it is outside all of them
+    """
+    # for loop checking each window from the tightest to the widest
+    for judgement, window in JUDGEMENT_WINDOWS.items():
+        if abs(offset) <= window:
+            return judgement
+
+    return MISS
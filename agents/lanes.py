@@ -0,0 +1,238 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame
+from collections import deque
+from helper.load_img import images
+from helper.game_clock import real_clock
+from helper.settings import game_settings, LANE_COUNT
+from agents.arrows import ArrowBW, ARROW_SIZE, JUDGED_GROWTH
+from agents.judgement import HIT_WINDOW
+
+# dictionary storing the lane layouts of the game for each supported number of lanes.
+# each lane is a tuple of its name, the keyboard key bound to it and the direction of the arrow sprites it uses. Lanes are listed from left to right.
+LANE_LAYOUTS = {
+    4: [
+        ("left", pygame.K_LEFT, "left"),
+        ("up", pygame.K_UP, "up"),
+        ("down", pygame.K_DOWN, "down"),
+        ("right", pygame.K_RIGHT, "right"),
+    ],
+    6: [
+        ("left", pygame.K_s, "left"),
+        ("down", pygame.K_d, "down"),
+        ("up", pygame.K_f, "up"),
+        ("up_2", pygame.K_j, "up"),
+        ("down_2", pygame.K_k, "down"),
+        ("right", pygame.K_l, "right"),
+    ],
+    8: [
+        ("left", pygame.K_a, "left"),
+        ("down", pygame.K_s, "down"),
+        ("up", pygame.K_d, "up"),
+        ("right", pygame.K_f, "right"),
+        ("left_2", pygame.K_j, "left"),
+        ("down_2", pygame.K_k, "down"),
+        ("up_2", pygame.K_l, "up"),
+        ("right_2", pygame.K_SEMICOLON, "right"),
+    ],
+}
+
+# number of milliseconds before the end of a hold note that its key can be released early and still complete the hold
+HOLD_RELEASE_WINDOW = 100
+
+# prefix of the input action of a lane's key being released. Pressing a key is the name of its lane, and releasing it is this prefix followed by the name.
+RELEASE_PREFIX = "release_"
+
+# smallest number of pixels left between the BW arrows of two neighbouring lanes while they show a judgement
+LANE_GAP = 2
+
+# prefix of the input action of the rival pressing a lane's key in a versus match, in which the enemy arrows are played by a second player
+RIVAL_PREFIX = "rival_"
+
+
+class LaneQueue:
+    """
+    The LaneQueue class keeps the live arrows of a single lane in the order they reach the BW arrow.
+
+    All arrows in a lane are sent out from the same y coordinate and move at the same speed, so the order they are sent out in is also their order by the time they reach the BW arrow. The arrow closest to the BW arrow is therefore always at the head of the queue, and judging a key press or detecting a miss only needs to look at the head.
+
+    Args:
+        None
+
+    Attributes:
+        arrows (deque): the live arrows of the lane, ordered from the highest on screen to the lowest
+    """
+    def __init__(self):
+        self.arrows = deque()
+
+    def __len__(self):
+        return len(self.arrows)
+
+    def push(self, arrow):
+        """
+        This method adds a newly sent out arrow to the back of the queue.
+
+        Args:
+            arrow (Arrow): the arrow that has been sent out
+
+        Returns:
+            None
+        """
+        self.arrows.append(arrow)
+
+    def head(self):
+        """
+        This method returns the arrow closest to the BW arrow, dropping any arrows at the head that have already been killed elsewhere.
+
+        Args:
+            None
+
+        Returns:
+            the Arrow at the head of the queue, or None if the lane is empty
+        """
+        # while loop dropping arrows that are no longer in the game
+        while self.arrows and not self.arrows[0].alive():
+            self.arrows.popleft()
+
+        return self.arrows[0] if self.arrows else None
+
+    def hit(self, press_time: float, window: float = HIT_WINDOW):
+        """
+        This method checks if a key press hits the arrow at the head of the queue, being within window milliseconds of the time the arrow reaches the BW arrow. The arrow is removed from the queue if so.
+
+        Args:
+            press_time (float): timestamp at which the key was pressed
+            window (float): optional argument for the number of milliseconds the key press can be away from the hit time of the arrow
+
+        Returns:
+            the Arrow that has been hit, or None if the key press missed
+        """
+        arrow = self.head()
+
+        # if statement checking if the key press is within the hit window of the head arrow
+        if arrow is not None and abs(press_time - arrow.hit_time) <= window:
+            return self.arrows.popleft()
+
+        return None
+
+    def pop_passed(self, curr_time: float, window: float = 0):
+        """
+        This method removes and returns the head arrow if more than window milliseconds have passed since it reached the BW arrow without being hit.
+
+        It should be called in a loop until it returns None, as more than one arrow may have passed since the last check.
+
+        Args:
+            curr_time (float): the current timestamp
+            window (float): optional argument for the number of milliseconds after reaching the BW arrow that the arrow can still be hit
+
+        Returns:
+            the Arrow that has passed, or None if the head arrow can still be hit
+        """
+        arrow = self.head()
+
+        # if statement checking if the hit window of the head arrow has ended
+        if arrow is not None and arrow.hit_time + window < curr_time:
+            return self.arrows.popleft()
+
+        return None
+
+    def clear(self):
+        """
+        This method empties the queue.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.arrows.clear()
+
+
+class Lane:
+    """
+    The Lane class holds everything belonging to a single lane of the game: its key binding, position, BW arrow, the queues of live player and enemy arrows, and the hold notes currently being held in it.
+
+    A hold note leaves its queue once its arrow has been hit, and is kept in player_hold or enemy_hold until its tail reaches the BW arrow. Only these slots have to be checked every tick, so holds are tracked without looking through the sprite groups.
+
+    Args:
+        name (str): name of the lane, which is also the input action of its key and the arrow_dir of its arrows
+        key (int): pygame key constant bound to the lane
+        direction (str): direction of the arrow sprites used by the lane, being one of "up", "down", "left" or "right"
+        centerx (float): center x coordinate of the lane
+        clock (GameClock): optional argument for the clock used by the BW arrow of the lane
+        arrow_size (int): optional argument for the width and height in pixels of the arrows of the lane
+        settings (GameSettings): optional argument for the settings of the game, whose display height the BW arrow of the lane is placed in
+
+    Attributes:
+        name (str): name of the lane
+        key (int): pygame key constant bound to the lane
+        release_action (str): input action of the key of the lane being released
+        rival_action (str): input action of the rival pressing the key of the lane in a versus match
+        centerx (float): center x coordinate of the lane
+        arrow_size (int): width and height in pixels of the arrows and the BW arrow of the lane
+        player_image (Surface): image of the player arrows in this lane
+        enemy_image (Surface): image of the enemy arrows in this lane
+        bw_arrow (ArrowBW): the BW arrow of the lane
+        player_queue (LaneQueue): queue of the live player arrows in this lane
+        enemy_queue (LaneQueue): queue of the live enemy arrows in this lane
+        player_hold (Arrow | None): the hold note the player is holding down in this lane, if any
+        enemy_hold (Arrow | None): the hold note the enemy is holding down in this lane, if any
+    """
+    def __init__(self, name: str, key: int, direction: str, centerx: float, clock = real_clock, arrow_size: int = ARROW_SIZE, settings = game_settings):
+        self.name = name
+        self.key = key
+        self.release_action = RELEASE_PREFIX + name
+        self.rival_action = RIVAL_PREFIX + name
+        self.centerx = centerx
+        self.arrow_size = arrow_size
+        self.player_image = getattr(images, f"{direction}_arrow_player")
+        self.enemy_image = getattr(images, f"{direction}_arrow_enemy")
+        self.bw_arrow = ArrowBW(centerx = centerx,
+                                image = getattr(images, f"{direction}_arrow_bw"),
+                                hit_image = getattr(images, f"{direction}_arrow_hit"),
+                                miss_image = getattr(images, f"{direction}_arrow_miss"),
+                                clock = clock,
+                                size = arrow_size,
+                                settings = settings)
+        self.player_queue = LaneQueue()
+        self.enemy_queue = LaneQueue()
+        self.player_hold = None
+        self.enemy_hold = None
+
+
+def lane_arrow_size(lane_count: int, width: int = game_settings.width):
+    """
+    This function returns the size of the arrows of a lane layout. Arrows are shown at ARROW_SIZE pixels, unless the lanes are too close together for the BW arrows of neighbouring lanes not to overlap, in which case they are shrunk to fit.
+
+    Args:
+        lane_count (int): number of lanes
+        width (int): optional argument for the width of the display the lanes are spread across
+
+    Returns:
+        integer of the width and height of the arrows in pixels
+    """
+    spacing = width / (lane_count + 1)
+    return min(ARROW_SIZE, int(spacing) - JUDGED_GROWTH - LANE_GAP)
+
+
+def create_lanes(lane_count: int = LANE_COUNT, clock = real_clock, settings = game_settings):
+    """
+    This function creates the lanes of a game from the lane layout with the given number of lanes. The lanes are spread evenly across the width of the display, with arrows shrunk to fit the space between them.
+
+    Args:
+        lane_count (int): optional argument for the number of lanes, which must be a key of LANE_LAYOUTS
+        clock (GameClock): optional argument for the clock used by the BW arrows of the lanes
+        settings (GameSettings): optional argument for the settings of the game, whose display size the lanes are laid out in
+
+    Returns:
+        list of Lane objects ordered from left to right
+    """
+    layout = LANE_LAYOUTS[lane_count]
+    arrow_size = lane_arrow_size(len(layout), settings.width)
+    return [
+        Lane(name, key, direction, centerx = settings.width * (index + 1) / (len(layout) + 1), clock = clock, arrow_size = arrow_size, settings = settings)
+        for index, (name, key, direction) in enumerate(layout)
+    ]
@@ -3,17 +3,9 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import pygame
-from dotenv import load_dotenv
-from helper.load_img import LoadImage
-
-# Loading .env file and initializing the pygame display width and height
-load_dotenv()
-WIDTH = int(os.getenv("WIDTH", 400))
-HEIGHT = int(os.getenv("HEIGHT", 600))
-
-# loading in images
-images = LoadImage()
-images.load_images()
+from helper.load_img import images, scale_image
+from helper.game_clock import real_clock
+from helper.settings import game_settings
 
 
 class Player(pygame.sprite.Sprite):
@@ -22,6 +14,10 @@ class Player(pygame.sprite.Sprite):
 
     This is a child class of the pygame Sprite class.
 
+    Args:
+        clock (GameClock): optional argument for the clock used to obtain the current timestamp
+        settings (GameSettings): optional argument for the settings of the game, whose display size the sprite is placed in
+
     Attributes:
         image (Surface): Image displayed as the current player sprite
         rect (Rect): pygame Rect object from the input image
@@ -41,27 +37,29 @@ class Player(pygame.sprite.Sprite):
         sprite_attack_2 (Surface): stores the second attack image of the sprite
         sprite_lose (Surface): stores the lose image of the sprite
 
+        clock (GameClock): clock used to obtain the current timestamp
     """
-    def __init__(self):
+    def __init__(self, clock = real_clock, settings = game_settings):
         pygame.sprite.Sprite.__init__(self)
+        self.clock = clock
 
-        self.image = pygame.transform.scale(images.player_idle_1, (100, 100))
+        self.image = scale_image(images.player_idle_1, (100, 100))
         self.rect = self.image.get_rect()
 
         # setting the center x coordinate of the player sprite to 1/4 of pygame display width
-        self.rect.centerx = WIDTH/4 	
+        self.rect.centerx = settings.width/4 	
 
         # setting the bottom y coordinate of the player sprite to 1/4 of the pygame display height
-        self.rect.bottom = HEIGHT/4
+        self.rect.bottom = settings.height/4
 
         self.idle = True
         self.idle_sprite_1 = True
 
         self.idle_animation_speed = 2000
-        self.last_update = pygame.time.get_ticks()
+        self.last_update = self.clock.get_ticks()
 
         self.attack_animation_speed = 200
-        self.last_attack = pygame.time.get_ticks()
+        self.last_attack = self.clock.get_ticks()
 
         self.sprite_idle_1 = images.player_idle_1
         self.sprite_idle_2 = images.player_idle_2
@@ -79,7 +77,7 @@ class Player(pygame.sprite.Sprite):
         Returns:
             None
         """
-        curr_time = pygame.time.get_ticks() # obtaining the current time stamp
+        curr_time = self.clock.get_ticks() # obtaining the current time stamp
         
         # if statement checking if the player is in "idle" form
         if self.idle: 
@@ -88,13 +86,13 @@ class Player(pygame.sprite.Sprite):
                 # if statement checking if the user's sprite is idle_sprite_1
                 if self.idle_sprite_1:
                     # setting player image to idle sprite 2
-                    self.image = pygame.transform.scale(self.sprite_idle_2, (100, 100))
+                    self.image = scale_image(self.sprite_idle_2, (100, 100))
 
                     # setting idle_sprite_1 to False. The next switch will be to idle sprite 1
                     self.idle_sprite_1 = False
                 else:
                     # setting player image to idle sprite 1
-                    self.image = pygame.transform.scale(self.sprite_idle_1, (100, 100))
+                    self.image = scale_image(self.sprite_idle_1, (100, 100))
 
                     # setting idle_sprite_1 to True. The next switch will be to idle sprite 2
                     self.idle_sprite_1 = True
@@ -107,7 +105,7 @@ class Player(pygame.sprite.Sprite):
             if curr_time - self.last_attack > self.attack_animation_speed:
 
                 # setting the player image to player_attack_1
-                self.image = pygame.transform.scale(self.sprite_attack_1, (100, 100))
+                self.image = scale_image(self.sprite_attack_1, (100, 100))
             
             # if statment checking if the time difference between the current time stamp and the last attack time stamp exceeds 3000 ms
             if curr_time - self.last_attack > 3000:
@@ -129,10 +127,10 @@ class Player(pygame.sprite.Sprite):
         self.idle = False
 
         # Setting the player's image to player_attack_2
-        self.image = pygame.transform.scale(self.sprite_attack_2, (100, 100))
+        self.image = scale_image(self.sprite_attack_2, (100, 100))
 
         # updating the player's last attack time stamp to the current time stamp. This is used to determine when the player's sprite should change.
-        self.last_attack = pygame.time.get_ticks()
+        self.last_attack = self.clock.get_ticks()
 
     def lose(self):
         """
@@ -145,7 +143,7 @@ class Player(pygame.sprite.Sprite):
             None
         """
         # updating sprite image to lose
-        self.image = pygame.transform.scale(self.sprite_lose, (125, 62))
+        self.image = scale_image(self.sprite_lose, (125, 62))
 
 class Enemy(Player):
     """
@@ -164,15 +162,15 @@ class Enemy(Player):
 
         Kindly refer to the doc strings for the Player class for further elaboration on the class attributes.s
     """
-    def __init__(self):
-        super().__init__()
-        self.image = pygame.transform.scale(images.enemy_idle_1, (100, 100))
+    def __init__(self, clock = real_clock, settings = game_settings):
+        super().__init__(clock, settings)
+        self.image = scale_image(images.enemy_idle_1, (100, 100))
 
         # setting the center x coordinate of the player sprite to 3/4 of pygame display width
-        self.rect.centerx = WIDTH*3/4 	
+        self.rect.centerx = settings.width*3/4 	
 
         # setting the bottom y coordinate of the player sprite to 1/4 of the pygame display height
-        self.rect.bottom = HEIGHT/4
+        self.rect.bottom = settings.height/4
 
         self.sprite_idle_1 = images.enemy_idle_1
         self.sprite_idle_2 = images.enemy_idle_2
@@ -0,0 +1,681 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pygame
+import random
+from helper.game_clock import SimulationClock
+from agents.gamemaster import GameMaster
+from agents.healthbar import HealthBar, GreenHealthBar
+from agents.player import Player, Enemy
+from agents.lanes import create_lanes, LANE_COUNT, HOLD_RELEASE_WINDOW
+from agents.judgement import InputEvent, JUDGEMENT_WINDOWS, HIT_WINDOW, PERFECT, MISS, judge
+from agents.arrows import ArrowPool
+from helper.note_store import NoteStore, PLAYER, ENEMY
+from helper.profiler import frame_profiler
+from helper.settings import game_settings
+from helper.replay import ReplayHeader, ReplayRecorder, load_replay, END_INDEX
+
+# number of simulation ticks per second. This is a constant instead of the FPS of the .env, as the gamemasters check their arrow intervals and round durations once per tick, so the spacing of the arrows and the number of arrows in a round would otherwise change with the rate the game is rendered at.
+TICK_RATE = 60
+
+# length of a single fixed simulation tick in milliseconds. The game rules always advance in steps of this length, regardless of the rate the game is rendered at.
+TICK_MS = 1000 / TICK_RATE
+
+# largest number of ticks a single step can run. Time passed beyond this, e.g. while the window was blocked, is dropped instead of being caught up with, so that arrows are not sent out and missed within a single frame without ever being drawn.
+MAX_CATCHUP_TICKS = 15
+
+# mask keeping a seed to the 64 bits it is stored with in replay files
+SEED_MASK = 2**64 - 1
+
+# input action understood by GameSession.step() that starts the player's first round. Every other input action is the name of the lane whose key has been pressed, or the release action of the lane whose key has been released.
+START = "start"
+
+
+class GameSession:
+    """
+    The GameSession class holds all the rules and state of a single match, without any window or real time.
+
+    The session is advanced with step(), which runs the game rules in fixed ticks of TICK_MS milliseconds. Rendering is done by observers, which are notified after every step.
+
+    Args:
+        clock (SimulationClock): optional argument for the clock that the session advances. A new SimulationClock starting at 0 is used if none is given.
+        tick_ms (float): optional argument for the length of a single simulation tick in milliseconds
+        lane_count (int): optional argument for the number of lanes of the game, which must be a key of LANE_LAYOUTS
+        chart_path (str | None): optional argument for the path to a chart file. Both the player and the enemy play the chart if given, otherwise arrows are sent out randomly.
+        seed (int | None): optional argument for the seed of the random number generator of the session, which is kept to its lowest 64 bits so that it fits in a replay header. A random seed is chosen if None.
+        profiler (FrameProfiler): optional argument for the profiler that the phases of each tick are timed with
+        input_offset (float): optional argument for the number of milliseconds key presses and releases are moved back by before they are judged, as measured by the calibration
+        spawn_offset (float): optional argument for the number of milliseconds chart notes are sent out later by, as measured by the calibration
+        settings (GameSettings): optional argument for the settings of the game difficulty the session is played at
+        versus (bool): optional argument for playing a versus match, in which the enemy arrows are hit by the key presses of a second player, the rival, instead of being decided by the bot
+        rival_latency (float): optional argument for the number of milliseconds enemy arrows are kept past their hit window in a versus match, so that the timestamped key presses of a rival playing over the network are still judged when they arrive late
+        song_sync (bool): optional argument for playing the chart in time with a song that starts playing when the session is created, in which case the session has to be advanced by the playback position of the song
+
+    Attributes:
+        clock (SimulationClock): clock advanced by the session and shared by all game objects of the session
+        tick_ms (float): length of a single simulation tick in milliseconds
+        accumulator (float): milliseconds of the latest steps that have not been simulated yet as they do not make up a full tick
+        pending_inputs (list): inputs given to step() that are waiting for the next tick to be applied
+        observers (list): objects whose render(session) method is called after every step
+        tick_count (int): number of ticks that have been run
+        chart_path (str | None): path to the chart file played in the session, if any
+        notes (NoteStore | None): every note of the chart played in the session, with the state of each note for the player and the enemy, if a chart is played
+        seed (int): seed of the random number generator of the session
+        rng (Random): random number generator shared by both gamemasters. Every random decision of the session is taken from it, so a session is reproducible from its seed and inputs.
+        recorder (ReplayRecorder | None): recorder writing the inputs of the session to a replay file, if the session is being recorded
+        profiler (FrameProfiler): the profiler that the phases of each tick are timed with
+        input_offset (float): number of milliseconds key presses and releases are moved back by before they are judged
+        spawn_offset (float): number of milliseconds chart notes are sent out later by
+        settings (GameSettings): settings of the game difficulty the session is played at, shared by every game object of the session
+        judgements (dict): dictionary mapping each judgement to the number of times the player's key presses have been judged as it
+        versus (bool): boolean value indicating that the session is a versus match
+        rival_latency (float): number of milliseconds enemy arrows are kept past their hit window in a versus match
+        rival_judgements (dict): dictionary mapping each judgement to the number of enemy arrows the rival has played with it in a versus match
+        song_sync (bool): boolean value indicating that the chart is played in time with a song
+        chart_start (float | None): timestamp the song started playing at, which the times of the chart are counted from, if the chart is played in time with a song
+
+        player (Player): the player sprite
+        enemy (Enemy): the enemy sprite
+        healthbar (HealthBar): the red healthbar representing the lost hp of the player
+        player_healthbar (GreenHealthBar): the green healthbar representing the remaining hp of the player
+        base_game_sprites (Group): sprite group containing the player, enemy and healthbar sprites
+
+        lanes (list): the Lane objects of the game, ordered from left to right
+        lane_dict (dict): dictionary mapping the name of each lane to its Lane object
+        release_dict (dict): dictionary mapping the release action of each lane to its Lane object
+        rival_dict (dict): dictionary mapping the rival action of each lane to its Lane object in a versus match, and empty otherwise
+        player_arrow_sprites (Group): sprite group containing all player arrows
+        enemy_arrow_sprites (Group): sprite group containing all enemy arrows
+        bw_arrow_sprites (Group): sprite group containing the ArrowBW sprites of all lanes
+
+        arrow_pool (ArrowPool): pool that the arrows of both gamemasters are taken from and returned to
+        player_game_master (GameMaster): gamemaster sending out the player's arrows
+        enemy_game_master (GameMaster): gamemaster sending out the enemy's arrows
+
+        player_turn (bool): boolean value indicating if it's the player's turn
+        enemy_turn (bool): boolean value indicating if it's the enemy's turn
+        game_over (bool): boolean value indicating if the game is over
+        player_lost (bool): boolean value indicating if the player has lost
+        running (bool): boolean value indicating that the session has not been closed
+    """
+    def __init__(self, clock: SimulationClock = None, tick_ms: float = TICK_MS, lane_count: int = LANE_COUNT, chart_path: str = None, seed: int = None, profiler = frame_profiler, input_offset: float = 0, spawn_offset: float = 0, settings = game_settings, versus: bool = False, rival_latency: float = 0, song_sync: bool = False):
+        self.clock = clock if clock is not None else SimulationClock()
+        self.tick_ms = tick_ms
+        self.accumulator = 0
+        self.pending_inputs = []
+        self.observers = []
+        self.tick_count = 0
+        self.chart_path = chart_path
+        self.seed = (seed if seed is not None else random.randrange(2**32)) & SEED_MASK
+        self.rng = random.Random(self.seed)
+        self.recorder = None
+        self.profiler = profiler
+        self.input_offset = input_offset
+        self.spawn_offset = spawn_offset
+        self.settings = settings
+        self.judgements = dict.fromkeys(list(JUDGEMENT_WINDOWS) + [MISS], 0)
+        self.versus = versus
+        self.rival_latency = rival_latency
+        self.rival_judgements = dict.fromkeys(list(JUDGEMENT_WINDOWS) + [MISS], 0)
+        self.song_sync = song_sync
+        self.chart_start = self.clock.get_ticks() if song_sync else None
+
+        # creating the player, enemy and healthbar sprites
+        self.player = Player(clock=self.clock, settings=settings)
+        self.enemy = Enemy(clock=self.clock, settings=settings)
+        self.healthbar = HealthBar(settings=settings)
+        self.player_healthbar = GreenHealthBar(settings=settings)
+        self.base_game_sprites = pygame.sprite.Group(self.player, self.healthbar, self.player_healthbar, self.enemy)
+
+        # creating the lanes of the game. Each lane holds its BW arrow and the queues of live player and enemy arrows that key presses and misses are judged against.
+        self.lanes = create_lanes(lane_count, clock=self.clock, settings=settings)
+        self.lane_dict = {lane.name: lane for lane in self.lanes}
+        self.release_dict = {lane.release_action: lane for lane in self.lanes}
+        self.rival_dict = {lane.rival_action: lane for lane in self.lanes} if versus else {}
+
+        # creating the sprite groups used to update and draw all arrows
+        self.player_arrow_sprites = pygame.sprite.Group()
+        self.enemy_arrow_sprites = pygame.sprite.Group()
+        self.bw_arrow_sprites = pygame.sprite.Group([lane.bw_arrow for lane in self.lanes])
+
+        # creating the GameMaster objects for player and enemy, each reading the notes of the chart with its own cursor if one is given. Both take their arrows from the same pool.
+        self.notes = NoteStore.load(chart_path, [lane.name for lane in self.lanes]) if chart_path else None
+        self.arrow_pool = ArrowPool(self.clock, settings)
+        self.player_game_master = GameMaster(is_player=True, clock=self.clock, lanes=self.lanes, chart=self.notes.cursor(PLAYER) if self.notes else None, pool=self.arrow_pool, rng=self.rng, spawn_offset=spawn_offset, settings=settings, chart_start=self.chart_start)
+        self.enemy_game_master = GameMaster(is_player=False, clock=self.clock, lanes=self.lanes, chart=self.notes.cursor(ENEMY) if self.notes else None, pool=self.arrow_pool, rng=self.rng, spawn_offset=spawn_offset, settings=settings, chart_start=self.chart_start)
+
+        self.player_turn = False
+        self.enemy_turn = False
+        self.game_over = False
+        self.player_lost = False
+        self.running = True
+
+    def add_observer(self, observer):
+        """
+        This method adds an observer, such as a renderer, that is notified after every step.
+
+        Args:
+            observer: object with a render(session) method
+
+        Returns:
+            None
+        """
+        self.observers.append(observer)
+
+    def header(self):
+        """
+        This method returns the settings the session is played with, which are needed to re-create it exactly.
+
+        Args:
+            None
+
+        Returns:
+            ReplayHeader of the session
+        """
+        return ReplayHeader(self.seed, self.tick_ms, len(self.lanes), self.settings, self.chart_path, self.input_offset, self.spawn_offset, self.versus, self.rival_latency, self.song_sync)
+
+    def input_actions(self):
+        """
+        This method returns every input action of the session, indexed by the action index it is recorded as in replay files.
+
+        Args:
+            None
+
+        Returns:
+            list of START, the name of every lane, the release action of every lane and, in a versus match, the rival action of every lane
+        """
+        return [START] + [lane.name for lane in self.lanes] + [lane.release_action for lane in self.lanes] + list(self.rival_dict)
+
+    def start_recording(self, replay_path: str):
+        """
+        This method starts writing every input applied to the session to a replay file, which can be re-simulated with replay_match().
+
+        Args:
+            replay_path (str): path to the replay file that is written
+
+        Returns:
+            None
+        """
+        self.recorder = ReplayRecorder(replay_path, self.header(), self.input_actions())
+
+    def close(self):
+        """
+        This method closes the session, finishing its replay file if it is being recorded.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.running = False
+        if self.recorder is not None:
+            self.recorder.close(self.tick_count)
+            self.recorder = None
+
+    def step(self, dt: float, inputs = ()):
+        """
+        This method advances the session by dt milliseconds, running as many fixed ticks as fit into the elapsed time.
+
+        Inputs are applied on the next tick that is run, but are judged at the timestamp they happened at, so the accuracy of a key press does not depend on the tick or frame rate. Time left over that does not make up a full tick is carried over to the next step, and time beyond MAX_CATCHUP_TICKS ticks is dropped.
+
+        Args:
+            dt (float): number of milliseconds that have passed since the last step
+            inputs (iterable): input actions that happened since the last step, each being START, the name of a lane whose key has been pressed or the release action of a lane whose key has been released. An action can be given as an InputEvent with the timestamp it happened at, otherwise it is taken to have happened at the end of the step.
+
+        Returns:
+            None
+        """
+        # adding the elapsed time, dropping whatever is beyond the number of ticks a step can catch up with
+        self.accumulator = min(self.accumulator + dt, MAX_CATCHUP_TICKS * self.tick_ms)
+
+        # obtaining the timestamp at the end of this step, which is the time the inputs without a timestamp are taken to have happened at
+        end_time = self.clock.get_ticks() + self.accumulator
+        self.pending_inputs.extend(action if isinstance(action, InputEvent) else InputEvent(action, end_time) for action in inputs)
+
+        # while loop running a tick for every full tick of elapsed time
+        while self.accumulator >= self.tick_ms:
+            self.accumulator -= self.tick_ms
+            self.clock.advance(self.tick_ms)
+
+            # the inputs are only applied on the first tick so that each key press is only handled once
+            inputs, self.pending_inputs = self.pending_inputs, []
+            self.tick(inputs)
+
+        # notifying all observers of the new state of the session
+        for observer in self.observers:
+            observer.render(self)
+
+    def judge_player(self, lane, judgement: str):
+        """
+        This method applies the judgement of one of the player's key presses or hold notes: the BW arrow of its lane shows the judgement and the player gains or loses health accordingly.
+
+        Args:
+            lane (Lane): the lane that has been judged
+            judgement (str): the judgement, being one of the keys of JUDGEMENT_WINDOWS or MISS
+
+        Returns:
+            None
+        """
+        lane.bw_arrow.judge(judgement)
+        self.judgements[judgement] += 1
+
+        # if statement checking if the player has missed
+        if judgement == MISS:
+            self.player_healthbar.lose_health()
+        else:
+            self.player_healthbar.gain_health(judgement)
+
+    def update_arrows(self):
+        """
+        This method moves every live arrow to its position at the current timestamp.
+
+        Every live arrow is either waiting in the queue of its lane or being held, so the arrows are walked through the lanes instead of through the sprite groups. Each queue is ordered by the time its arrows reach the BW arrow, so the walk of a queue stops at the first arrow that has not been sent out yet. Arrows that have left the top of the screen are killed by their exit time.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        curr_time = self.clock.get_ticks()
+
+        for lane in self.lanes:
+            for queue in (lane.player_queue, lane.enemy_queue):
+                for arrow in queue.arrows:
+                    # if statement checking if the arrow is still to come onto the screen, in which case so is every arrow behind it
+                    if arrow.spawn_time > curr_time:
+                        break
+                    if arrow.alive():
+                        arrow.move(curr_time)
+
+            # the arrows being held have left their queue, but stay on screen until their tail reaches the BW arrow
+            for arrow in (lane.player_hold, lane.enemy_hold):
+                if arrow is not None:
+                    arrow.move(curr_time)
+
+    def record_note(self, arrow, owner: int, judgement: str):
+        """
+        This method stores the final judgement of an arrow with the chart note it was sent out for, if any.
+
+        Args:
+            arrow (Arrow): the arrow that has been judged
+            owner (int): PLAYER or ENEMY
+            judgement (str): the final judgement of the arrow
+
+        Returns:
+            None
+        """
+        if arrow.note_index is not None and self.notes is not None:
+            self.notes.judge(owner, arrow.note_index, judgement)
+
+    def finish_hold(self, lane, completed: bool):
+        """
+        This method ends the hold note the player is holding in a lane, judging whether it has been held for long enough.
+
+        A completed hold is given the same judgement its arrow was hit with.
+
+        Args:
+            lane (Lane): the lane of the hold note
+            completed (bool): boolean value indicating that the hold has been held until the end of its tail
+
+        Returns:
+            None
+        """
+        # the player gains health for a sustained hold, and loses health for letting go too early
+        judgement = lane.player_hold.judgement if completed else MISS
+        self.judge_player(lane, judgement)
+        self.record_note(lane.player_hold, PLAYER, judgement)
+
+        # killing the hold note so that it is only judged once
+        lane.player_hold.kill()
+        lane.player_hold = None
+
+    def hit_rival(self, lane, input_time: float):
+        """
+        This method handles the rival pressing the key of a lane in a versus match. The enemy scores with every enemy arrow the rival hits within its hit window, however accurately it is hit, and holds a hit hold note until its tail reaches the BW arrow like the bot does.
+
+        Args:
+            lane (Lane): the lane whose key has been pressed
+            input_time (float): the timestamp the key was pressed at
+
+        Returns:
+            None
+        """
+        # displaying the enemy attack animation
+        self.enemy.attack()
+
+        # popping every head arrow whose hit window had already ended when the key was pressed, which the rival has missed. These are only still in the queue because of the rival latency.
+        while (arrow := lane.enemy_queue.pop_passed(input_time, HIT_WINDOW)) is not None:
+            self.miss_rival(lane, arrow)
+
+        # obtaining the enemy arrow at the head of the pressed lane if the key was pressed within the hit window of the time it reaches the BW arrow
+        arrow = lane.enemy_queue.hit(input_time)
+
+        # if statement checking if the rival has missed, in which case nothing happens, as the rival has no hp to lose
+        if arrow is None:
+            return
+
+        arrow.judgement = judge(input_time - arrow.hit_time)
+        lane.bw_arrow.judge(arrow.judgement)
+        self.rival_judgements[arrow.judgement] += 1
+        self.record_note(arrow, ENEMY, arrow.judgement)
+
+        # player loses some health
+        self.player_healthbar.enemy_score()
+
+        # if statement checking if the arrow is a hold note, which stays in game until its tail reaches the BW arrow
+        if arrow.hold:
+            self.hold_enemy_arrow(lane, arrow)
+        else:
+            arrow.kill()
+
+    def hold_enemy_arrow(self, lane, arrow):
+        """
+        This method makes the enemy hold a hold note it has scored with until its tail reaches the BW arrow. A hold note the enemy is still holding in the same lane is let go of, as its key has been pressed again.
+
+        Args:
+            lane (Lane): the lane of the hold note
+            arrow (Arrow): the hold note that has been hit
+
+        Returns:
+            None
+        """
+        # killing the earlier hold note of the lane, if any, which has already been scored with
+        if lane.enemy_hold is not None:
+            lane.enemy_hold.kill()
+        lane.enemy_hold = arrow
+
+    def miss_rival(self, lane, arrow):
+        """
+        This method handles an enemy arrow the rival has missed in a versus match, which the enemy fails to score with.
+
+        Args:
+            lane (Lane): the lane of the arrow
+            arrow (Arrow): the arrow that has been missed
+
+        Returns:
+            None
+        """
+        lane.bw_arrow.judge(MISS)
+        self.rival_judgements[MISS] += 1
+        self.record_note(arrow, ENEMY, MISS)
+
+        # killing the missed arrow so that it is only handled once
+        arrow.kill()
+
+    def tick(self, inputs):
+        """
+        This method runs the game rules once. It holds the logic of a single frame of the original game loop.
+
+        Args:
+            inputs (iterable): InputEvents to be handled on this tick
+
+        Returns:
+            None
+        """
+        self.tick_count += 1
+
+        # writing the inputs of this tick to the replay file if the session is being recorded
+        if self.recorder is not None and inputs:
+            self.recorder.record(self.tick_count, inputs)
+
+        ## Game logic for handling the inputs of the player
+        for action, input_time in inputs:
+            # if statement checking if the rival has pressed the key of a lane in a versus match. The rival's inputs are timestamped on the rival's machine, which applies its own calibration.
+            if action in self.rival_dict:
+                self.hit_rival(self.rival_dict[action], input_time)
+                continue
+
+            # moving the input back by the calibrated input latency, so that it is judged at the time the player meant it. Inputs are recorded before this so that replays are judged the same way.
+            input_time -= self.input_offset
+
+            # if statement checking if the player has started the game
+            if action == START and not self.game_over:
+                # if so, the game_master starts
+                self.player_game_master.start = True
+
+                # setting the round start timestamp
+                self.player_game_master.round_start = self.clock.get_ticks()
+
+                # player no longer in idle mode
+                self.player.idle = False
+
+                # player has started playing
+                self.player_turn = True
+
+            # if statement checking if the player has pressed the key of a lane
+            if action in self.lane_dict:
+                lane = self.lane_dict[action]
+
+                # displaying the player attack animation
+                self.player.attack()
+
+                # obtaining the arrow at the head of the pressed lane if the key was pressed within the hit window of the time it reaches the BW arrow
+                arrow = lane.player_queue.hit(input_time)
+
+                # if statement checking if the player has timed the arrow key successfully
+                if arrow is not None:
+                    # if statement checking if an earlier hold note is still being held in this lane. Its key has been pressed again to hit the next note, so the earlier hold ends here and is judged by how close to the end of its tail it was let go.
+                    if lane.player_hold is not None:
+                        self.finish_hold(lane, input_time >= lane.player_hold.hold_end - HOLD_RELEASE_WINDOW)
+
+                    # judging the key press by how many milliseconds it was away from the time the arrow reached the BW arrow
+                    arrow.judgement = judge(input_time - arrow.hit_time)
+                    self.judge_player(lane, arrow.judgement)
+
+                    # if statement checking if the arrow is a hold note, which stays in game until its key is released or its tail reaches the BW arrow
+                    if arrow.hold:
+                        lane.player_hold = arrow
+                    else:
+                        # kill the player arrow sprite
+                        self.record_note(arrow, PLAYER, arrow.judgement)
+                        arrow.kill()
+
+                # elif statement checking if the user has failed to time the arrow (missed the arrow).
+                # if it's not player's turn, the key press is ignored so player hp is not lost when an arrow key is pressed during bot's turn
+                elif self.player_turn:
+                    self.judge_player(lane, MISS)
+
+            # if statement checking if the player has released the key of a lane while holding a hold note in it
+            if action in self.release_dict and self.release_dict[action].player_hold is not None:
+                lane = self.release_dict[action]
+
+                # the hold is completed if the key is released close enough to the end of its tail
+                self.finish_hold(lane, input_time >= lane.player_hold.hold_end - HOLD_RELEASE_WINDOW)
+
+        # obtaining boolean value determing if the enemy has succeeded in timing the arrow. In a versus match the rival has to hit the enemy arrows instead.
+        enemy_success = self.enemy_game_master.enemy_success() if not self.versus else False
+        self.profiler.lap("input")
+
+        # obtaining the current timestamp to check the hold notes and hit windows against
+        curr_time = self.clock.get_ticks()
+
+        # for loop handling the arrows that have reached the BW arrow in every lane in a single pass
+        for lane in self.lanes:
+            ## Game logic for hold notes being held down
+            # if statement checking if the player is holding a hold note in this lane
+            if lane.player_hold is not None:
+                # if statement checking if the tail has reached the BW arrow, which completes the hold
+                if curr_time >= lane.player_hold.hold_end:
+                    self.finish_hold(lane, True)
+                else:
+                    # keeping the BW arrow lit for as long as the hold is sustained
+                    lane.bw_arrow.judge(lane.player_hold.judgement)
+
+            # if statement checking if the enemy is holding a hold note in this lane, which is released once its tail reaches the BW arrow
+            if lane.enemy_hold is not None:
+                if curr_time >= lane.enemy_hold.hold_end:
+                    lane.enemy_hold.kill()
+                    lane.enemy_hold = None
+                else:
+                    lane.bw_arrow.judge(lane.enemy_hold.judgement)
+
+            ## Game logic for when a player's arrow sprite has passed the arrow bw without being pressed by the player (aka player has missed the arrow sprite)
+            # while loop popping every head arrow whose hit window has ended
+            while (arrow := lane.player_queue.pop_passed(curr_time, HIT_WINDOW)) is not None:
+                # change BW arrow sprite to fail sprite and the player loses health
+                self.judge_player(lane, MISS)
+                self.record_note(arrow, PLAYER, MISS)
+
+                # killing the missed arrow so that it is only penalised once
+                arrow.kill()
+
+            ## Game logic for handling enemy arrow sprites
+            # while loop popping every head arrow the rival has not hit in time in a versus match, which the enemy fails to score with
+            while self.versus and (arrow := lane.enemy_queue.pop_passed(curr_time, HIT_WINDOW + self.rival_latency)) is not None:
+                self.miss_rival(lane, arrow)
+
+            # while loop popping every head arrow that has reached the BW arrow
+            while not self.versus and (arrow := lane.enemy_queue.pop_passed(curr_time)) is not None:
+                # changing current enemy sprite to attack enemy sprite
+                self.enemy.attack()
+
+                # the enemy always times its arrows perfectly, but may still fail to score
+                arrow.judgement = PERFECT if enemy_success else MISS
+                lane.bw_arrow.judge(arrow.judgement)
+                self.record_note(arrow, ENEMY, arrow.judgement)
+
+                # if statement checking if enemy has succeeded
+                if enemy_success:
+                    # player loses some health
+                    self.player_healthbar.enemy_score()
+
+                # if statement checking if the enemy holds the hold note down, in which case it stays in game until its tail reaches the BW arrow
+                if enemy_success and arrow.hold:
+                    self.hold_enemy_arrow(lane, arrow)
+                else:
+                    # killing the arrow so that it is only handled once
+                    arrow.kill()
+        self.profiler.lap("misses")
+
+        ## Game logic for checking if it's time for the enemy/player to start their turn
+        # if statement checking if it's not the enemy's turn and if the game is not yet over
+        if not self.enemy_turn and not self.game_over:
+            # obtaining boolean value determining if it's time to switch the player
+            self.enemy_turn = self.player_game_master.switch_player()
+
+            # if statement checking if it's the enemy's turn
+            if self.enemy_turn:
+                # starting up the enemy's gamemaster
+                self.enemy_game_master.start = True
+                self.enemy_game_master.round_start = self.clock.get_ticks()
+
+        # if statement checking if it's the enemy's turn
+        if self.enemy_turn:
+            # obtaining every arrow that is due for the enemy, if any, and adding it to its lane and the enemy sprite group
+            while (arrow := self.enemy_game_master.choose_next_arrow()) is not None:
+                self.lane_dict[arrow.arrow_dir].enemy_queue.push(arrow)
+                self.enemy_arrow_sprites.add(arrow)
+
+        # if statement checking if it's not the player's turn and if the game is not yet over
+        if not self.player_turn and not self.game_over:
+            # obtaining boolean value determining if it's time to switch the player
+            self.player_turn = self.enemy_game_master.switch_player()
+
+            # if statement checking if it's the player's turm
+            if self.player_turn:
+                # starting up player's gamemaster
+                self.player_game_master.start = True
+                self.player_game_master.round_start = self.clock.get_ticks()
+
+        # if statement checking if it's the player's turn
+        if self.player_turn:
+            # obtaining every arrow that is due for the player, if any, and adding it to its lane and the player sprite group
+            while (arrow := self.player_game_master.choose_next_arrow()) is not None:
+                self.lane_dict[arrow.arrow_dir].player_queue.push(arrow)
+                self.player_arrow_sprites.add(arrow)
+
+        ## Game logic for additional checks. This ensures that as long as there are any player/enemy arrow sprites still existing in game, or their gamemaster is still sending arrows out, it will always be the correct turn.
+        self.player_turn = len(self.player_arrow_sprites) > 0 or self.player_game_master.start
+        self.enemy_turn = len(self.enemy_arrow_sprites) > 0 or self.enemy_game_master.start
+        self.profiler.lap("spawns")
+
+        ## Game logic for checking if player has won/lost the game through the hp of the player's healthbar
+        # if statement checking if the player's hp is less than or equals to 0
+        if self.player_healthbar.hp <= 0:
+            # changing player's sprite to a lose player sprite
+            self.player.lose()
+
+            # the game has concluded with the player's loss
+            self.game_over = True
+            self.player_lost = True
+
+        # elif statement checking if the player's hp has reached the maximum hp
+        elif self.player_healthbar.hp >= self.settings.max_hp:
+            # this ensures that the player cannot win due to the enemy's mistake. In other words, player only wins in the following round even if player's hp bar is full.
+            if not self.enemy_turn and self.player_turn:
+                # changing enemy current sprite to the enemy lose sprite
+                self.enemy.lose()
+
+                # the game has concluded with the player's victory
+                self.game_over = True
+                self.player_lost = False
+
+        ## Game logic for sprite updates
+        # if statement checking if the game has concluded
+        if self.game_over == False:
+            # updating all necessary sprite groups
+            self.base_game_sprites.update()
+            self.update_arrows()
+            self.bw_arrow_sprites.update()
+        else:
+            # stopping all gamemasters
+            self.enemy_game_master.start = False
+            self.player_game_master.start = False
+        self.profiler.lap("update")
+
+
+def session_from_header(header: ReplayHeader):
+    """
+    This function creates a GameSession with the settings of a replay header.
+
+    Args:
+        header (ReplayHeader): the settings the session is played with
+
+    Returns:
+        a new GameSession
+    """
+    # the session is played with the settings stored in the header, whatever the difficulty profiles of this machine are set to
+    return GameSession(tick_ms=header.tick_ms, lane_count=header.lane_count, chart_path=header.chart_path or None, seed=header.seed, input_offset=header.input_offset, spawn_offset=header.spawn_offset, settings=header.settings, versus=header.versus, rival_latency=header.rival_latency, song_sync=header.song_sync)
+
+
+def replay_match(replay_path: str, max_ticks: int = None):
+    """
+    This function re-simulates a recorded match as fast as possible, applying every recorded input on the exact tick it was applied on in the original match.
+
+    Args:
+        replay_path (str): path to the replay file written by GameSession.start_recording()
+        max_ticks (int | None): optional argument for the maximum number of ticks to simulate. The match is simulated until the tick it was closed on if None, or until the tick of its last recorded input if the recording was cut off before the match was closed.
+
+    Returns:
+        the GameSession in the state the recorded match ended in
+    """
+    header, records = load_replay(replay_path)
+
+    # the match is re-simulated with the settings it was recorded with
+    session = session_from_header(header)
+
+    # list of the input actions, indexed by the action index they are recorded as
+    actions = session.input_actions()
+
+    # obtaining the tick the match was closed on from the last record. A recording that was cut off, e.g. by a crash, has no END record, in which case nothing is known past its last recorded input.
+    last_tick = records[-1][0] if records else 0
+    if max_ticks is not None:
+        last_tick = min(last_tick, max_ticks)
+
+    index = 0
+    # while loop running one tick at a time until the last tick known from the recording
+    while session.tick_count < last_tick:
+        # collecting every input recorded for the next tick
+        inputs = []
+        while index < len(records) and records[index][0] == session.tick_count + 1:
+            tick, action_index, input_time = records[index]
+            if action_index != END_INDEX:
+                inputs.append(InputEvent(actions[action_index], input_time))
+            index += 1
+
+        session.step(session.tick_ms, inputs)
+
+    return session
@@ -0,0 +1,84 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import argparse
+import pygame
+from helper.load_img import IMAGE_FILES, DISPLAY_SIZES, img_dir, file_type, baked_dir, BAKED_ATLAS, BAKED_INDEX
+
+# width of the baked atlas image. Sprites are packed into rows (shelves) that are at most this wide.
+ATLAS_WIDTH = 512
+
+# number of transparent pixels left between sprites in the atlas so that neighbouring sprites never bleed into each other
+ATLAS_PADDING = 1
+
+
+def pack_sprites(sizes: dict, atlas_width: int = ATLAS_WIDTH, padding: int = ATLAS_PADDING):
+    """
+    This function decides where each sprite is placed in the atlas using simple shelf packing. Sprites are sorted from tallest to shortest and placed left to right, starting a new row whenever the current one is full.
+
+    Args:
+        sizes (dict): dictionary mapping the name of each sprite to its (width, height)
+        atlas_width (int): optional argument for the width of the atlas
+        padding (int): optional argument for the number of pixels left between sprites
+
+    Returns:
+        tuple of a dictionary mapping the name of each sprite to its [x, y, width, height] in the atlas, and the (width, height) of the atlas
+    """
+    placements = {}
+    x = y = shelf_height = 0
+
+    # for loop iterating through the sprites from tallest to shortest, which keeps the rows tightly packed
+    for name, (width, height) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        # if statement checking if the sprite no longer fits in the current row
+        if x + width > atlas_width:
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+
+        placements[name] = [x, y, width, height]
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+
+    return placements, (atlas_width, y + shelf_height)
+
+
+def bake(output_dir: str = baked_dir):
+    """
+    This function bakes every image declared in helper/load_img.py into a single atlas image at its exact display size, along with a JSON index of where each image is in the atlas.
+
+    Args:
+        output_dir (str): optional argument for the folder that the baked sprite pack is written to
+
+    Returns:
+        dictionary mapping the name of each image to its [x, y, width, height] in the atlas
+    """
+    placements, atlas_size = pack_sprites(DISPLAY_SIZES)
+
+    # creating a fully transparent atlas surface
+    atlas = pygame.Surface(atlas_size, pygame.SRCALPHA)
+    atlas.fill((0, 0, 0, 0))
+
+    # for loop scaling each full size image down to its display size and drawing it onto the atlas
+    for name, (x, y, width, height) in placements.items():
+        sub_dir, file_name = IMAGE_FILES[name]
+        image = pygame.image.load(os.path.join(img_dir, sub_dir, file_name + file_type))
+        atlas.blit(pygame.transform.scale(image, (width, height)), (x, y))
+
+    os.makedirs(output_dir, exist_ok=True)
+    pygame.image.save(atlas, os.path.join(output_dir, BAKED_ATLAS))
+
+    with open(os.path.join(output_dir, BAKED_INDEX), "w") as index_file:
+        json.dump({"image": BAKED_ATLAS, "sprites": placements}, index_file, sort_keys=True)
+
+    return placements
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bake the sprite images into a single atlas at their display sizes.")
+    parser.add_argument("--output", default=baked_dir, help="folder that the baked sprite pack is written to")
+    args = parser.parse_args()
+
+    placements = bake(args.output)
+    print(f"Baked {len(placements)} sprites into {os.path.join(args.output, BAKED_ATLAS)}")
@@ -0,0 +1,199 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import math
+import argparse
+import itertools
+import dataclasses
+import numpy as np
+from agents.judgement import PERFECT, GREAT, GOOD
+from agents.gamemaster import PLAYER_INTERVAL, TIME_TOLERANCE
+from helper.settings import load_settings, load_profiles
+
+# number of matches simulated for every point of the parameter grid
+BALANCE_MATCHES = 100000
+
+# number of player and enemy round pairs a match is simulated for before it is counted as unfinished
+MAX_CYCLES = 100
+
+# share of the arrows the simulated player hits, and the share of those hits judged perfect, great and good
+HIT_RATE = 0.7
+JUDGEMENT_SHARES = (0.6, 0.3, 0.1)
+
+# length of a single simulation tick in milliseconds, being the fixed tick of the GameSession at its TICK_RATE of 60 ticks per second
+BALANCE_TICK_MS = 1000 / 60
+
+# seed of the random number generator, so that every run of the same grid gives the same results
+BALANCE_SEED = 1
+
+# percentiles of the match length reported for every point of the grid
+LENGTH_PERCENTILES = (50, 95)
+
+
+def cycle_schedule(settings, tick_ms: float = BALANCE_TICK_MS):
+    """
+    This function works out the timeline of a player round followed by an enemy round in a game played without a chart, as the GameSession plays it.
+
+    The timeline only depends on the settings, so it is worked out once tick by tick the same way as GameMaster.choose_next_arrow() and GameMaster.switch_player() do, and then shared by every simulated match. Every arrow is resolved at the time it reaches its BW arrow.
+
+    Args:
+        settings (GameSettings): settings of the game difficulty
+        tick_ms (float): optional argument for the length of a single simulation tick in milliseconds
+
+    Returns:
+        tuple of the length of the cycle in milliseconds and a list of (time, is_player, can_win) tuples of every arrow in the order they are resolved. can_win is True for a player arrow resolved while it is not the enemy's turn and the player's turn has not ended, which is the only time the player can win. The player's turn ends once its round has ended and its last arrow has been resolved, so the last arrow of a round cannot win the match.
+    """
+    # obtaining the ticks the arrows of a round are sent out on, counted from the tick the round starts on. The first arrow of every round, including the first round of the match, is sent out straight away.
+    spawn_ticks = []
+    tick = 0
+    while True:
+        if not spawn_ticks or (tick - spawn_ticks[-1]) * tick_ms >= settings.arrow_interval - TIME_TOLERANCE:
+            # the round ends on the first tick an arrow is due after the round duration has passed
+            if tick * tick_ms >= settings.round_duration - TIME_TOLERANCE:
+                break
+            spawn_ticks.append(tick)
+        tick += 1
+
+    # the round ends on the tick it stops sending out arrows, and the other round starts on the first tick PLAYER_INTERVAL milliseconds after it
+    round_ms = tick * tick_ms
+    gap_ms = math.ceil((PLAYER_INTERVAL - TIME_TOLERANCE) / tick_ms) * tick_ms
+    enemy_start = round_ms + gap_ms
+    enemy_end = enemy_start + spawn_ticks[-1] * tick_ms + settings.arrow_travel_time
+
+    events = []
+    for spawn_tick in spawn_ticks:
+        hit_time = spawn_tick * tick_ms + settings.arrow_travel_time
+        # the player's turn is over when the last arrow of the round is resolved after the round has ended, as no player arrow is left in the game
+        players_turn = spawn_tick != spawn_ticks[-1] or hit_time < round_ms
+        events.append((hit_time, True, players_turn and not enemy_start <= hit_time <= enemy_end))
+        events.append((enemy_start + hit_time, False, False))
+
+    return 2 * (round_ms + gap_ms), sorted(events)
+
+
+def simulate(settings, matches: int = BALANCE_MATCHES, hit_rate: float = HIT_RATE, judgement_shares: tuple = JUDGEMENT_SHARES, seed: int = BALANCE_SEED, max_cycles: int = MAX_CYCLES):
+    """
+    This function simulates a batch of matches at once with NumPy, each match being a column of the same arrays, following the rules of a GameSession played without a chart.
+
+    The player gains hp for every arrow hit and loses it for every arrow missed, and loses hp every time the enemy scores, with the same whole number hp as the GreenHealthBar. The player loses once the hp reaches 0, and wins once it reaches the maximum hp during the player's turn.
+
+    Args:
+        settings (GameSettings): settings of the game difficulty
+        matches (int): optional argument for the number of matches simulated
+        hit_rate (float): optional argument for the probability of the player hitting an arrow
+        judgement_shares (tuple): optional argument for the share of the hits judged perfect, great and good
+        seed (int): optional argument for the seed of the random number generator
+        max_cycles (int): optional argument for the number of player and enemy round pairs a match is simulated for before it is counted as unfinished
+
+    Returns:
+        dictionary of arrays of the result of every match: "won" and "lost" are boolean arrays, and "length" holds the number of seconds from the start of the match to its end, or NaN if it is unfinished
+    """
+    rng = np.random.default_rng(seed)
+    cycle_ms, events = cycle_schedule(settings)
+
+    # obtaining the cumulative probability of each judgement of a player arrow, and the hp it changes by
+    thresholds = np.cumsum([hit_rate * share for share in judgement_shares])
+    gains = np.array([settings.judgement_gain[PERFECT], settings.judgement_gain[GREAT], settings.judgement_gain[GOOD], -settings.hp_loss])
+
+    # the state of the matches that have not ended yet. They are compacted after every cycle, so that matches which have ended are no longer simulated.
+    index = np.arange(matches)
+    hp = np.full(matches, settings.max_hp // 2)
+    won = np.zeros(matches, dtype=bool)
+    lost = np.zeros(matches, dtype=bool)
+    length = np.full(matches, np.nan)
+
+    # for loop running every arrow of every cycle for all matches that have not ended yet at once
+    for cycle in range(max_cycles):
+        rolls = rng.random((len(events), len(index)))
+        active = np.ones(len(index), dtype=bool)
+
+        for event, (event_time, is_player, can_win) in enumerate(events):
+            # if statement checking if the arrow is the player's, whose judgement is the first threshold the roll is below
+            if is_player:
+                change = gains[np.searchsorted(thresholds, rolls[event], side="right")]
+            else:
+                # the enemy scores if its roll is at least its miss probability
+                change = np.where(rolls[event] >= settings.enemy_miss_probability, -settings.enemy_score_loss, 0)
+
+            hp = np.where(active, np.clip(hp + change, 0, settings.max_hp), hp)
+
+            # ending every match whose player has run out of hp, or has full hp during the player's turn
+            newly_lost = active & (hp <= 0)
+            ended = newly_lost | (active & (hp >= settings.max_hp)) if can_win else newly_lost
+            if ended.any():
+                lost[index[newly_lost]] = True
+                won[index[ended & ~newly_lost]] = True
+                length[index[ended]] = (cycle * cycle_ms + event_time) / 1000
+                active &= ~ended
+
+        # keeping only the matches that have not ended
+        index = index[active]
+        hp = hp[active]
+        if not len(index):
+            break
+
+    return {"won": won, "lost": lost, "length": length}
+
+
+def summarise(results: dict):
+    """
+    This function summarises the results of a batch of simulated matches.
+
+    Args:
+        results (dict): the results returned by simulate()
+
+    Returns:
+        dictionary of the win rate, loss rate and share of unfinished matches, and the mean and percentiles of the length in seconds of the finished matches
+    """
+    matches = len(results["won"])
+    lengths = results["length"][~np.isnan(results["length"])]
+    summary = {
+        "win_rate": results["won"].sum() / matches,
+        "loss_rate": results["lost"].sum() / matches,
+        "unfinished": (matches - len(lengths)) / matches,
+        "mean_s": lengths.mean() if len(lengths) else math.nan,
+    }
+    for percent in LENGTH_PERCENTILES:
+        summary[f"p{percent}_s"] = np.percentile(lengths, percent) if len(lengths) else math.nan
+    return summary
+
+
+def parameter_grid(settings, **axes):
+    """
+    This function creates the settings of every combination of the given values, starting from the settings of a difficulty.
+
+    Args:
+        settings (GameSettings): settings the grid starts from
+        **axes: every setting to vary, mapped to the list of values it takes. Settings without values keep the value of settings.
+
+    Returns:
+        list of GameSettings, one for every combination
+    """
+    axes = {name: values for name, values in axes.items() if values}
+    return [dataclasses.replace(settings, **dict(zip(axes, values))) for values in itertools.product(*axes.values())]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate a large number of matches for every combination of difficulty settings and report the win rate and match length of each.")
+    parser.add_argument("--difficulty", nargs="+", choices=list(load_profiles()), default=list(load_profiles()), help="difficulties the grid starts from")
+    parser.add_argument("--arrow-interval", nargs="+", type=float, help="arrow intervals in milliseconds to try")
+    parser.add_argument("--enemy-miss-probability", nargs="+", type=float, help="enemy miss probabilities to try")
+    parser.add_argument("--percentage-loss", nargs="+", type=int, help="percentage losses to try")
+    parser.add_argument("--percentage-gain", nargs="+", type=int, help="percentage gains to try")
+    parser.add_argument("--hit-rate", nargs="+", type=float, default=[HIT_RATE], help="shares of the arrows the player hits to try")
+    parser.add_argument("--judgement-shares", nargs=3, type=float, default=JUDGEMENT_SHARES, metavar=("PERFECT", "GREAT", "GOOD"), help="shares of the hits judged perfect, great and good")
+    parser.add_argument("--matches", type=int, default=BALANCE_MATCHES, help="number of matches simulated for every point of the grid")
+    parser.add_argument("--seed", type=int, default=BALANCE_SEED, help="seed of the random number generator")
+    args = parser.parse_args()
+
+    print(f"{'difficulty':<12}{'interval':>9}{'e_miss':>8}{'loss':>6}{'gain':>6}{'hit':>6}{'win':>8}{'lose':>8}{'unfin':>8}{'mean_s':>9}" + "".join(f"{f'p{percent}_s':>9}" for percent in LENGTH_PERCENTILES))
+    for difficulty in args.difficulty:
+        grid = parameter_grid(load_settings(difficulty), arrow_interval=args.arrow_interval, enemy_miss_probability=args.enemy_miss_probability, percentage_loss=args.percentage_loss, percentage_gain=args.percentage_gain)
+        for settings, hit_rate in itertools.product(grid, args.hit_rate):
+            summary = summarise(simulate(settings, args.matches, hit_rate, tuple(args.judgement_shares), args.seed))
+            print(
+                f"{settings.difficulty:<12}{settings.arrow_interval:>9g}{settings.enemy_miss_probability:>8g}{settings.percentage_loss:>6}{settings.percentage_gain:>6}{hit_rate:>6g}"
+                f"{summary['win_rate']:>8.1%}{summary['loss_rate']:>8.1%}{summary['unfinished']:>8.1%}{summary['mean_s']:>9.1f}"
+                + "".join(f"{summary[f'p{percent}_s']:>9.1f}" for percent in LENGTH_PERCENTILES)
+            )
@@ -0,0 +1,394 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import time
+import argparse
+import subprocess
+import tracemalloc
+
+# every scenario runs without a window or sound
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+# difficulties the steady state scenario is run at
+DIFFICULTIES = ("easy", "medium", "hard", "extreme")
+
+# number of frames run by the steady state and stress scenarios, being 20 seconds at 60 FPS
+BENCHMARK_FRAMES = 1200
+
+# number of times each scenario is run. The best result of each metric is kept, as anything else running on the machine can only make a run slower.
+BENCHMARK_REPEATS = 3
+
+# number of frames the allocations of a scenario are traced for. This is a separate shorter run, as tracing allocations slows the game down and would skew the frames per second.
+TRACED_FRAMES = 300
+
+# number of arrows kept on screen by the stress scenario
+STRESS_ARROWS = 1000
+
+# number of times every image is loaded by the asset load scenario
+ASSET_LOAD_ROUNDS = 20
+
+# share of the arrows the auto player of the steady state scenario hits
+HIT_RATE = 0.7
+
+# seed of every scenario, so that each run plays exactly the same game
+BENCHMARK_SEED = 1
+
+# percentage a metric can get worse by compared to the baseline before it is reported as a regression
+REGRESSION_THRESHOLD = 10
+
+# default path of the saved baseline
+BASELINE_FILE = "benchmark_baseline.json"
+
+# dictionary mapping each metric to whether a higher value is better
+HIGHER_IS_BETTER = {
+    "fps": True,
+    "images_per_sec": True,
+    "ms": False,
+    "alloc_peak_kib": False,
+    "alloc_growth_kib": False,
+}
+
+
+def measure_allocations(run, *args):
+    """
+    This function traces the memory allocated by a run of a scenario with tracemalloc.
+
+    Args:
+        run (function): function running the scenario
+        *args: arguments passed to run
+
+    Returns:
+        dictionary of the peak memory allocated while running in KiB, and the memory still allocated once it has finished in KiB
+    """
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    run(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"alloc_peak_kib": round((peak - start) / 1024, 1), "alloc_growth_kib": round((current - start) / 1024, 1)}
+
+
+def cold_start():
+    """
+    This scenario measures the time from the start of the process to the first frame being drawn, including importing the game and loading its images.
+
+    Args:
+        None
+
+    Returns:
+        dictionary of the metrics of the scenario
+    """
+    start = time.perf_counter()
+    pygame.init()
+    screen = pygame.display.set_mode((int(os.getenv("WIDTH", 400)), int(os.getenv("HEIGHT", 600))))
+
+    # the game is imported here to include its import time, as importing it loads the images used as default arguments
+    from agents.session import GameSession
+    from helper.renderer import Renderer
+
+    session = GameSession(seed=BENCHMARK_SEED)
+    session.add_observer(Renderer(screen))
+    session.step(0)
+    return {"ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+def play_steady(screen, frames: int):
+    """
+    This function plays the game with an auto player for a number of frames, drawing every frame. A new game is started whenever a game is over, so every frame is a frame of play.
+
+    Args:
+        screen (Surface): the display surface the game is drawn on
+        frames (int): number of frames to be played
+
+    Returns:
+        None
+    """
+    import random
+    from agents.session import GameSession, START, TICK_MS
+    from helper.renderer import Renderer
+
+    renderer = Renderer(screen)
+    auto_player = random.Random(BENCHMARK_SEED)
+    session = None
+
+    for _ in range(frames):
+        # if statement checking if a new game has to be started
+        if session is None or session.game_over:
+            session = GameSession(seed=BENCHMARK_SEED)
+            session.step(1000)
+            session.step(0, [START])
+            session.add_observer(renderer)
+
+        # pressing the key of every lane whose head arrow reaches its BW arrow on this frame, missing some of them on purpose
+        inputs = []
+        for lane in session.lanes:
+            arrow = lane.player_queue.head()
+            if arrow is not None and abs(session.clock.get_ticks() - arrow.hit_time) <= TICK_MS / 2 and auto_player.random() < HIT_RATE:
+                inputs.append(lane.name)
+
+        session.step(TICK_MS, inputs)
+
+
+def steady_state():
+    """
+    This scenario measures the frames per second of normal play at the GAME_DIFFICULTY of the process.
+
+    Args:
+        None
+
+    Returns:
+        dictionary of the metrics of the scenario
+    """
+    pygame.init()
+    screen = pygame.display.set_mode((int(os.getenv("WIDTH", 400)), int(os.getenv("HEIGHT", 600))))
+
+    # playing a short warm up so that images and fonts are loaded before timing
+    play_steady(screen, 60)
+
+    start = time.perf_counter()
+    play_steady(screen, BENCHMARK_FRAMES)
+    elapsed = time.perf_counter() - start
+
+    return {"fps": round(BENCHMARK_FRAMES / elapsed, 1), **measure_allocations(play_steady, screen, TRACED_FRAMES)}
+
+
+def run_stress(screen, frames: int):
+    """
+    This function keeps STRESS_ARROWS player arrows on screen for a number of frames, moving, drawing and checking every arrow as the session does.
+
+    Args:
+        screen (Surface): the display surface the arrows are drawn on
+        frames (int): number of frames to be run
+
+    Returns:
+        None
+    """
+    import random
+    from agents.arrows import ArrowPool
+    from agents.lanes import create_lanes
+    from agents.session import TICK_MS
+    from helper.game_clock import SimulationClock
+    from helper.settings import game_settings
+
+    clock = SimulationClock()
+    pool = ArrowPool(clock)
+    lanes = create_lanes(clock = clock)
+    arrows = pygame.sprite.Group()
+    spawner = random.Random(BENCHMARK_SEED)
+
+    # filling the screen with arrows spread out over the time an arrow takes to reach its BW arrow. They are sent out from the oldest to the newest, so that every lane queue stays in order.
+    clock.advance(game_settings.arrow_travel_time)
+    spawn_times = sorted(spawner.random() * game_settings.arrow_travel_time for _ in range(STRESS_ARROWS))
+
+    for _ in range(frames):
+        clock.advance(TICK_MS)
+
+        # sending out arrows until there are STRESS_ARROWS on screen again. Arrows sent out after the first frame all start at the bottom of the screen.
+        while len(arrows) < STRESS_ARROWS:
+            lane = spawner.choice(lanes)
+            arrow = pool.acquire(True, lane.centerx, lane.player_image, lane.name, spawn_times.pop(0) if spawn_times else clock.get_ticks(), size=lane.arrow_size)
+            arrow.update()
+            lane.player_queue.push(arrow)
+            arrows.add(arrow)
+
+        arrows.update()
+
+        # killing every arrow that has reached its BW arrow, in the same pass as the misses of the session
+        for lane in lanes:
+            while (arrow := lane.player_queue.pop_passed(clock.get_ticks())) is not None:
+                arrow.kill()
+
+        screen.fill((0, 0, 0))
+        arrows.draw(screen)
+        pygame.display.flip()
+
+
+def stress():
+    """
+    This scenario measures the frames per second with STRESS_ARROWS arrows on screen at once.
+
+    Args:
+        None
+
+    Returns:
+        dictionary of the metrics of the scenario
+    """
+    pygame.init()
+    screen = pygame.display.set_mode((int(os.getenv("WIDTH", 400)), int(os.getenv("HEIGHT", 600))))
+    run_stress(screen, 60)
+
+    start = time.perf_counter()
+    run_stress(screen, BENCHMARK_FRAMES)
+    elapsed = time.perf_counter() - start
+
+    return {"fps": round(BENCHMARK_FRAMES / elapsed, 1), **measure_allocations(run_stress, screen, TRACED_FRAMES)}
+
+
+def load_all_images(rounds: int):
+    """
+    This function loads every image of the game from disk a number of times, each time into a new AssetRegistry so that nothing is reused.
+
+    Args:
+        rounds (int): number of times every image is loaded
+
+    Returns:
+        None
+    """
+    from helper.load_img import AssetRegistry, LoadImage
+
+    for _ in range(rounds):
+        LoadImage(AssetRegistry()).load_images()
+
+
+def asset_load():
+    """
+    This scenario measures how many images are loaded per second. The baked sprite pack is used if it has been baked.
+
+    Args:
+        None
+
+    Returns:
+        dictionary of the metrics of the scenario
+    """
+    from helper.load_img import IMAGE_FILES, baked_dir, BAKED_INDEX
+
+    pygame.init()
+    pygame.display.set_mode((int(os.getenv("WIDTH", 400)), int(os.getenv("HEIGHT", 600))))
+
+    start = time.perf_counter()
+    load_all_images(ASSET_LOAD_ROUNDS)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "images_per_sec": round(ASSET_LOAD_ROUNDS * len(IMAGE_FILES) / elapsed, 1),
+        "baked": os.path.exists(os.path.join(baked_dir, BAKED_INDEX)),
+        **measure_allocations(load_all_images, 1),
+    }
+
+
+# dictionary mapping each scenario to the function running it
+SCENARIOS = {
+    "cold_start": cold_start,
+    "steady_state": steady_state,
+    "stress": stress,
+    "asset_load": asset_load,
+}
+
+
+def run_scenario(scenario: str, difficulty: str = None):
+    """
+    This function runs a scenario BENCHMARK_REPEATS times, each in a new process, so that every run starts from a cold interpreter and can be run at its own GAME_DIFFICULTY, which is only read when the game is imported.
+
+    Args:
+        scenario (str): name of the scenario, being a key of SCENARIOS
+        difficulty (str | None): optional argument for the GAME_DIFFICULTY the scenario is run at. The difficulty in the .env is used if None.
+
+    Returns:
+        dictionary of the best value of each metric of the scenario
+    """
+    env = dict(os.environ)
+    if difficulty is not None:
+        env["GAME_DIFFICULTY"] = difficulty
+
+    best = {}
+    for _ in range(BENCHMARK_REPEATS):
+        output = subprocess.run([sys.executable, __file__, "--run", scenario], env = env, capture_output = True, text = True, check = True).stdout
+
+        # the metrics are printed as JSON on the last line of the output, after anything printed by pygame
+        for metric, value in json.loads(output.strip().splitlines()[-1]).items():
+            # if statement checking if the metric has been measured before and can be compared
+            if metric in best and metric in HIGHER_IS_BETTER:
+                value = max(value, best[metric]) if HIGHER_IS_BETTER[metric] else min(value, best[metric])
+            best[metric] = value
+    return best
+
+
+def run_all():
+    """
+    This function runs every scenario, running the steady state scenario once for every difficulty.
+
+    Args:
+        None
+
+    Returns:
+        dictionary mapping each scenario name to its metrics
+    """
+    results = {}
+    for scenario in SCENARIOS:
+        # if statement checking if the scenario is run once for every difficulty
+        if scenario == "steady_state":
+            for difficulty in DIFFICULTIES:
+                results[f"steady_state_{difficulty}"] = run_scenario(scenario, difficulty)
+        else:
+            results[scenario] = run_scenario(scenario)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float = REGRESSION_THRESHOLD):
+    """
+    This function prints every metric next to its baseline and the percentage it has changed by.
+
+    Args:
+        results (dict): metrics of the current run, as returned by run_all()
+        baseline (dict): metrics of the baseline run
+        threshold (float): optional argument for the percentage a metric can get worse by before it counts as a regression
+
+    Returns:
+        list of the "scenario.metric" names that have regressed
+    """
+    regressions = []
+    print(f"{'scenario':<24}{'metric':<18}{'baseline':>12}{'current':>12}{'change':>10}")
+    for scenario, metrics in results.items():
+        for metric, value in metrics.items():
+            # if statement checking if the metric can be compared against the baseline
+            if metric not in HIGHER_IS_BETTER or metric not in baseline.get(scenario, {}):
+                continue
+
+            old_value = baseline[scenario][metric]
+            change = (value - old_value) / old_value * 100 if old_value else 0
+
+            # a change counts as a regression if it makes the metric worse by more than the threshold
+            worse = -change if HIGHER_IS_BETTER[metric] else change
+            flag = ""
+            if worse > threshold:
+                regressions.append(f"{scenario}.{metric}")
+                flag = "  REGRESSION"
+
+            print(f"{scenario:<24}{metric:<18}{old_value:>12}{value:>12}{change:>+9.1f}%{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the game loop, the spawn path and asset loading without a window.")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="path to the saved baseline")
+    parser.add_argument("--save", action="store_true", help="save the results as the new baseline instead of comparing against it")
+    parser.add_argument("--run", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # if statement checking if this process has been started to run a single scenario
+    if args.run:
+        print(json.dumps(SCENARIOS[args.run]()))
+        sys.exit(0)
+
+    results = run_all()
+
+    # if statement checking if the results should be saved or compared against the saved baseline
+    if args.save or not os.path.exists(args.baseline):
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(json.dumps(results, indent=2))
+        print(f"baseline saved to {args.baseline}")
+    else:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline)
+
+        # exiting with an error so that a regression fails the run when used in a script
+        if regressions:
+            print(f"{len(regressions)} metrics regressed by more than {REGRESSION_THRESHOLD}%: {', '.join(regressions)}")
+            sys.exit(1)
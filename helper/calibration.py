@@ -0,0 +1,224 @@
+import os
+import json
+import math
+import time
+import array
+import pygame
+from statistics import median
+from dotenv import load_dotenv
+
+# loading the path of this machine's calibration file from .env
+load_dotenv()
+CALIBRATION_FILE = os.getenv("CALIBRATION_FILE", "calibration.json")
+
+# number of milliseconds between two beats of the metronome
+BEAT_MS = 600
+
+# number of beats played in each phase of the calibration, and the number of beats at its start that are not measured while the player gets into the rhythm
+CALIBRATION_BEATS = 20
+WARMUP_BEATS = 4
+
+# taps further than this many median absolute deviations from the median offset are left out as mistakes
+OUTLIER_DEVIATIONS = 3
+
+# length of the metronome click in milliseconds and its pitch in hertz
+CLICK_MS = 30
+CLICK_PITCH = 1000
+
+# tuple representing the RGB values of the calibration screen
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+
+
+class Calibration:
+    """
+    The Calibration class holds the latency offsets measured on this machine, which are saved to a JSON file so that they only have to be measured once.
+
+    Both offsets include the time between a key being pressed and the game receiving it, and the player's own reaction, which is why they are measured together.
+
+    Args:
+        audio_offset (float): optional argument for the number of milliseconds taps land after a beat that is heard
+        visual_offset (float): optional argument for the number of milliseconds taps land after a beat that is seen
+
+    Attributes:
+        audio_offset (float): number of milliseconds taps land after a beat that is heard
+        visual_offset (float): number of milliseconds taps land after a beat that is seen
+    """
+    def __init__(self, audio_offset: float = 0, visual_offset: float = 0):
+        self.audio_offset = audio_offset
+        self.visual_offset = visual_offset
+
+    @property
+    def input_offset(self):
+        """
+        The number of milliseconds a key press is moved back by before it is judged, as the player presses keys this much after seeing an arrow reach its BW arrow.
+        """
+        return self.visual_offset
+
+    @property
+    def spawn_offset(self):
+        """
+        The number of milliseconds arrows are sent out later by, so that they reach their BW arrow at the time their beat is heard rather than the time it is played.
+        """
+        return self.audio_offset - self.visual_offset
+
+    def save(self, path: str = CALIBRATION_FILE):
+        """
+        This method writes the offsets to a calibration file.
+
+        Args:
+            path (str): optional argument for the path to the calibration file
+
+        Returns:
+            None
+        """
+        with open(path, "w") as calibration_file:
+            json.dump({"audio_offset": self.audio_offset, "visual_offset": self.visual_offset}, calibration_file, indent=2)
+
+    @classmethod
+    def load(cls, path: str = CALIBRATION_FILE):
+        """
+        This method reads the offsets from a calibration file.
+
+        Args:
+            path (str): optional argument for the path to the calibration file
+
+        Returns:
+            the Calibration read from the file, or a Calibration with no offsets if this machine has not been calibrated
+        """
+        # if statement checking if this machine has been calibrated
+        if not os.path.exists(path):
+            return cls()
+
+        with open(path) as calibration_file:
+            offsets = json.load(calibration_file)
+        return cls(offsets.get("audio_offset", 0), offsets.get("visual_offset", 0))
+
+
+def robust_offset(offsets: list):
+    """
+    This function computes the mean of a list of tap offsets, leaving out taps that are far from the rest, such as a double tap or a missed beat.
+
+    Args:
+        offsets (list): the offsets of each tap from its beat in milliseconds
+
+    Returns:
+        float of the mean offset of the remaining taps, or 0 if there are no taps
+    """
+    if not offsets:
+        return 0
+
+    # obtaining the median and the median absolute deviation, which a few outliers cannot move far
+    middle = median(offsets)
+    deviation = median(abs(offset - middle) for offset in offsets)
+
+    # leaving out every tap further than OUTLIER_DEVIATIONS deviations from the median. All taps are kept if they are all the same distance from it.
+    kept = [offset for offset in offsets if deviation == 0 or abs(offset - middle) <= OUTLIER_DEVIATIONS * deviation]
+    return sum(kept) / len(kept)
+
+
+def create_click():
+    """
+    This function creates the sound of the metronome click, a short sine wave fading out, in the format the mixer has been initialized with.
+
+    Args:
+        None
+
+    Returns:
+        Sound of the click
+    """
+    frequency, size, channels = pygame.mixer.get_init()
+    sample_count = frequency * CLICK_MS // 1000
+    amplitude = 2 ** (abs(size) - 1) - 1
+
+    # writing each sample once for every channel
+    samples = array.array("h" if abs(size) == 16 else "b")
+    for index in range(sample_count):
+        value = int(amplitude * 0.5 * (1 - index / sample_count) * math.sin(2 * math.pi * CLICK_PITCH * index / frequency))
+        samples.extend([value] * channels)
+    return pygame.mixer.Sound(buffer=samples.tobytes())
+
+
+def run_phase(screen, font, title: str, play_sound: bool, show_flash: bool):
+    """
+    This function runs a single phase of the calibration: a metronome the player taps along to with the space bar, either heard or seen.
+
+    Key presses are polled every millisecond and stamped on arrival, and each tap is matched to its nearest beat.
+
+    Args:
+        screen (Surface): the display surface
+        font (Font): font used for the instructions
+        title (str): instructions shown during the phase
+        play_sound (bool): boolean value indicating that the metronome clicks are played
+        show_flash (bool): boolean value indicating that the metronome beats are shown as a flash
+
+    Returns:
+        list of the offsets of each measured tap from its beat in milliseconds, or None if the calibration has been cancelled
+    """
+    click = create_click() if play_sound else None
+    width, height = screen.get_size()
+    flash_rect = pygame.Rect(0, 0, width / 3, width / 3)
+    flash_rect.center = (width / 2, height / 2)
+
+    offsets = []
+    start = time.perf_counter() * 1000 + BEAT_MS
+    next_beat = 0
+    lit = None
+
+    # while loop running until a beat after the last one, so that late taps on the last beat are still measured
+    while (now := time.perf_counter() * 1000) < start + CALIBRATION_BEATS * BEAT_MS:
+        # if statement checking if the next beat is due
+        if next_beat < CALIBRATION_BEATS and now >= start + next_beat * BEAT_MS:
+            if click is not None:
+                click.play()
+            lit = next_beat if show_flash else None
+            next_beat += 1
+
+        for event in pygame.event.get():
+            # if statement checking if the calibration has been cancelled
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                return None
+
+            # if statement checking if the player has tapped, in which case the tap is matched to its nearest beat
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                beat = round((now - start) / BEAT_MS)
+                if WARMUP_BEATS <= beat < CALIBRATION_BEATS:
+                    offsets.append(now - start - beat * BEAT_MS)
+
+        # drawing the instructions, and the flash for the first 100 milliseconds of each beat
+        screen.fill(BLACK)
+        text = font.render(title, True, WHITE)
+        screen.blit(text, text.get_rect(center=(width / 2, height / 4)))
+        if lit is not None and now - (start + lit * BEAT_MS) < 100:
+            screen.fill(WHITE, flash_rect)
+        pygame.display.flip()
+
+        time.sleep(0.001)
+
+    return offsets
+
+
+def run_calibration(screen, path: str = CALIBRATION_FILE):
+    """
+    This function runs the calibration screen and saves the measured offsets. The player taps the space bar along to a metronome that is first only heard and then only seen.
+
+    Args:
+        screen (Surface): the display surface
+        path (str): optional argument for the path to the calibration file
+
+    Returns:
+        the measured Calibration, or None if the calibration has been cancelled
+    """
+    font = pygame.font.SysFont(None, 28)
+
+    audio_offsets = run_phase(screen, font, "Tap SPACE on every click", play_sound=True, show_flash=False)
+    if audio_offsets is None:
+        return None
+
+    visual_offsets = run_phase(screen, font, "Tap SPACE on every flash", play_sound=False, show_flash=True)
+    if visual_offsets is None:
+        return None
+
+    calibration = Calibration(round(robust_offset(audio_offsets), 1), round(robust_offset(visual_offsets), 1))
+    calibration.save(path)
+    return calibration
@@ -0,0 +1,111 @@
+from collections import namedtuple
+
+# a single note of a chart. time is the millisecond the arrow should reach its BW arrow, counted from the start of the chart, lane is the name of the lane the arrow is sent out in, and hold is the number of milliseconds the key should be held down for (0 for a single tap).
+Note = namedtuple("Note", ["time", "lane", "hold"])
+
+# largest time and hold length of a note, in milliseconds, which are stored as int32 values
+NOTE_TIME_MAX = 2**31 - 1
+
+# character starting a comment in a chart file
+COMMENT = "#"
+
+
+def parse_note(line: str, line_number: int = 0):
+    """
+    This function parses a single line of a chart file.
+
+    Each line of a chart file is a note written as "<time> <lane> [<hold>]", e.g. "1500 left" or "3000 up 400". Blank lines and everything after a "#" are ignored.
+
+    Args:
+        line (str): a line of the chart file
+        line_number (int): optional argument for the line number of the line, used in error messages
+
+    Returns:
+        the Note written on the line, or None if the line has no note
+    """
+    # removing comments and surrounding whitespace from the line
+    fields = line.split(COMMENT, 1)[0].split()
+
+    # if statement checking if the line is blank
+    if not fields:
+        return None
+
+    if len(fields) not in (2, 3):
+        raise ValueError(f"line {line_number}: expected '<time> <lane> [<hold>]', got {line.strip()!r}")
+
+    try:
+        time = int(fields[0])
+        hold = int(fields[2]) if len(fields) == 3 else 0
+    except ValueError:
+        raise ValueError(f"line {line_number}: time and hold must be whole milliseconds, got {line.strip()!r}") from None
+
+    if time < 0 or hold < 0:
+        raise ValueError(f"line {line_number}: time and hold cannot be negative, got {line.strip()!r}")
+
+    # if statement checking if the end of the note's tail can still be stored
+    if time + hold > NOTE_TIME_MAX:
+        raise ValueError(f"line {line_number}: time and hold cannot add up to more than {NOTE_TIME_MAX} ms, got {line.strip()!r}")
+
+    return Note(time, fields[1], hold)
+
+
+def read_notes(chart_path: str, lane_names = None):
+    """
+    This function reads the notes of a chart file in order of time, one line at a time, so the notes are never held as Note tuples all at once.
+
+    Every note is checked as it is read, and errors are reported with the line of the note: notes must be sorted by time, a note cannot start before the hold note before it in the same lane has ended, as its key is still held down, and every note must be in one of the lanes of the game if they are given.
+
+    Args:
+        chart_path (str): path to the chart file
+        lane_names (collection | None): optional argument for the names of the lanes of the game. The lanes of the notes are not checked if None.
+
+    Returns:
+        generator of the Notes of the chart
+    """
+    last_time = 0
+
+    # dictionary mapping the name of each lane to the end of the tail of its last note and the line of that note
+    lane_ends = {}
+
+    with open(chart_path) as chart_file:
+        for line_number, line in enumerate(chart_file, 1):
+            note = parse_note(line, line_number)
+            if note is None:
+                continue
+
+            # notes have to be sorted so that they can be played without scanning the whole chart
+            if note.time < last_time:
+                raise ValueError(f"{chart_path} line {line_number}: notes must be sorted by time")
+
+            # if statement checking if the note is in a lane the game does not have
+            if lane_names is not None and note.lane not in lane_names:
+                raise ValueError(f"{chart_path} line {line_number}: unknown lane {note.lane!r}, expected one of {', '.join(sorted(lane_names))}")
+
+            # if statement checking if the note starts while the key of its lane is still held down for a hold note
+            hold_end, hold_line = lane_ends.get(note.lane, (0, 0))
+            if note.time < hold_end:
+                raise ValueError(f"{chart_path} line {line_number}: note starts before the hold note on line {hold_line} in lane {note.lane!r} has ended at {hold_end} ms")
+
+            last_time = note.time
+            lane_ends[note.lane] = (note.time + note.hold, line_number)
+            yield note
+
+
+def save_chart(chart_path: str, notes):
+    """
+    This function writes notes to a chart file in the format read by read_notes().
+
+    Args:
+        chart_path (str): path to the chart file
+        notes (iterable): the Notes of the chart, sorted by time
+
+    Returns:
+        None
+    """
+    with open(chart_path, "w") as chart_file:
+        for note in notes:
+            # the hold length is only written for hold notes to keep the file compact
+            if note.hold:
+                chart_file.write(f"{note.time} {note.lane} {note.hold}\n")
+            else:
+                chart_file.write(f"{note.time} {note.lane}\n")
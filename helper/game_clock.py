@@ -0,0 +1,67 @@
+import pygame
+
+
+class GameClock:
+    """
+    This class is the time source used by the game objects to obtain the current timestamp.
+
+    The default GameClock simply returns the real time from pygame. Game objects take a clock as an argument so that a simulation can swap in a SimulationClock and run faster than real time.
+
+    Parameters:
+        None
+    """
+    def get_ticks(self):
+        """
+        This method returns the current timestamp in milliseconds.
+
+        Args:
+            None
+
+        Returns:
+            integer of the milliseconds since pygame.init() was called
+        """
+        return pygame.time.get_ticks()
+
+
+class SimulationClock(GameClock):
+    """
+    This class is a clock that only moves forward when it is advanced, which allows the game to be simulated without a window or real time passing.
+
+    This is a child class of the GameClock class.
+
+    Args:
+        start (float): optional argument for the starting timestamp in milliseconds
+
+    Attributes:
+        ticks (float): the current timestamp of the clock in milliseconds
+    """
+    def __init__(self, start: float = 0):
+        self.ticks = start
+
+    def get_ticks(self):
+        """
+        This method returns the current timestamp of the simulation in milliseconds.
+
+        Args:
+            None
+
+        Returns:
+            float of the current timestamp
+        """
+        return self.ticks
+
+    def advance(self, dt: float):
+        """
+        This method moves the clock forward.
+
+        Args:
+            dt (float): number of milliseconds to move the clock forward by
+
+        Returns:
+            None
+        """
+        self.ticks += dt
+
+
+# shared real time clock used by game objects that are not given a clock
+real_clock = GameClock()
@@ -0,0 +1,106 @@
+import os
+import time
+import pygame
+from collections import deque
+from dotenv import load_dotenv
+
+# loading the input settings from .env
+load_dotenv()
+INPUT_SAMPLING = os.getenv("INPUT_SAMPLING", "false").lower() == "true"
+
+# number of milliseconds the InputSampler sleeps between two polls of the event queue while waiting for the next frame
+INPUT_POLL_MS = 1
+
+
+class InputSampler:
+    """
+    The InputSampler class replaces the pygame Clock of the game loop, polling the event queue about every INPUT_POLL_MS milliseconds while waiting for the next frame instead of sleeping through it.
+
+    Every event is stamped with the time it was taken off the event queue and put into a queue of its own, which the game loop drains once per frame. Key presses are then judged at the time they were polled instead of the time the frame started, so their accuracy is no longer limited to a frame.
+
+    SDL only delivers events to the thread that created the window and pygame gives no access to SDL event watches, so the polling is done on the main thread during the time it would otherwise sleep. The queue is a deque, whose append and popleft are atomic, so events can also be put into it by another thread without a lock.
+
+    Args:
+        fps (int): frames per second the game loop is run at
+        poll_ms (float): optional argument for the number of milliseconds slept between two polls
+
+    Attributes:
+        frame_ms (float): number of milliseconds in a frame
+        poll_ms (float): number of milliseconds slept between two polls
+        events (deque): queue of (event, timestamp) tuples polled but not yet drained
+        last_frame (float): timestamp at which the last frame started
+    """
+    def __init__(self, fps: int, poll_ms: float = INPUT_POLL_MS):
+        self.frame_ms = 1000 / fps
+        self.poll_ms = poll_ms
+        self.events = deque()
+        self.last_frame = self.now()
+
+    def now(self):
+        """
+        This method returns the current high resolution timestamp in milliseconds.
+
+        Args:
+            None
+
+        Returns:
+            float of the current timestamp in milliseconds
+        """
+        return time.perf_counter() * 1000
+
+    def poll(self):
+        """
+        This method takes every event off the pygame event queue and puts it into the queue with the current timestamp.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        now = self.now()
+        for event in pygame.event.get():
+            self.events.append((event, now))
+
+    def tick(self):
+        """
+        This method waits until the next frame is due, polling the event queue while waiting. It is used in place of pygame's Clock.tick().
+
+        Args:
+            None
+
+        Returns:
+            float of the number of milliseconds passed since the last frame
+        """
+        deadline = self.last_frame + self.frame_ms
+
+        # while loop polling and sleeping in short slices until the next frame is due
+        while (now := self.now()) < deadline:
+            self.poll()
+            time.sleep(min(self.poll_ms, deadline - now) / 1000)
+        self.poll()
+
+        dt = now - self.last_frame
+
+        # the next frame is scheduled from this frame's deadline so that frames do not drift, unless the game has fallen more than a frame behind
+        self.last_frame = deadline if now - deadline < self.frame_ms else now
+        return dt
+
+    def drain(self):
+        """
+        This method takes every event out of the queue, in the order they were polled.
+
+        Args:
+            None
+
+        Returns:
+            list of (event, age) tuples, age being the number of milliseconds since the event was polled
+        """
+        now = self.now()
+        drained = []
+
+        # while loop taking events out from the front of the queue one by one
+        while self.events:
+            event, stamp = self.events.popleft()
+            drained.append((event, now - stamp))
+        return drained
@@ -1,8 +1,18 @@
 import pygame
+import json
+from collections import OrderedDict
 from os import path
 img_dir = path.abspath(path.join(path.dirname(__file__), '../resources'))
 file_type = ".png"
 
+# folder, atlas image and index of the baked sprite pack produced by helper/bake_assets.py
+baked_dir = path.join(img_dir, "baked")
+BAKED_ATLAS = "atlas.png"
+BAKED_INDEX = "atlas.json"
+
+# maximum number of scaled surfaces kept by the scaled surface cache before the least recently used one is evicted
+SCALED_CACHE_SIZE = 64
+
 # initializing the constants for the image names. Ensure that the images have a '.png' extension at the end of their file name.
 PLAYER_IDLE_1 = "OnslaughtIdle1"
 PLAYER_IDLE_2 = "OnslaughtIdle2"
@@ -41,21 +51,217 @@ RIGHT_ARROW_MISS= "RightArrowMiss"
 DOWN_ARROW_MISS = "DownArrowMiss"
 UP_ARROW_MISS = "UpArrowMiss"
 
+# dictionary mapping the attribute name of each image to the sub folder and file name of the image in the resources folder
+IMAGE_FILES = {
+    "player_idle_1": ("player sprites", PLAYER_IDLE_1),
+    "player_idle_2": ("player sprites", PLAYER_IDLE_2),
+    "player_attack_1": ("player sprites", PLAYER_ATTACK_1),
+    "player_attack_2": ("player sprites", PLAYER_ATTACK_2),
+    "player_lose": ("player sprites", PLAYER_LOSE),
+
+    "enemy_idle_1": ("enemy sprites", ENEMY_IDLE_1),
+    "enemy_idle_2": ("enemy sprites", ENEMY_IDLE_2),
+    "enemy_attack_1": ("enemy sprites", ENEMY_ATTACK_1),
+    "enemy_attack_2": ("enemy sprites", ENEMY_ATTACK_2),
+    "enemy_lose": ("enemy sprites", ENEMY_LOSE),
+
+    "left_arrow_player": ("arrow sprites", LEFT_ARROW_PLAYER),
+    "right_arrow_player": ("arrow sprites", RIGHT_ARROW_PLAYER),
+    "down_arrow_player": ("arrow sprites", DOWN_ARROW_PLAYER),
+    "up_arrow_player": ("arrow sprites", UP_ARROW_PLAYER),
+
+    "left_arrow_enemy": ("arrow sprites", LEFT_ARROW_ENEMY),
+    "right_arrow_enemy": ("arrow sprites", RIGHT_ARROW_ENEMY),
+    "down_arrow_enemy": ("arrow sprites", DOWN_ARROW_ENEMY),
+    "up_arrow_enemy": ("arrow sprites", UP_ARROW_ENEMY),
+
+    "left_arrow_bw": ("arrow sprites", LEFT_ARROW_BW),
+    "right_arrow_bw": ("arrow sprites", RIGHT_ARROW_BW),
+    "down_arrow_bw": ("arrow sprites", DOWN_ARROW_BW),
+    "up_arrow_bw": ("arrow sprites", UP_ARROW_BW),
+
+    "left_arrow_hit": ("arrow sprites", LEFT_ARROW_HIT),
+    "right_arrow_hit": ("arrow sprites", RIGHT_ARROW_HIT),
+    "down_arrow_hit": ("arrow sprites", DOWN_ARROW_HIT),
+    "up_arrow_hit": ("arrow sprites", UP_ARROW_HIT),
+
+    "left_arrow_miss": ("arrow sprites", LEFT_ARROW_MISS),
+    "right_arrow_miss": ("arrow sprites", RIGHT_ARROW_MISS),
+    "down_arrow_miss": ("arrow sprites", DOWN_ARROW_MISS),
+    "up_arrow_miss": ("arrow sprites", UP_ARROW_MISS),
+}
+
+# dictionary mapping the attribute name of each image to the (width, height) it is displayed at in game. The baked sprite pack stores every image at exactly this size.
+DISPLAY_SIZES = {name: (100, 100) for name in IMAGE_FILES if name.startswith(("player_", "enemy_"))}
+DISPLAY_SIZES.update({name: (50, 50) for name in IMAGE_FILES if name.endswith(("_player", "_enemy", "_bw"))})
+DISPLAY_SIZES.update({name: (52, 52) for name in IMAGE_FILES if name.endswith(("_hit", "_miss"))})
+DISPLAY_SIZES["player_lose"] = (125, 62)
+DISPLAY_SIZES["enemy_lose"] = (125, 62)
+
+def optimize(surface):
+    """
+    This function converts a freshly loaded image to the pixel format of the display for faster blitting.
+
+    The conversion needs a display to be created with pygame.display.set_mode(), so headless simulations without a display keep the image as it was loaded.
+
+    Args:
+        surface (Surface): freshly loaded image
+
+    Returns:
+        Surface of the converted image, or the image itself if there is no display
+    """
+    # if statement checking if there is no display to convert the image for
+    if pygame.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha()
+
+class AssetRegistry:
+    """
+    This class is a process-wide registry that decodes each sprite image in the resources folder at most once.
+
+    Images are only decoded the first time they are acquired. Every acquire() increases the reference count of the image and every release() decreases it, and an image is dropped from the registry once nothing references it anymore.
+
+    If a baked sprite pack (see helper/bake_assets.py) is present in the baked folder, images are cut out of its single atlas image instead of being decoded from the full size art.
+
+    Parameters:
+        baked_folder (str): optional argument for the folder containing the baked sprite pack
+
+    Attributes:
+        surfaces (dict): dictionary mapping the name of each decoded image to its pygame Surface
+        ref_counts (dict): dictionary mapping the name of each decoded image to the number of holders currently referencing it
+        baked_folder (str): folder containing the baked sprite pack
+        atlas (Surface | None): the decoded atlas image of the baked sprite pack, if it has been loaded
+        atlas_index (dict | None): dictionary mapping the name of each image to its [x, y, width, height] in the atlas. This is an empty dict if there is no baked sprite pack
+    """
+    def __init__(self, baked_folder: str = baked_dir):
+        self.surfaces = {}
+        self.ref_counts = {}
+        self.baked_folder = baked_folder
+        self.atlas = None
+        self.atlas_index = None
+
+    def load_atlas(self):
+        """
+        This method loads the index and atlas image of the baked sprite pack, if there is one. It is only ever run once.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        index_path = path.join(self.baked_folder, BAKED_INDEX)
+
+        # if statement checking if the sprite pack has not been baked
+        if not path.exists(index_path):
+            self.atlas_index = {}
+            return
+
+        with open(index_path) as index_file:
+            index = json.load(index_file)
+
+        self.atlas = optimize(pygame.image.load(path.join(self.baked_folder, index["image"])))
+        self.atlas_index = index["sprites"]
+
+    def decode(self, name: str):
+        """
+        This method decodes a single image, preferring the baked sprite pack over the full size art in the resources folder.
+
+        Args:
+            name (str): attribute name of the image as declared in IMAGE_FILES
+
+        Returns:
+            Surface of the image
+        """
+        # loading the baked sprite pack the first time any image is decoded
+        if self.atlas_index is None:
+            self.load_atlas()
+
+        # if statement checking if the image is in the baked sprite pack. The subsurface shares its pixels with the atlas, so no extra decode or copy is needed.
+        if name in self.atlas_index:
+            return self.atlas.subsurface(pygame.Rect(self.atlas_index[name]))
+
+        sub_dir, file_name = IMAGE_FILES[name]
+        return optimize(pygame.image.load(path.join(img_dir, sub_dir, file_name + file_type)))
+
+    def acquire(self, name: str):
+        """
+        This method returns the Surface of an image, decoding it from the resources folder if it has not been decoded yet.
+
+        Args:
+            name (str): attribute name of the image as declared in IMAGE_FILES, e.g. "up_arrow_player"
+
+        Returns:
+            Surface of the image
+        """
+        # if statement checking if the image has not been decoded by any module yet
+        if name not in self.surfaces:
+            self.surfaces[name] = self.decode(name)
+            self.ref_counts[name] = 0
+
+        # increasing the reference count of the image as it has a new holder
+        self.ref_counts[name] += 1
+        return self.surfaces[name]
+
+    def release(self, name: str):
+        """
+        This method releases one reference to an image. The decoded Surface is dropped once no holders are left.
+
+        Args:
+            name (str): attribute name of the image as declared in IMAGE_FILES
+
+        Returns:
+            None
+        """
+        # if statement checking if the image is currently held by anyone
+        if self.ref_counts.get(name, 0) > 0:
+            self.ref_counts[name] -= 1
+
+            # dropping the Surface when the last holder has released it
+            if self.ref_counts[name] == 0:
+                del self.surfaces[name]
+                del self.ref_counts[name]
+
+# the single asset registry shared by every module in the game
+asset_registry = AssetRegistry()
+
 class LoadImage:
     """
     This class is used as a helper class that loads in all sprite images from the resources folder.
 
-    A LoadImage object should be created whenever an image sprite is needed from the resources folder.
+    Images are pulled lazily from the shared AssetRegistry the first time they are accessed as attributes (e.g. images.up_arrow_player), so each image is only decoded once no matter how many LoadImage objects are created.
+
+    Modules should normally use the shared "images" object at the bottom of this file instead of creating their own LoadImage object.
 
     Parameters:
-        None
+        registry (AssetRegistry): optional argument for the registry that the images are pulled from
     """
-    def __init__(self):
-        pass
+    def __init__(self, registry: AssetRegistry = asset_registry):
+        self.registry = registry
+
+    def __getattr__(self, name: str):
+        """
+        This method is only called by python when an attribute has not been set yet, and is used to pull an image from the registry upon its first access.
+
+        Args:
+            name (str): name of the attribute being accessed
+
+        Returns:
+            Surface of the image
+        """
+        # if statement checking if the attribute is an image that can be loaded
+        if name in IMAGE_FILES:
+            surface = self.registry.acquire(name)
+
+            # storing the surface as an attribute so that future accesses skip the registry entirely
+            setattr(self, name, surface)
+            return surface
+
+        raise AttributeError(f"'LoadImage' object has no attribute '{name}'")
 
     def load_images(self):
         """
-        This method is used to load the images for all image sprites in the resources folder.
+        This method is used to eagerly load the images for all image sprites in the resources folder, instead of waiting for their first access.
 
         For the sake of simplicity and to avoid unncessary repetition, the doc strings of this method are abbreviated and condensed into their respective categories.
 
@@ -76,45 +282,111 @@ class LoadImage:
             4 hit arrow sprites, each representing 1 of the 4 black and white arrows when they change colour due to a successful hit
             4 miss arrow sprites, each representing 1 of the 4 black and white arrows when they change colour due to a miss        
         """
-        player_dir = path.join(img_dir, "player sprites")
-        self.player_idle_1 = pygame.image.load(path.join(player_dir, PLAYER_IDLE_1 + file_type)).convert_alpha()
-        self.player_idle_2 = pygame.image.load(path.join(player_dir, PLAYER_IDLE_2 + file_type)).convert_alpha()
-        self.player_attack_1 = pygame.image.load(path.join(player_dir, PLAYER_ATTACK_1 + file_type)).convert_alpha()
-        self.player_attack_2 = pygame.image.load(path.join(player_dir, PLAYER_ATTACK_2 + file_type)).convert_alpha()
-        self.player_lose = pygame.image.load(path.join(player_dir, PLAYER_LOSE + file_type)).convert_alpha()
-
-        enemy_dir = path.join(img_dir, "enemy sprites")
-        self.enemy_idle_1 = pygame.image.load(path.join(enemy_dir, ENEMY_IDLE_1 + file_type)).convert_alpha()
-        self.enemy_idle_2 = pygame.image.load(path.join(enemy_dir, ENEMY_IDLE_2 + file_type)).convert_alpha()
-        self.enemy_attack_1 = pygame.image.load(path.join(enemy_dir, ENEMY_ATTACK_1 + file_type)).convert_alpha()
-        self.enemy_attack_2 = pygame.image.load(path.join(enemy_dir, ENEMY_ATTACK_2 + file_type)).convert_alpha()
-        self.enemy_lose = pygame.image.load(path.join(enemy_dir, ENEMY_LOSE + file_type)).convert_alpha()
-
-        arrow_dir = path.join(img_dir, "arrow sprites")
-        self.left_arrow_player = pygame.image.load(path.join(arrow_dir, LEFT_ARROW_PLAYER + file_type)).convert_alpha()
-        self.right_arrow_player = pygame.image.load(path.join(arrow_dir, RIGHT_ARROW_PLAYER + file_type)).convert_alpha()
-        self.down_arrow_player = pygame.image.load(path.join(arrow_dir, DOWN_ARROW_PLAYER + file_type)).convert_alpha()
-        self.up_arrow_player = pygame.image.load(path.join(arrow_dir, UP_ARROW_PLAYER + file_type)).convert_alpha()
-
-        self.left_arrow_enemy = pygame.image.load(path.join(arrow_dir, LEFT_ARROW_ENEMY + file_type)).convert_alpha()
-        self.right_arrow_enemy = pygame.image.load(path.join(arrow_dir, RIGHT_ARROW_ENEMY + file_type)).convert_alpha()
-        self.down_arrow_enemy = pygame.image.load(path.join(arrow_dir, DOWN_ARROW_ENEMY + file_type)).convert_alpha()
-        self.up_arrow_enemy = pygame.image.load(path.join(arrow_dir, UP_ARROW_ENEMY + file_type)).convert_alpha()
-
-        self.left_arrow_bw = pygame.image.load(path.join(arrow_dir, LEFT_ARROW_BW +file_type)).convert_alpha()
-        self.right_arrow_bw = pygame.image.load(path.join(arrow_dir, RIGHT_ARROW_BW + file_type)).convert_alpha()
-        self.down_arrow_bw = pygame.image.load(path.join(arrow_dir, DOWN_ARROW_BW + file_type)).convert_alpha()
-        self.up_arrow_bw = pygame.image.load(path.join(arrow_dir, UP_ARROW_BW + file_type)).convert_alpha()
-
-        self.left_arrow_hit = pygame.image.load(path.join(arrow_dir, LEFT_ARROW_HIT +file_type)).convert_alpha()
-        self.right_arrow_hit = pygame.image.load(path.join(arrow_dir, RIGHT_ARROW_HIT + file_type)).convert_alpha()
-        self.down_arrow_hit = pygame.image.load(path.join(arrow_dir, DOWN_ARROW_HIT + file_type)).convert_alpha()
-        self.up_arrow_hit = pygame.image.load(path.join(arrow_dir, UP_ARROW_HIT + file_type)).convert_alpha()
-
-        self.left_arrow_miss = pygame.image.load(path.join(arrow_dir, LEFT_ARROW_MISS +file_type)).convert_alpha()
-        self.right_arrow_miss = pygame.image.load(path.join(arrow_dir, RIGHT_ARROW_MISS + file_type)).convert_alpha()
-        self.down_arrow_miss = pygame.image.load(path.join(arrow_dir, DOWN_ARROW_MISS + file_type)).convert_alpha()
-        self.up_arrow_miss = pygame.image.load(path.join(arrow_dir, UP_ARROW_MISS + file_type)).convert_alpha()
-
-# In main.py (after pygame.init())
+        # accessing each image once pulls it from the registry through __getattr__
+        for name in IMAGE_FILES:
+            getattr(self, name)
+
+    def release_images(self):
+        """
+        This method releases every image this object has pulled from the registry.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        for name in IMAGE_FILES:
+            # if statement checking if this object has pulled the image before
+            if name in self.__dict__:
+                delattr(self, name)
+                self.registry.release(name)
+
+class ScaledSurfaceCache:
+    """
+    This class is a memoizing cache of scaled sprite images, keyed by the source image and the size it is scaled to.
+
+    Every distinct (image, size) pair is only scaled once and all sprites using it share the same scaled Surface. The least recently used entry is evicted once the cache holds more than max_size surfaces.
+
+    Parameters:
+        max_size (int): optional argument for the maximum number of scaled surfaces kept in the cache
+
+    Attributes:
+        max_size (int): maximum number of scaled surfaces kept in the cache
+        surfaces (OrderedDict): ordered dictionary mapping (image, size) to the scaled Surface, ordered from least to most recently used
+        hits (int): number of lookups that were served from the cache
+        misses (int): number of lookups that had to scale the image
+    """
+    def __init__(self, max_size: int = SCALED_CACHE_SIZE):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, image, size: tuple):
+        """
+        This method returns the image scaled to the given size, scaling it only if this pair has not been scaled before.
+
+        Args:
+            image (Surface): source image to be scaled
+            size (tuple): (width, height) that the image should be scaled to
+
+        Returns:
+            Surface of the scaled image
+        """
+        # pygame Surfaces hash by identity, so the shared images from the asset registry make stable keys
+        key = (image, size)
+
+        # if statement checking if this pair has been scaled before
+        if key in self.surfaces:
+            self.hits += 1
+
+            # marking the entry as the most recently used
+            self.surfaces.move_to_end(key)
+            return self.surfaces[key]
+
+        self.misses += 1
+
+        # images that already have the requested size are cached as they are instead of being copied
+        if image.get_size() == tuple(size):
+            scaled = image
+        else:
+            scaled = pygame.transform.scale(image, size)
+        self.surfaces[key] = scaled
+
+        # evicting the least recently used surface if the cache has grown past its bound
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+
+        return scaled
+
+    def clear(self):
+        """
+        This method empties the cache.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.surfaces.clear()
+
+# the single scaled surface cache shared by every module in the game
+scaled_cache = ScaledSurfaceCache()
+
+def scale_image(image, size: tuple):
+    """
+    This function returns the image scaled to the given size through the shared scaled surface cache.
+
+    Args:
+        image (Surface): source image to be scaled
+        size (tuple): (width, height) that the image should be scaled to
+
+    Returns:
+        Surface of the scaled image
+    """
+    return scaled_cache.get(image, size)
+
+# shared LoadImage object used by every module. Images are only decoded upon first access, which must happen after pygame.display.set_mode() in main.py
 images = LoadImage()
@@ -0,0 +1,619 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import io
+import time
+import random
+import signal
+import socket
+import struct
+import argparse
+import selectors
+import multiprocessing
+from collections import namedtuple
+from dotenv import load_dotenv
+
+# every match is played without a window or sound
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from helper.replay import ReplayHeader, INPUT_FORMAT, write_header, read_header
+from helper.settings import game_settings
+
+# loading the address the server listens on, its number of worker processes and the directory of the charts its matches can be played on from .env
+load_dotenv()
+SERVER_ADDRESS = os.getenv("SERVER_ADDRESS", "127.0.0.1:7777")
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS") or os.cpu_count())
+SERVER_CHART_DIR = os.getenv("SERVER_CHART_DIR") or None
+
+# every message starts with its type and the length of the rest of the message
+FRAME_FORMAT = struct.Struct("<BI")
+
+# types of the messages. A client sends NEW_MATCH to start its match and then STEP to advance it, and the server answers each with a SNAPSHOT, or with an ERROR if the message could not be handled.
+NEW_MATCH = 1
+STEP = 2
+SNAPSHOT = 3
+ERROR = 4
+
+# a STEP message is the number of ticks to run followed by the inputs in INPUT_FORMAT, whose tick is counted from the first tick of the step
+STEP_FORMAT = struct.Struct("<H")
+
+# largest number of ticks a single STEP message can run, being ten seconds of a match at 60 ticks per second. Every match of a worker waits while a step is run, so a single client cannot hold the worker for long.
+MAX_STEP_TICKS = 600
+
+# a SNAPSHOT message is the tick count, timestamp, hp, maximum hp, flags and judgement counts of the match, followed by the number of player arrows waiting to be hit and the lane index, hit time and hold length of each
+SNAPSHOT_FORMAT = struct.Struct("<IdiiB4IH")
+
+# largest maximum hp a match can be played with, as the hp and the maximum hp are sent as signed 32-bit values
+MAX_SNAPSHOT_HP = 2**31 - 1
+ARROW_FORMAT = struct.Struct("<BdI")
+
+# bits of the flags of a snapshot
+GAME_OVER = 1
+PLAYER_LOST = 2
+PLAYER_TURN = 4
+ENEMY_TURN = 8
+
+# the state of a match sent to its client after every message
+Snapshot = namedtuple("Snapshot", ["tick", "time", "hp", "max_hp", "game_over", "player_lost", "player_turn", "enemy_turn", "judgements", "arrows"])
+
+# share of the arrows the auto player of the load test hits
+LOAD_TEST_HIT_RATE = 0.7
+
+# number of seconds a worker waits for a connection before checking that the server is still running
+WORKER_POLL_SECONDS = 1
+
+
+def parse_address(address: str):
+    """
+    This function splits an address written as "host:port".
+
+    Args:
+        address (str): the address
+
+    Returns:
+        tuple of the host and the port
+    """
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+
+def send_message(sock, message_type: int, payload: bytes = b""):
+    """
+    This function sends a single message.
+
+    Args:
+        sock (socket): the connected socket
+        message_type (int): type of the message
+        payload (bytes): optional argument for the rest of the message
+
+    Returns:
+        None
+    """
+    sock.sendall(FRAME_FORMAT.pack(message_type, len(payload)) + payload)
+
+
+def receive_exactly(sock, size: int):
+    """
+    This function receives exactly size bytes from a blocking socket.
+
+    Args:
+        sock (socket): the connected socket
+        size (int): number of bytes to receive
+
+    Returns:
+        bytes that have been received
+    """
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("the connection has been closed")
+        data += chunk
+    return bytes(data)
+
+
+def pack_snapshot(session):
+    """
+    This function packs the state of a match into the payload of a SNAPSHOT message.
+
+    Args:
+        session (GameSession): the session of the match
+
+    Returns:
+        bytes of the payload
+    """
+    flags = (GAME_OVER * session.game_over) | (PLAYER_LOST * session.player_lost) | (PLAYER_TURN * session.player_turn) | (ENEMY_TURN * session.enemy_turn)
+    arrows = [(index, arrow.hit_time, arrow.hold) for index, lane in enumerate(session.lanes) for arrow in lane.player_queue.arrows if arrow.alive()]
+
+    payload = bytearray(SNAPSHOT_FORMAT.pack(session.tick_count, session.clock.get_ticks(), session.player_healthbar.hp, session.settings.max_hp, flags, *session.judgements.values(), len(arrows)))
+    for arrow in arrows:
+        payload += ARROW_FORMAT.pack(*arrow)
+    return bytes(payload)
+
+
+def unpack_snapshot(payload: bytes):
+    """
+    This function unpacks the payload of a SNAPSHOT message.
+
+    Args:
+        payload (bytes): the payload
+
+    Returns:
+        Snapshot of the match
+    """
+    tick, match_time, hp, max_hp, flags, perfect, great, good, miss, arrow_count = SNAPSHOT_FORMAT.unpack_from(payload)
+    arrows = [ARROW_FORMAT.unpack_from(payload, SNAPSHOT_FORMAT.size + index * ARROW_FORMAT.size) for index in range(arrow_count)]
+    judgements = {"perfect": perfect, "great": great, "good": good, "miss": miss}
+    return Snapshot(tick, match_time, hp, max_hp, bool(flags & GAME_OVER), bool(flags & PLAYER_LOST), bool(flags & PLAYER_TURN), bool(flags & ENEMY_TURN), judgements, arrows)
+
+
+class MatchConnection:
+    """
+    The MatchConnection class is the server side of a single client connection, which plays a single match in a GameSession.
+
+    Messages are read from the connection as soon as they arrive and handled once they are complete. Each match is only advanced by its client's STEP messages, so a worker can host many matches at once without any of them waiting on the others.
+
+    Args:
+        sock (socket): the connected socket
+        record_path (str | None): optional argument for the path the match is recorded to as a replay
+        chart_dir (str | None): optional argument for the directory of the charts the client can play its match on. Matches can only be played without a chart if None
+
+    Attributes:
+        sock (socket): the connected socket
+        record_path (str | None): path the match is recorded to, if any
+        chart_dir (str | None): directory of the charts the client can play its match on, if any
+        buffer (bytearray): bytes received that do not make up a full message yet
+        session (GameSession | None): the session of the match, or None before the client has started it
+        actions (list): the input actions of the session, indexed by their action index
+    """
+    def __init__(self, sock, record_path: str = None, chart_dir: str = None):
+        self.sock = sock
+        self.record_path = record_path
+        self.chart_dir = chart_dir
+        self.buffer = bytearray()
+        self.session = None
+        self.actions = []
+
+    def receive(self):
+        """
+        This method receives the bytes waiting on the connection and handles every complete message.
+
+        Args:
+            None
+
+        Returns:
+            False if the client has closed the connection, True otherwise
+        """
+        data = self.sock.recv(65536)
+        if not data:
+            return False
+        self.buffer += data
+
+        # while loop handling every complete message in the buffer
+        while len(self.buffer) >= FRAME_FORMAT.size:
+            message_type, length = FRAME_FORMAT.unpack_from(self.buffer)
+            if len(self.buffer) < FRAME_FORMAT.size + length:
+                break
+
+            payload = bytes(self.buffer[FRAME_FORMAT.size:FRAME_FORMAT.size + length])
+            del self.buffer[:FRAME_FORMAT.size + length]
+
+            try:
+                send_message(self.sock, SNAPSHOT, self.handle(message_type, payload))
+            except (ValueError, struct.error, IndexError, OSError) as error:
+                send_message(self.sock, ERROR, str(error).encode("utf-8"))
+        return True
+
+    def handle(self, message_type: int, payload: bytes):
+        """
+        This method handles a single message of the client.
+
+        Args:
+            message_type (int): type of the message
+            payload (bytes): the rest of the message
+
+        Returns:
+            bytes of the payload of the SNAPSHOT answered
+        """
+        from agents.session import session_from_header
+        from agents.judgement import InputEvent
+        from agents.lanes import LANE_LAYOUTS
+
+        # if statement checking if the client is starting its match, which is created from the replay header sent
+        if message_type == NEW_MATCH:
+            if self.session is not None:
+                raise ValueError("the match has already been started")
+            header = read_header(io.BytesIO(payload), "match header")
+
+            # if statement checking if the tick length would keep the session from ever advancing
+            if not header.tick_ms > 0:
+                raise ValueError(f"tick length must be positive, got {header.tick_ms}")
+
+            # if statement checking if the game has a lane layout for the number of lanes
+            if header.lane_count not in LANE_LAYOUTS:
+                raise ValueError(f"unsupported number of lanes {header.lane_count}, expected one of {', '.join(map(str, LANE_LAYOUTS))}")
+
+            # if statement checking if the hp of the match can be sent in a snapshot
+            if header.settings.max_hp > MAX_SNAPSHOT_HP:
+                raise ValueError(f"the settings give a maximum hp of {header.settings.max_hp}, which is more than the largest supported maximum hp of {MAX_SNAPSHOT_HP}")
+
+            header.chart_path = self.resolve_chart(header.chart_path)
+            self.session = session_from_header(header)
+            self.actions = self.session.input_actions()
+            if self.record_path:
+                self.session.start_recording(self.record_path)
+            return pack_snapshot(self.session)
+
+        if self.session is None:
+            raise ValueError("the match has not been started")
+
+        if message_type != STEP:
+            raise ValueError(f"unknown message type {message_type}")
+
+        # collecting the inputs of each tick of the step
+        (ticks,) = STEP_FORMAT.unpack_from(payload)
+
+        # if statement checking if the step would keep the other matches of the worker waiting for too long
+        if ticks > MAX_STEP_TICKS:
+            raise ValueError(f"a step can run at most {MAX_STEP_TICKS} ticks, got {ticks}")
+        tick_inputs = [[] for _ in range(ticks)]
+        for offset in range(STEP_FORMAT.size, len(payload), INPUT_FORMAT.size):
+            tick, action_index, input_time = INPUT_FORMAT.unpack_from(payload, offset)
+            tick_inputs[tick].append(InputEvent(self.actions[action_index], input_time))
+
+        # running the ticks one by one, so that every input is applied on the tick it was sent for
+        for inputs in tick_inputs:
+            self.session.step(self.session.tick_ms, inputs)
+        return pack_snapshot(self.session)
+
+    def resolve_chart(self, chart_name: str):
+        """
+        This method finds the chart a client has asked to play its match on. Clients name a chart by its path inside the chart directory of the server, so they cannot make the server open any other file.
+
+        Args:
+            chart_name (str): path of the chart inside the chart directory, or an empty string to play without a chart
+
+        Returns:
+            string of the path to the chart file, or an empty string to play without a chart
+        """
+        # if statement checking if the match is played without a chart
+        if not chart_name:
+            return ""
+
+        if self.chart_dir is None:
+            raise ValueError("this server does not host matches on charts")
+
+        chart_dir = os.path.realpath(self.chart_dir)
+        chart_path = os.path.realpath(os.path.join(chart_dir, chart_name))
+
+        # if statement checking if the chart is outside the chart directory, e.g. given as an absolute path or with ".."
+        if os.path.commonpath([chart_dir, chart_path]) != chart_dir or not os.path.isfile(chart_path):
+            raise ValueError(f"unknown chart {chart_name!r}")
+        return chart_path
+
+    def close(self):
+        """
+        This method closes the connection and the session of the match, finishing its replay file if it is being recorded.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if self.session is not None:
+            self.session.close()
+        self.sock.close()
+
+
+def stop_process(signal_number, frame):
+    """
+    This function stops the process it is called in when it is sent a signal to stop, so that its finally blocks are run.
+
+    Args:
+        signal_number (int): the signal that has been sent
+        frame (frame): the frame running when the signal was sent
+
+    Returns:
+        None
+    """
+    raise SystemExit(0)
+
+
+def serve_worker(listener, worker_id: int, record_dir: str = None, chart_dir: str = None):
+    """
+    This function runs a worker process of the server. Every worker accepts connections from the same listening socket, and hosts the match of each connection it accepts until the connection is closed.
+
+    The worker stops when it is sent SIGINT or SIGTERM, or once the server process has stopped, finishing the replay file of every match it is recording.
+
+    Args:
+        listener (socket): the listening socket shared by every worker
+        worker_id (int): number of the worker, used to name its replay files
+        record_dir (str | None): optional argument for the directory every match is recorded to
+        chart_dir (str | None): optional argument for the directory of the charts the matches can be played on
+
+    Returns:
+        None
+    """
+    # the display has to be created before the game is imported, as importing it loads the images
+    pygame.init()
+    pygame.display.set_mode((int(os.getenv("WIDTH", 400)), int(os.getenv("HEIGHT", 600))))
+    import agents.session
+
+    # pygame turns SIGINT and SIGTERM into quit events, which a worker never reads, so they are handled here instead
+    signal.signal(signal.SIGINT, stop_process)
+    signal.signal(signal.SIGTERM, stop_process)
+    server_pid = os.getppid()
+
+    selector = selectors.DefaultSelector()
+    listener.setblocking(False)
+    selector.register(listener, selectors.EVENT_READ)
+
+    try:
+        serve_connections(selector, listener, worker_id, record_dir, chart_dir, server_pid)
+    finally:
+        # closing every match, which finishes its replay file
+        for key in list(selector.get_map().values()):
+            if key.data is not None:
+                key.data.close()
+
+
+def serve_connections(selector, listener, worker_id: int, record_dir: str, chart_dir: str, server_pid: int):
+    """
+    This function handles the connections of a worker process until the server process has stopped.
+
+    Args:
+        selector (BaseSelector): the selector the listening socket and every connection are registered with
+        listener (socket): the listening socket shared by every worker
+        worker_id (int): number of the worker, used to name its replay files
+        record_dir (str | None): the directory every match is recorded to, if any
+        chart_dir (str | None): the directory of the charts the matches can be played on, if any
+        server_pid (int): process id of the server process
+
+    Returns:
+        None
+    """
+    match_count = 0
+
+    # while loop handling every connection that is ready, one at a time, until the worker has been left behind by the server process
+    while os.getppid() == server_pid:
+        for key, _ in selector.select(WORKER_POLL_SECONDS):
+            # if statement checking if a client is connecting
+            if key.fileobj is listener:
+                try:
+                    sock, _ = listener.accept()
+                except BlockingIOError:
+                    # another worker has accepted the connection first
+                    continue
+
+                sock.setblocking(True)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                match_count += 1
+                record_path = os.path.join(record_dir, f"match_{worker_id}_{match_count}.kcr") if record_dir else None
+                selector.register(sock, selectors.EVENT_READ, MatchConnection(sock, record_path, chart_dir))
+                continue
+
+            connection = key.data
+            try:
+                open_connection = connection.receive()
+            except ConnectionError:
+                open_connection = False
+            except Exception as error:
+                # an unexpected error only ends the match it happened in, so the other matches of the worker keep running
+                print(f"worker {worker_id}: closing match after {error!r}", file=sys.stderr)
+                try:
+                    send_message(connection.sock, ERROR, str(error).encode("utf-8"))
+                except OSError:
+                    pass
+                open_connection = False
+
+            # if statement checking if the client has gone, in which case its match is closed
+            if not open_connection:
+                selector.unregister(connection.sock)
+                connection.close()
+
+
+def run_server(address: str = SERVER_ADDRESS, workers: int = SERVER_WORKERS, record_dir: str = None, chart_dir: str = SERVER_CHART_DIR):
+    """
+    This function runs the match server until it is interrupted. The matches are spread over worker processes, which accept connections from a single listening socket, so that each match is hosted by one worker and the workers run on separate cores.
+
+    The worker processes are forked so that they inherit the listening socket, which is only possible on Linux and macOS.
+
+    Args:
+        address (str): optional argument for the address the server listens on, written as "host:port"
+        workers (int): optional argument for the number of worker processes
+        record_dir (str | None): optional argument for the directory every match is recorded to
+        chart_dir (str | None): optional argument for the directory of the charts the matches can be played on. Matches can only be played without a chart if None
+
+    Returns:
+        None
+    """
+    listener = socket.create_server(parse_address(address), backlog=1024)
+    if record_dir:
+        os.makedirs(record_dir, exist_ok=True)
+
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=serve_worker, args=(listener, worker_id, record_dir, chart_dir), daemon=True) for worker_id in range(workers)]
+    for process in processes:
+        process.start()
+    print(f"serving matches on {address} with {workers} workers")
+
+    # stopping the server the same way when it is sent SIGTERM as when it is interrupted
+    signal.signal(signal.SIGTERM, stop_process)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # ignoring further signals to stop while the workers are being stopped, so that shutting down is not interrupted
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+        # stopping every worker, which finish the replay files of their matches
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+        listener.close()
+
+
+class MatchClient:
+    """
+    The MatchClient class plays a single match on a match server.
+
+    Args:
+        address (str): optional argument for the address of the server, written as "host:port"
+
+    Attributes:
+        sock (socket): the socket connected to the server
+        tick_ms (float): length of a single tick of the match in milliseconds, known once the match has been started
+    """
+    def __init__(self, address: str = SERVER_ADDRESS):
+        self.sock = socket.create_connection(parse_address(address))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.tick_ms = None
+
+    def request(self, message_type: int, payload: bytes):
+        """
+        This method sends a message to the server and waits for its answer.
+
+        Args:
+            message_type (int): type of the message
+            payload (bytes): the rest of the message
+
+        Returns:
+            Snapshot of the match answered by the server
+        """
+        send_message(self.sock, message_type, payload)
+        answer_type, length = FRAME_FORMAT.unpack(receive_exactly(self.sock, FRAME_FORMAT.size))
+        answer = receive_exactly(self.sock, length)
+
+        # if statement checking if the server could not handle the message
+        if answer_type == ERROR:
+            raise ValueError(f"match server: {answer.decode('utf-8')}")
+        return unpack_snapshot(answer)
+
+    def start(self, header: ReplayHeader):
+        """
+        This method starts the match.
+
+        Args:
+            header (ReplayHeader): the settings the match is played with
+
+        Returns:
+            Snapshot of the match before its first tick
+        """
+        header_file = io.BytesIO()
+        write_header(header_file, header)
+        self.tick_ms = header.tick_ms
+        return self.request(NEW_MATCH, header_file.getvalue())
+
+    def step(self, inputs = (), ticks: int = 1):
+        """
+        This method advances the match.
+
+        Args:
+            inputs (iterable): optional argument for the inputs of the step, each being a tuple of the tick it is applied on counted from the first tick of the step, its action index and its timestamp
+            ticks (int): optional argument for the number of ticks to run
+
+        Returns:
+            Snapshot of the match after the step
+        """
+        payload = bytearray(STEP_FORMAT.pack(ticks))
+        for tick, action_index, input_time in inputs:
+            payload += INPUT_FORMAT.pack(tick, action_index, input_time)
+        return self.request(STEP, bytes(payload))
+
+    def close(self):
+        """
+        This method ends the match and closes the connection.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.sock.close()
+
+
+def play_matches(address: str, matches: int, ticks: int, seed: int):
+    """
+    This function plays several matches on a match server at once with an auto player, stepping them in turn one tick at a time, as a bot ladder would.
+
+    Args:
+        address (str): address of the server
+        matches (int): number of matches played
+        ticks (int): maximum number of ticks of each match
+        seed (int): seed of the auto player and the matches
+
+    Returns:
+        integer of the number of ticks run
+    """
+    player = random.Random(seed)
+    clients = []
+    snapshots = []
+    for match in range(matches):
+        client = MatchClient(address)
+        clients.append(client)
+        snapshots.append(client.start(ReplayHeader(seed * matches + match, 1000 / 60, 4, game_settings)))
+
+    # starting every match, being the first input action
+    snapshots = [client.step([(0, 0, snapshot.time)]) for client, snapshot in zip(clients, snapshots)]
+    ticks_run = len(clients)
+
+    # for loop stepping every match that has not ended, pressing the lane of every arrow that reaches its BW arrow on the next tick
+    for _ in range(ticks - 1):
+        for index, (client, snapshot) in enumerate(zip(clients, snapshots)):
+            if snapshot.game_over:
+                continue
+            next_time = snapshot.time + client.tick_ms
+            inputs = [(0, lane + 1, hit_time) for lane, hit_time, _ in snapshot.arrows if abs(next_time - hit_time) <= client.tick_ms / 2 and player.random() < LOAD_TEST_HIT_RATE]
+            snapshots[index] = client.step(inputs)
+            ticks_run += 1
+
+    for client in clients:
+        client.close()
+    return ticks_run
+
+
+def load_test(address: str, matches: int, ticks: int, clients: int):
+    """
+    This function measures the throughput of a match server by playing matches on it from several client processes at once.
+
+    Args:
+        address (str): address of the server
+        matches (int): number of matches played by each client process
+        ticks (int): maximum number of ticks of each match
+        clients (int): number of client processes
+
+    Returns:
+        float of the number of ticks run per second over all matches
+    """
+    start = time.perf_counter()
+    with multiprocessing.Pool(clients) as pool:
+        ticks_run = sum(pool.starmap(play_matches, [(address, matches, ticks, seed) for seed in range(clients)]))
+    return ticks_run / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host many headless matches at once over a local socket, or measure the throughput of a running server.")
+    parser.add_argument("--address", default=SERVER_ADDRESS, help="address the server listens on, written as host:port")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="number of worker processes of the server")
+    parser.add_argument("--record", default=None, metavar="DIR", help="directory every match hosted by the server is recorded to as a replay")
+    parser.add_argument("--charts", default=SERVER_CHART_DIR, metavar="DIR", help="directory of the charts clients can play their matches on, named by their path inside it")
+    parser.add_argument("--load-test", type=int, default=None, metavar="CLIENTS", help="play matches on a running server from this many client processes and print its throughput, instead of running a server")
+    parser.add_argument("--matches", type=int, default=16, help="number of matches played by each client process of the load test")
+    parser.add_argument("--ticks", type=int, default=3600, help="maximum number of ticks of each match of the load test")
+    args = parser.parse_args()
+
+    # if statement checking if a running server should be load tested instead of running a server
+    if args.load_test:
+        ticks_per_second = load_test(args.address, args.matches, args.ticks, args.load_test)
+        print(f"{ticks_per_second:.0f} ticks per second, {ticks_per_second / 60:.1f} matches in real time at 60 Hz")
+    else:
+        run_server(args.address, args.workers, args.record, args.charts)
@@ -0,0 +1,204 @@
+import array
+import numpy as np
+from helper.chart import read_notes, Note
+from agents.judgement import PERFECT, GREAT, GOOD, MISS
+
+# owners of the notes of a chart, being the rows of the state array of a NoteStore. Both the player and the enemy play every note of the chart.
+PLAYER = 0
+ENEMY = 1
+
+# largest lane index that fits in the uint8 array of lane indexes
+LANE_INDEX_MAX = 255
+
+# states of a note for an owner: waiting to be sent out, sent out as an arrow, or judged with one of the judgements
+PENDING = 0
+SPAWNED = 1
+JUDGEMENT_STATES = {
+    PERFECT: 2,
+    GREAT: 3,
+    GOOD: 4,
+    MISS: 5,
+}
+
+
+class NoteStore:
+    """
+    The NoteStore class holds every note of a chart as a struct of arrays: one NumPy array for each field of the notes, instead of an object for each note.
+
+    A note takes 11 bytes: its time, the index of its lane and its hold length, and its state for the player and for the enemy. Notes are only turned into Note tuples when they are read through a NoteCursor, and into arrows when they are sent out, so only the notes on screen exist as objects regardless of the length of the chart.
+
+    The whole chart is loaded when the session starts rather than read incrementally while it is played. At 11 bytes a note, even a chart of 200,000 notes takes about 2.2 MiB, and loading it up front lets the lanes of every note be checked before the match starts and lets both owners read the chart from a single copy.
+
+    Args:
+        times (ndarray): time of each note in milliseconds
+        lanes (ndarray): index of the lane of each note into lane_names
+        holds (ndarray): hold length of each note in milliseconds
+        lane_names (list): names of the lanes of the chart
+
+    Attributes:
+        times (ndarray): int32 array of the time of each note in milliseconds, counted from the start of the chart
+        lanes (ndarray): uint8 array of the index of the lane of each note into lane_names
+        holds (ndarray): int32 array of the hold length of each note in milliseconds, or 0 for a single tap
+        lane_names (list): names of the lanes of the chart, in the order of their lane index
+        state (ndarray): uint8 array of the state of each note, with a row for the player and a row for the enemy
+    """
+    def __init__(self, times, lanes, holds, lane_names: list):
+        self.times = times
+        self.lanes = lanes
+        self.holds = holds
+        self.lane_names = lane_names
+        self.state = np.zeros((2, len(times)), dtype=np.uint8)
+
+    @classmethod
+    def load(cls, chart_path: str, lane_names = None):
+        """
+        This method reads every note of a chart file. The file is read one line at a time with read_notes(), so the notes are never held as Note tuples all at once, and is checked line by line as it is read.
+
+        Args:
+            chart_path (str): path to the chart file
+            lane_names (list | None): optional argument for the names of the lanes of the game, in the order of their lane index. Every note must be in one of these lanes, and the lanes are indexed in this order. The lanes are indexed in the order they first appear in the chart if None.
+
+        Returns:
+            NoteStore of the notes of the chart
+        """
+        times = array.array("i")
+        lanes = array.array("B")
+        holds = array.array("i")
+        lane_indexes = {name: index for index, name in enumerate(lane_names)} if lane_names is not None else {}
+
+        # for loop taking the notes out of the chart one by one
+        for note in read_notes(chart_path, lane_indexes if lane_names is not None else None):
+            # if statement checking if the lane index still fits in the uint8 array of lane indexes
+            if note.lane not in lane_indexes and len(lane_indexes) > LANE_INDEX_MAX:
+                raise ValueError(f"{chart_path}: charts cannot have more than {LANE_INDEX_MAX + 1} lanes")
+            times.append(note.time)
+            lanes.append(lane_indexes.setdefault(note.lane, len(lane_indexes)))
+            holds.append(note.hold)
+
+        return cls(np.frombuffer(times, dtype=np.int32), np.frombuffer(lanes, dtype=np.uint8), np.frombuffer(holds, dtype=np.int32), list(lane_indexes))
+
+    def __len__(self):
+        return len(self.times)
+
+    def note(self, index: int):
+        """
+        This method creates the Note tuple of a single note.
+
+        Args:
+            index (int): index of the note
+
+        Returns:
+            Note at the index
+        """
+        return Note(int(self.times[index]), self.lane_names[self.lanes[index]], int(self.holds[index]))
+
+    def cursor(self, owner: int):
+        """
+        This method creates a cursor reading the notes of the chart from the start for one owner.
+
+        Args:
+            owner (int): PLAYER or ENEMY
+
+        Returns:
+            NoteCursor at the first note
+        """
+        return NoteCursor(self, owner)
+
+    def judge(self, owner: int, index: int, judgement: str):
+        """
+        This method stores the judgement a note has been played with.
+
+        Args:
+            owner (int): PLAYER or ENEMY
+            index (int): index of the note
+            judgement (str): the judgement, being one of the keys of JUDGEMENT_STATES
+
+        Returns:
+            None
+        """
+        self.state[owner, index] = JUDGEMENT_STATES[judgement]
+
+    def counts(self, owner: int):
+        """
+        This method counts the notes of an owner in each judgement, all at once over the state array.
+
+        Args:
+            owner (int): PLAYER or ENEMY
+
+        Returns:
+            dictionary mapping each judgement to the number of notes judged as it
+        """
+        counts = np.bincount(self.state[owner], minlength=max(JUDGEMENT_STATES.values()) + 1)
+        return {judgement: int(counts[state]) for judgement, state in JUDGEMENT_STATES.items()}
+
+
+class NoteCursor:
+    """
+    The NoteCursor class reads the notes of a NoteStore in order of time for one owner. It has the peek and pop methods the GameMaster takes the notes of its chart out with.
+
+    Args:
+        store (NoteStore): the store the notes are read from
+        owner (int): PLAYER or ENEMY
+
+    Attributes:
+        store (NoteStore): the store the notes are read from
+        owner (int): PLAYER or ENEMY
+        position (int): index of the next note
+    """
+    def __init__(self, store: NoteStore, owner: int):
+        self.store = store
+        self.owner = owner
+        self.position = 0
+
+    def peek(self):
+        """
+        This method returns the next note of the chart without taking it out.
+
+        Args:
+            None
+
+        Returns:
+            the next Note, or None if the chart has ended
+        """
+        return self.store.note(self.position) if self.position < len(self.store) else None
+
+    def pop(self):
+        """
+        This method takes out and returns the next note of the chart, marking it as sent out.
+
+        Args:
+            None
+
+        Returns:
+            the next Note, or None if the chart has ended
+        """
+        note = self.peek()
+        if note is not None:
+            self.store.state[self.owner, self.position] = SPAWNED
+            self.position += 1
+        return note
+
+    def skip(self):
+        """
+        This method moves past the next note of the chart without sending it out, leaving it pending for this owner.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if self.position < len(self.store):
+            self.position += 1
+
+    def finished(self):
+        """
+        This method checks if every note of the chart has been taken out.
+
+        Args:
+            None
+
+        Returns:
+            True if the chart has ended, False otherwise
+        """
+        return self.position >= len(self.store)
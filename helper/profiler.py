@@ -0,0 +1,236 @@
+import os
+import csv
+import json
+import time
+import pygame
+from collections import deque
+from dotenv import load_dotenv
+
+# loading the profiler settings from .env
+load_dotenv()
+PROFILING = os.getenv("PROFILING", "false").lower() == "true"
+PROFILE_OUTPUT = os.getenv("PROFILE_OUTPUT") or None
+
+# number of frames the rolling percentiles are computed over, being 10 seconds at 60 FPS
+PROFILE_WINDOW = 600
+
+# number of frames between each refresh of the overlay text, as computing the percentiles every frame would show up in the profile itself
+OVERLAY_REFRESH = 30
+
+# name of the pseudo phase holding the full time of each frame, including the time spent waiting for the next frame
+FRAME = "frame"
+
+# percentiles reported for every phase
+PERCENTILES = (50, 95, 99)
+
+# tuple representing the RGB values of the overlay text and background
+OVERLAY_TEXT = (255, 255, 0)
+OVERLAY_BACKGROUND = (0, 0, 0)
+
+
+def percentile(sorted_samples: list, percent: float):
+    """
+    This function returns a percentile of a list of samples with the nearest-rank method.
+
+    Args:
+        sorted_samples (list): the samples, sorted in ascending order
+        percent (float): the percentile to be returned, between 0 and 100
+
+    Returns:
+        the sample at the given percentile, or 0 if there are no samples
+    """
+    if not sorted_samples:
+        return 0
+    rank = max(0, min(len(sorted_samples) - 1, round(percent / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+
+class FrameProfiler:
+    """
+    The FrameProfiler class measures how much of each frame is spent in each phase of the game loop.
+
+    Phases are timed as laps: lap(name) charges the time since the previous lap, or since the start of the frame, to the named phase. A phase that runs more than once in a frame, such as the phases of a GameSession tick, adds up over the frame. The totals of the last PROFILE_WINDOW frames are kept to report rolling percentiles.
+
+    While the profiler is disabled, lap() and begin_frame() return straight away, so the calls can be left in the game loop at almost no cost.
+
+    Args:
+        enabled (bool): optional argument for whether the profiler starts out recording
+        window (int): optional argument for the number of frames the percentiles are computed over
+
+    Attributes:
+        enabled (bool): boolean value indicating that the profiler is recording
+        show_overlay (bool): boolean value indicating that the overlay is drawn on the screen
+        samples (dict): dictionary mapping each phase name to a deque of its milliseconds in the last window frames
+        frame_totals (dict): dictionary mapping each phase name to its milliseconds in the current frame
+        frame_count (int): number of frames recorded
+        frame_start (float | None): perf_counter() timestamp at the start of the current frame, or None before the first frame
+        last_lap (float): perf_counter() timestamp of the end of the last lap
+        font (Font | None): font used for the overlay text. This is only created once the overlay is first drawn.
+        overlay_image (Surface | None): the last rendered overlay, which is refreshed every OVERLAY_REFRESH frames
+    """
+    def __init__(self, enabled: bool = PROFILING, window: int = PROFILE_WINDOW):
+        self.enabled = enabled
+        self.show_overlay = False
+        self.window = window
+        self.samples = {}
+        self.frame_totals = {}
+        self.frame_count = 0
+        self.frame_start = None
+        self.last_lap = time.perf_counter()
+        self.font = None
+        self.overlay_image = None
+
+    def begin_frame(self):
+        """
+        This method ends the current frame, storing the time of each phase in it, and starts the next one. It should be called once at the top of the game loop.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if not self.enabled:
+            return
+
+        now = time.perf_counter()
+
+        # if statement checking if a frame has been started, as the first call only marks the start of the first frame
+        if self.frame_start is not None:
+            self.frame_totals[FRAME] = (now - self.frame_start) * 1000
+            for name, total in self.frame_totals.items():
+                if name not in self.samples:
+                    self.samples[name] = deque(maxlen=self.window)
+                self.samples[name].append(total)
+            self.frame_count += 1
+
+        self.frame_totals = {}
+        self.frame_start = now
+        self.last_lap = now
+
+    def lap(self, name: str):
+        """
+        This method charges the time since the previous lap to a phase of the current frame.
+
+        Args:
+            name (str): name of the phase that has just finished
+
+        Returns:
+            None
+        """
+        if not self.enabled:
+            return
+
+        now = time.perf_counter()
+        self.frame_totals[name] = self.frame_totals.get(name, 0) + (now - self.last_lap) * 1000
+        self.last_lap = now
+
+    def record(self, name: str, ms: float):
+        """
+        This method records a measurement other than a lap for the current frame, such as the latency of an input. Only the largest measurement of each frame is kept.
+
+        Args:
+            name (str): name of the measurement
+            ms (float): the measurement in milliseconds
+
+        Returns:
+            None
+        """
+        if not self.enabled:
+            return
+
+        self.frame_totals[name] = max(self.frame_totals.get(name, 0), ms)
+
+    def toggle_overlay(self):
+        """
+        This method shows or hides the overlay. Showing the overlay also starts recording if the profiler is disabled.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.show_overlay = not self.show_overlay
+        self.overlay_image = None
+
+        # if statement checking if the profiler has to start recording for the overlay to show anything
+        if self.show_overlay and not self.enabled:
+            self.enabled = True
+            self.frame_start = None
+
+    def stats(self):
+        """
+        This method computes the rolling statistics of every phase over the last window frames.
+
+        Args:
+            None
+
+        Returns:
+            dictionary mapping each phase name to a dictionary of its mean, p50, p95, p99 and max in milliseconds
+        """
+        stats = {}
+        for name, samples in self.samples.items():
+            sorted_samples = sorted(samples)
+            phase_stats = {"mean": sum(sorted_samples) / len(sorted_samples)}
+            for percent in PERCENTILES:
+                phase_stats[f"p{percent}"] = percentile(sorted_samples, percent)
+            phase_stats["max"] = sorted_samples[-1]
+            stats[name] = phase_stats
+        return stats
+
+    def draw_overlay(self, screen):
+        """
+        This method draws the percentiles of every phase in the top left corner of the screen.
+
+        Args:
+            screen (Surface): the surface the overlay is drawn on
+
+        Returns:
+            Rect of the area the overlay has been drawn on
+        """
+        # if statement checking if the overlay text is due to be refreshed
+        if self.overlay_image is None or self.frame_count % OVERLAY_REFRESH == 0:
+            if self.font is None:
+                self.font = pygame.font.SysFont(None, 18)
+
+            lines = [f"{'phase':<8}{'p50':>7}{'p95':>7}{'p99':>7}"]
+            for name, phase_stats in self.stats().items():
+                lines.append(f"{name:<8}" + "".join(f"{phase_stats[f'p{percent}']:>7.2f}" for percent in PERCENTILES))
+
+            # rendering each line of text onto a single background surface
+            line_images = [self.font.render(line, True, OVERLAY_TEXT) for line in lines]
+            line_height = self.font.get_linesize()
+            self.overlay_image = pygame.Surface((max(image.get_width() for image in line_images) + 8, line_height * len(line_images) + 8))
+            self.overlay_image.fill(OVERLAY_BACKGROUND)
+            for index, image in enumerate(line_images):
+                self.overlay_image.blit(image, (4, 4 + index * line_height))
+
+        return screen.blit(self.overlay_image, (0, 0))
+
+    def dump(self, path: str):
+        """
+        This method writes the rolling statistics of every phase to a file. The file is written as JSON if the path ends in .json, and as CSV otherwise.
+
+        Args:
+            path (str): path to the file to be written
+
+        Returns:
+            None
+        """
+        stats = self.stats()
+
+        # if statement checking the format of the file
+        if path.endswith(".json"):
+            with open(path, "w") as dump_file:
+                json.dump({"frames": self.frame_count, "window": self.window, "phases": stats}, dump_file, indent=2)
+        else:
+            with open(path, "w", newline="") as dump_file:
+                writer = csv.writer(dump_file)
+                writer.writerow(["phase", "mean", "p50", "p95", "p99", "max"])
+                for name, phase_stats in stats.items():
+                    writer.writerow([name] + [round(phase_stats[column], 4) for column in ("mean", "p50", "p95", "p99", "max")])
+
+
+# the profiler shared by the game loop, the session and the renderer
+frame_profiler = FrameProfiler()
@@ -0,0 +1,198 @@
+import pygame
+from helper.profiler import frame_profiler
+
+# tuple representing the RGB values of black and red
+BLACK = (0,0,0)
+RED = (255,0,0)
+
+
+class Renderer:
+    """
+    The Renderer class draws a GameSession onto the screen. It is added to a session as an observer and is called after every step of the session.
+
+    Args:
+        screen (Surface): the pygame display surface that the session is drawn on
+        profiler (FrameProfiler): optional argument for the profiler that drawing and flipping are timed with, and whose overlay is drawn
+
+    Attributes:
+        screen (Surface): the pygame display surface that the session is drawn on
+        font (Font | None): font used for the game over text. This is only created once the game is over.
+        profiler (FrameProfiler): the profiler that drawing and flipping are timed with
+    """
+    def __init__(self, screen, profiler = frame_profiler):
+        self.screen = screen
+        self.font = None
+        self.profiler = profiler
+
+    def render(self, session):
+        """
+        This method redraws the whole screen with the current state of the session.
+
+        Args:
+            session (GameSession): the session to be drawn
+
+        Returns:
+            None
+        """
+        # filling screen with black background
+        self.screen.fill(BLACK)
+
+        # drawing all necessary sprites on screen. This is placed here to ensure that all sprites are still drawn even upon the game's conclusion
+        session.base_game_sprites.draw(self.screen)
+        session.bw_arrow_sprites.draw(self.screen)
+        session.player_arrow_sprites.draw(self.screen)
+        session.enemy_arrow_sprites.draw(self.screen)
+
+        # if statement checking if the game has concluded
+        if session.game_over:
+            self.draw_game_over(session)
+
+        # if statement checking if the profiler overlay is shown
+        if self.profiler.show_overlay:
+            self.profiler.draw_overlay(self.screen)
+        self.profiler.lap("draw")
+
+        pygame.display.flip()
+        self.profiler.lap("flip")
+
+    def draw_game_over(self, session):
+        """
+        This method draws the game over text on the screen.
+
+        Args:
+            session (GameSession): the session that has concluded
+
+        Returns:
+            None
+        """
+        # setting the pygame font to size 64
+        if self.font is None:
+            self.font = pygame.font.SysFont(None, 64)
+
+        # if statement checking if the player has lost to display the appropriate game over text
+        if session.player_lost:
+            text_surface = self.font.render("YOU LOSE", True, RED)
+        else:
+            text_surface = self.font.render("YOU WIN", True, RED)
+
+        # setting the text rect to the center of the top half of the screen
+        width, height = self.screen.get_size()
+        text_rect = text_surface.get_rect(center=(width / 2, height / 4))
+
+        # adding the game over text to the screen
+        self.screen.blit(text_surface, text_rect)
+
+
+class DirtyRenderer(Renderer):
+    """
+    The DirtyRenderer class draws a GameSession onto the screen by only redrawing and pushing the parts of the screen that have changed since the last frame.
+
+    The image and position of every sprite is remembered after each frame. A sprite whose image or position has changed, or that has appeared or disappeared, marks both its old and new area as dirty. Only the dirty areas are cleared, redrawn and pushed to the display with pygame.display.update().
+
+    This is a child class of the Renderer class.
+
+    Args:
+        screen (Surface): the pygame display surface that the session is drawn on
+        profiler (FrameProfiler): optional argument for the profiler that drawing and flipping are timed with, and whose overlay is drawn
+
+    Attributes:
+        sprite_states (dict): dictionary mapping each sprite drawn in the last frame to a tuple of its image and the area it was drawn on at that time
+        full_redraw (bool): boolean value indicating that the next frame should redraw and push the whole screen
+        overlay_rect (Rect | None): area the profiler overlay was drawn on in the last frame, or None if it was not drawn
+    """
+    def __init__(self, screen, profiler = frame_profiler):
+        super().__init__(screen, profiler)
+        self.sprite_states = {}
+        self.full_redraw = True
+        self.overlay_rect = None
+
+    def invalidate(self):
+        """
+        This method forces the next frame to redraw the whole screen, e.g. after the window has been uncovered.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.full_redraw = True
+
+    def render(self, session):
+        """
+        This method redraws the parts of the screen that have changed since the last frame.
+
+        Args:
+            session (GameSession): the session to be drawn
+
+        Returns:
+            None
+        """
+        # obtaining all sprites in the order they are drawn in
+        sprites = session.base_game_sprites.sprites() + session.bw_arrow_sprites.sprites() + session.player_arrow_sprites.sprites() + session.enemy_arrow_sprites.sprites()
+
+        # if statement checking if the whole screen has to be redrawn. The game over screen is always drawn in full as the text covers the sprites below it.
+        if self.full_redraw or session.game_over:
+            super().render(session)
+            self.sprite_states = {sprite: (sprite.image, self.drawn_area(sprite)) for sprite in sprites}
+            self.overlay_rect = self.screen.get_rect().clip(self.profiler.overlay_image.get_rect()) if self.profiler.show_overlay else None
+            self.full_redraw = False
+            return
+
+        dirty_rects = []
+        current_states = {}
+
+        # for loop comparing the image and position of each sprite to the last frame
+        for sprite in sprites:
+            state = (sprite.image, self.drawn_area(sprite))
+            current_states[sprite] = state
+            previous_state = self.sprite_states.get(sprite)
+
+            # if statement checking if the sprite has appeared, moved or changed its image
+            if previous_state != state:
+                dirty_rects.append(pygame.Rect(state[1]))
+                if previous_state is not None:
+                    dirty_rects.append(pygame.Rect(previous_state[1]))
+
+        # for loop adding the area of every sprite that has disappeared since the last frame
+        for sprite, previous_state in self.sprite_states.items():
+            if sprite not in current_states:
+                dirty_rects.append(pygame.Rect(previous_state[1]))
+
+        self.sprite_states = current_states
+
+        # the area of the overlay is always redrawn, as its text changes and it may have been hidden since the last frame
+        if self.overlay_rect is not None:
+            dirty_rects.append(self.overlay_rect)
+
+        # for loop clearing each dirty area and redrawing every sprite that overlaps with it
+        for rect in dirty_rects:
+            self.screen.set_clip(rect)
+            self.screen.fill(BLACK, rect)
+            for sprite in sprites:
+                if rect.colliderect(current_states[sprite][1]):
+                    self.screen.blit(sprite.image, sprite.rect)
+        self.screen.set_clip(None)
+
+        # if statement checking if the profiler overlay is shown, in which case it is drawn over the redrawn sprites
+        self.overlay_rect = None
+        if self.profiler.show_overlay:
+            self.overlay_rect = self.profiler.draw_overlay(self.screen)
+            dirty_rects.append(self.overlay_rect)
+        self.profiler.lap("draw")
+
+        # pushing only the dirty areas to the display
+        pygame.display.update(dirty_rects)
+        self.profiler.lap("flip")
+
+    def drawn_area(self, sprite):
+        """
+        This method returns the area of the screen a sprite is drawn on. This is the size of its image placed at the top left of its rect, as the image of a sprite such as the healthbar can be a different size from its rect.
+
+        Args:
+            sprite (Sprite): the sprite being drawn
+
+        Returns:
+            tuple of the x, y, width and height of the area
+        """
+        return (sprite.rect.x, sprite.rect.y) + sprite.image.get_size()
@@ -0,0 +1,198 @@
+import struct
+from helper.settings import GameSettings
+
+# bytes at the start of every replay file, used to recognise the file format
+REPLAY_MAGIC = b"KCRP"
+REPLAY_VERSION = 9
+
+# header of a replay file: magic, version, rng seed, tick length in milliseconds, number of lanes, the calibrated input and spawn offsets, whether the match is a versus match and its rival latency, whether the chart is played in time with a song, the resolved settings of the game difficulty and the maximum hp derived from them, the width and height of the display the match was played on, followed by the length-prefixed game difficulty and chart path
+HEADER_FORMAT = struct.Struct("<4sBQdBdd?d?dddIIQHH")
+STRING_LENGTH_FORMAT = struct.Struct("<H")
+
+# a single recorded input: the tick it was applied on, the index of its action and the timestamp it happened at. Index 0 is the start action, index i + 1 is the key of lane i being pressed and index lane_count + i + 1 is the key of lane i being released and, in a versus match, index 2 * lane_count + i + 1 is the rival pressing the key of lane i.
+# the last record of a replay file has the END_INDEX, marking the tick the match was closed on.
+INPUT_FORMAT = struct.Struct("<IBd")
+END_INDEX = 255
+
+
+class ReplayHeader:
+    """
+    The ReplayHeader class holds the settings a recorded match was played with, which are needed to re-simulate it exactly.
+
+    Args:
+        seed (int): seed of the random number generator of the match
+        tick_ms (float): length of a single simulation tick in milliseconds
+        lane_count (int): number of lanes of the match
+        settings (GameSettings): settings of the game difficulty the match is played at. The resolved values and the display size are stored in the header, so the match is re-simulated the same way whatever the difficulty profiles and the .env are on the machine reading it
+        chart_path (str): path to the chart played in the match, or an empty string if arrows were sent out randomly
+        input_offset (float): number of milliseconds key presses were moved back by before they were judged
+        spawn_offset (float): number of milliseconds chart notes were sent out later by
+        versus (bool): boolean value indicating that the enemy arrows were played by a second player instead of the bot
+        rival_latency (float): number of milliseconds the enemy arrows were kept past their hit window in a versus match
+        song_sync (bool): boolean value indicating that the chart was played in time with a song
+
+    Attributes:
+        difficulty (str): name of the game difficulty of the match
+
+        Kindly refer to the arguments above for the other attributes, which are stored as attributes of the same name
+    """
+    def __init__(self, seed: int, tick_ms: float, lane_count: int, settings: GameSettings, chart_path: str = "", input_offset: float = 0, spawn_offset: float = 0, versus: bool = False, rival_latency: float = 0, song_sync: bool = False):
+        self.seed = seed
+        self.tick_ms = tick_ms
+        self.lane_count = lane_count
+        self.settings = settings
+        self.difficulty = settings.difficulty
+        self.chart_path = chart_path or ""
+        self.input_offset = input_offset
+        self.spawn_offset = spawn_offset
+        self.versus = versus
+        self.rival_latency = rival_latency
+        self.song_sync = song_sync
+
+
+def write_string(replay_file, text: str):
+    """
+    This function writes a length-prefixed utf-8 string to a replay file.
+
+    Args:
+        replay_file (file): replay file opened for writing in binary mode
+        text (str): the string to be written
+
+    Returns:
+        None
+    """
+    data = text.encode("utf-8")
+    replay_file.write(STRING_LENGTH_FORMAT.pack(len(data)))
+    replay_file.write(data)
+
+
+def read_string(replay_file):
+    """
+    This function reads a length-prefixed utf-8 string from a replay file.
+
+    Args:
+        replay_file (file): replay file opened for reading in binary mode
+
+    Returns:
+        the string that has been read
+    """
+    (length,) = STRING_LENGTH_FORMAT.unpack(replay_file.read(STRING_LENGTH_FORMAT.size))
+    return replay_file.read(length).decode("utf-8")
+
+
+def write_header(replay_file, header: ReplayHeader):
+    """
+    This function writes the header of a replay file.
+
+    Args:
+        replay_file (file): replay file opened for writing in binary mode
+        header (ReplayHeader): the settings the match is played with
+
+    Returns:
+        None
+    """
+    replay_file.write(HEADER_FORMAT.pack(REPLAY_MAGIC, REPLAY_VERSION, header.seed, header.tick_ms, header.lane_count, header.input_offset, header.spawn_offset, header.versus, header.rival_latency, header.song_sync, header.settings.arrow_speed, header.settings.arrow_interval, header.settings.enemy_miss_probability, header.settings.percentage_loss, header.settings.percentage_gain, header.settings.max_hp, header.settings.width, header.settings.height))
+    write_string(replay_file, header.difficulty)
+    write_string(replay_file, header.chart_path)
+
+
+def read_header(replay_file, replay_path: str = "replay"):
+    """
+    This function reads the header of a replay file.
+
+    Args:
+        replay_file (file): replay file opened for reading in binary mode
+        replay_path (str): optional argument for the name of the file, used in error messages
+
+    Returns:
+        the ReplayHeader that has been read
+    """
+    magic, version, seed, tick_ms, lane_count, input_offset, spawn_offset, versus, rival_latency, song_sync, arrow_speed, arrow_interval, enemy_miss_probability, percentage_loss, percentage_gain, max_hp, width, height = HEADER_FORMAT.unpack(replay_file.read(HEADER_FORMAT.size))
+
+    # if statement checking if the file is a replay file this version of the game can read
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        raise ValueError(f"{replay_path} is not a version {REPLAY_VERSION} replay file")
+
+    # if statement checking if the settings can be created from the stored values, as a zero percentage loss or gain cannot
+    if arrow_speed <= 0 or percentage_loss <= 0 or percentage_gain <= 0:
+        raise ValueError(f"{replay_path} has invalid game settings")
+    settings = GameSettings(read_string(replay_file), arrow_speed, arrow_interval, enemy_miss_probability, percentage_loss, percentage_gain, width, height)
+
+    # if statement checking if the display is large enough for the arrows to travel up to their BW arrows, as the travel time of every arrow is derived from its height
+    if width <= 0 or settings.arrow_travel_time <= 0:
+        raise ValueError(f"{replay_path} was played on a {width}x{height} display, which is too small for the arrows to travel")
+
+    # if statement checking if the settings give the maximum hp the match was played with, as every hp change is derived from it
+    if settings.max_hp != max_hp:
+        raise ValueError(f"{replay_path} was played with a maximum hp of {max_hp}, but its settings give {settings.max_hp}")
+
+    return ReplayHeader(seed, tick_ms, lane_count, settings, read_string(replay_file), input_offset, spawn_offset, versus, rival_latency, song_sync)
+
+
+class ReplayRecorder:
+    """
+    The ReplayRecorder class writes every input applied to a GameSession to a compact binary replay file.
+
+    Each input takes 13 bytes: the tick it was applied on, the index of its action and the timestamp it happened at, which the key press is judged against. Together with the header, this is enough to re-simulate the match exactly.
+
+    Args:
+        replay_path (str): path to the replay file that is written
+        header (ReplayHeader): the settings the match is played with
+        actions (list): every input action of the match, in the order of their action index
+
+    Attributes:
+        replay_file (file): the replay file opened for writing
+        action_indexes (dict): dictionary mapping each input action to the index it is written as
+    """
+    def __init__(self, replay_path: str, header: ReplayHeader, actions: list):
+        self.replay_file = open(replay_path, "wb")
+        write_header(self.replay_file, header)
+
+        self.action_indexes = {action: index for index, action in enumerate(actions)}
+
+    def record(self, tick: int, inputs):
+        """
+        This method writes the inputs applied on a tick to the replay file.
+
+        Args:
+            tick (int): number of the tick the inputs were applied on
+            inputs (iterable): the InputEvents applied on the tick
+
+        Returns:
+            None
+        """
+        for action, input_time in inputs:
+            # if statement checking if the action has no action index, which would be read back as a different action
+            if action not in self.action_indexes:
+                raise ValueError(f"cannot record unknown input action {action!r}")
+            self.replay_file.write(INPUT_FORMAT.pack(tick, self.action_indexes[action], input_time))
+
+    def close(self, tick: int):
+        """
+        This method marks the tick the match was closed on and closes the replay file.
+
+        Args:
+            tick (int): number of the last tick of the match
+
+        Returns:
+            None
+        """
+        self.replay_file.write(INPUT_FORMAT.pack(tick, END_INDEX, 0))
+        self.replay_file.close()
+
+
+def load_replay(replay_path: str):
+    """
+    This function reads a replay file written by ReplayRecorder.
+
+    Args:
+        replay_path (str): path to the replay file
+
+    Returns:
+        tuple of the ReplayHeader of the match and a list of (tick, action index, timestamp) tuples in the order they were recorded
+    """
+    with open(replay_path, "rb") as replay_file:
+        header = read_header(replay_file, replay_path)
+        inputs = [INPUT_FORMAT.unpack(record) for record in iter(lambda: replay_file.read(INPUT_FORMAT.size), b"") if len(record) == INPUT_FORMAT.size]
+
+    return header, inputs
@@ -0,0 +1,159 @@
+import os
+import json
+from math import lcm
+from types import MappingProxyType
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+from agents.judgement import PERFECT, GREAT, GOOD
+
+# loading the size of the pygame display, the number of lanes, the game difficulty and the path to an optional difficulty profile file from .env. This is the only module the game objects read their settings from.
+load_dotenv()
+WIDTH = int(os.getenv("WIDTH", 400))
+HEIGHT = int(os.getenv("HEIGHT", 600))
+LANE_COUNT = int(os.getenv("LANE_COUNT", 4))
+GAME_DIFFICULTY = os.getenv("GAME_DIFFICULTY", "easy").lower()
+SETTINGS_PROFILE = os.getenv("SETTINGS_PROFILE") or None
+
+# dictionary storing the settings of each game difficulty
+DIFFICULTY_PROFILES = {
+    "easy": {
+        "arrow_speed": 180, # arrows ascend at 180 pixels per second
+        "arrow_interval": 500, # arrows come in intervals of 500 milliseconds
+        "enemy_miss_probability": 0.3, # enemy's probability of success is 1-0.3 = 0.7
+        "percentage_loss": 40, # percentage loss is an integer that scales inversely with the player's hp loss.
+        "percentage_gain": 20, # percentage gain is an integer that scales inversely with the player's hp gain.
+    },
+    "medium": {
+        "arrow_speed": 210,
+        "arrow_interval": 450,
+        "enemy_miss_probability": 0.2,
+        "percentage_loss": 30,
+        "percentage_gain": 25,
+    },
+    "hard": {
+        "arrow_speed": 240,
+        "arrow_interval": 400,
+        "enemy_miss_probability": 0.1,
+        "percentage_loss": 20,
+        "percentage_gain": 30,
+    },
+    "extreme": {
+        "arrow_speed": 300,
+        "arrow_interval": 300,
+        "enemy_miss_probability": 0.05,
+        "percentage_loss": 15,
+        "percentage_gain": 40,
+    },
+}
+
+# number of arrow intervals in a round of the player or the enemy
+ARROWS_PER_ROUND = 20
+
+
+@dataclass(frozen=True)
+class GameSettings:
+    """
+    The GameSettings class holds every setting of a game difficulty, together with the values derived from them, which are computed once when the settings are created.
+
+    The settings are immutable, so a single GameSettings object can be shared by every object of a game session. Switching difficulty is done by passing a different GameSettings object to a new session.
+
+    Args:
+        difficulty (str): name of the game difficulty
+        arrow_speed (float): speed of the arrows in pixels per second
+        arrow_interval (float): number of milliseconds between two randomly sent out arrows
+        enemy_miss_probability (float): probability of the enemy missing an arrow
+        percentage_loss (int): integer that scales inversely with the player's hp loss
+        percentage_gain (int): integer that scales inversely with the player's hp gain
+        width (int): optional argument for the width of the pygame display
+        height (int): optional argument for the height of the pygame display
+
+    Attributes:
+        round_duration (float): number of milliseconds in a round of the player or the enemy
+        arrow_travel_time (float): milliseconds an arrow takes from being sent out at the bottom of the screen to reaching its BW arrow in the middle of the screen
+        max_hp (int): maximum hp of the player. HP is kept as a whole number, so this is chosen as the smallest value for which every hp change below is a whole number and no rounding error builds up over a game. The player starts with half of this hp, and every change is a fraction of that starting hp.
+        hp_loss (int): hp lost when the player misses an arrow
+        hp_gain (int): hp gained when the player hits an arrow perfectly
+        enemy_score_loss (int): hp lost when the enemy scores
+        judgement_gain (mappingproxy): read-only dictionary mapping each judgement of a hit to the hp gained with it. Only a perfect hit gains the full hp_gain.
+
+        Kindly refer to the arguments above for the other attributes, which are stored as attributes of the same name
+    """
+    difficulty: str
+    arrow_speed: float
+    arrow_interval: float
+    enemy_miss_probability: float
+    percentage_loss: int
+    percentage_gain: int
+    width: int = WIDTH
+    height: int = HEIGHT
+
+    round_duration: float = field(init=False)
+    arrow_travel_time: float = field(init=False)
+    max_hp: int = field(init=False)
+    hp_loss: int = field(init=False)
+    hp_gain: int = field(init=False)
+    enemy_score_loss: int = field(init=False)
+    judgement_gain: MappingProxyType = field(init=False, compare=False)
+
+    def __post_init__(self):
+        # the derived values are set through object.__setattr__ as the dataclass is frozen
+        max_hp = 2 * lcm(self.percentage_loss * 5, self.percentage_gain)
+        hp_gain = max_hp // 2 // self.percentage_gain
+        object.__setattr__(self, "round_duration", self.arrow_interval * ARROWS_PER_ROUND)
+        object.__setattr__(self, "arrow_travel_time", (self.height - 10 - self.height / 2) / self.arrow_speed * 1000)
+        object.__setattr__(self, "max_hp", max_hp)
+        object.__setattr__(self, "hp_loss", max_hp // 2 // self.percentage_loss)
+        object.__setattr__(self, "hp_gain", hp_gain)
+        object.__setattr__(self, "enemy_score_loss", max_hp // 10 // self.percentage_loss)
+        object.__setattr__(self, "judgement_gain", MappingProxyType({
+            PERFECT: hp_gain,
+            GREAT: hp_gain * 3 // 4,
+            GOOD: hp_gain // 2,
+        }))
+
+
+def load_profiles(profile_path: str = SETTINGS_PROFILE):
+    """
+    This function returns the settings of every game difficulty, overridden by those in a profile file if one is given.
+
+    The profile file is a JSON object mapping difficulty names to objects of the settings to be overridden, e.g. {"hard": {"arrow_speed": 260}}. A difficulty that does not exist yet is added, in which case all of its settings must be given.
+
+    Args:
+        profile_path (str | None): optional argument for the path to the profile file
+
+    Returns:
+        dictionary mapping each difficulty name to a dictionary of its settings
+    """
+    profiles = {difficulty: dict(profile) for difficulty, profile in DIFFICULTY_PROFILES.items()}
+
+    # if statement checking if a profile file is given
+    if profile_path:
+        with open(profile_path) as profile_file:
+            for difficulty, overrides in json.load(profile_file).items():
+                profiles.setdefault(difficulty.lower(), {}).update(overrides)
+
+    return profiles
+
+
+def load_settings(difficulty: str = GAME_DIFFICULTY, profile_path: str = SETTINGS_PROFILE):
+    """
+    This function creates the GameSettings of a game difficulty.
+
+    Args:
+        difficulty (str): optional argument for the name of the game difficulty
+        profile_path (str | None): optional argument for the path to a profile file overriding the settings of each difficulty
+
+    Returns:
+        GameSettings of the game difficulty
+    """
+    profiles = load_profiles(profile_path)
+
+    # if statement checking if the difficulty exists
+    if difficulty not in profiles:
+        raise ValueError(f"unknown game difficulty {difficulty!r}, expected one of {', '.join(profiles)}")
+
+    return GameSettings(difficulty, **profiles[difficulty])
+
+
+# the settings loaded from the .env when the game starts, which every game object uses unless given other settings
+game_settings = load_settings()
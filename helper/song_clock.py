@@ -0,0 +1,118 @@
+import os
+import time
+import pygame
+from dotenv import load_dotenv
+from helper.game_clock import GameClock
+
+# loading the song settings from .env
+load_dotenv()
+SONG_FILE = os.getenv("SONG_FILE") or None
+AUDIO_LATENCY = float(os.getenv("AUDIO_LATENCY", 0))
+
+# share of the measured drift between the wall clock and the audio position that is corrected every time the audio position moves. Correcting slowly hides the coarse steps the audio position moves in.
+DRIFT_CORRECTION = 0.1
+
+# number of milliseconds the wall clock can drift from the audio position before it is snapped back instead of corrected slowly, e.g. after the game has stalled
+RESYNC_THRESHOLD = 100
+
+
+class SongClock(GameClock):
+    """
+    This class is a clock driven by the playback position of the music, so that the game stays in time with the song. The game session is advanced to the position of the song every frame, and the notes of its chart are timed from the start of the song.
+
+    The position reported by pygame.mixer.music.get_pos() only moves each time the sound card takes a new buffer of audio, so it jumps in steps of several milliseconds. The clock therefore runs on the high resolution wall clock, and every time the audio position moves the drift between the two is measured and slowly corrected. Over a long song the clock follows the audio, even if the machine is loaded and the sound card plays slightly faster or slower than the wall clock.
+
+    The time is shifted back by the audio latency, being the time between audio being handed to the sound card and it being heard.
+
+    This is a child class of the GameClock class.
+
+    Args:
+        song_path (str): path to the music file
+        latency (float): optional argument for the audio latency in milliseconds
+
+    Attributes:
+        song_path (str): path to the music file
+        latency (float): the audio latency in milliseconds
+        wall_start (float | None): wall clock timestamp in milliseconds at which the song was started, or None before it has been started
+        correction (float): number of milliseconds the wall clock time since wall_start is corrected by to match the audio position
+        last_audio_pos (int): the last audio position read from the mixer
+        last_time (float): the last time returned, which keeps the clock from moving backwards when it is corrected
+    """
+    def __init__(self, song_path: str, latency: float = AUDIO_LATENCY):
+        self.song_path = song_path
+        self.latency = latency
+        self.wall_start = None
+        self.correction = 0
+        self.last_audio_pos = -1
+        self.last_time = 0
+
+    def wall_time(self):
+        """
+        This method returns the current high resolution wall clock timestamp in milliseconds.
+
+        Args:
+            None
+
+        Returns:
+            float of the current timestamp in milliseconds
+        """
+        return time.perf_counter() * 1000
+
+    def play(self):
+        """
+        This method loads the song and starts playing it on a loop, starting the clock.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        pygame.mixer.music.load(self.song_path)
+        pygame.mixer.music.play(loops=-1)
+        self.wall_start = self.wall_time()
+
+    def stop(self):
+        """
+        This method stops the song.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        pygame.mixer.music.stop()
+
+    def get_ticks(self):
+        """
+        This method returns the current position of the song in milliseconds, less the audio latency.
+
+        Args:
+            None
+
+        Returns:
+            float of the milliseconds of the song that have been heard, or 0 if the song has not been started
+        """
+        # if statement checking if the song has been started
+        if self.wall_start is None:
+            return 0
+
+        estimate = self.wall_time() - self.wall_start + self.correction
+        audio_pos = pygame.mixer.music.get_pos()
+
+        # if statement checking if the audio position has moved since it was last read, which is when the drift can be measured
+        if audio_pos >= 0 and audio_pos != self.last_audio_pos:
+            self.last_audio_pos = audio_pos
+            drift = audio_pos - estimate
+
+            # snapping to the audio position if it has drifted far, otherwise correcting a share of the drift
+            if abs(drift) > RESYNC_THRESHOLD:
+                self.correction += drift
+            else:
+                self.correction += drift * DRIFT_CORRECTION
+            estimate = self.wall_time() - self.wall_start + self.correction
+
+        # the clock never moves backwards, so that arrows never move back down the screen after a correction
+        self.last_time = max(self.last_time, estimate - self.latency)
+        return self.last_time
@@ -0,0 +1,617 @@
+import io
+import os
+import time
+import select
+import socket
+import struct
+import pygame
+from dotenv import load_dotenv
+from agents.session import session_from_header
+from agents.judgement import InputEvent, JUDGEMENT_WINDOWS, MISS
+from helper.replay import read_header, write_header
+
+# loading the port versus matches are hosted on and the rival latency of the host from .env
+load_dotenv()
+VERSUS_PORT = int(os.getenv("VERSUS_PORT", 7878))
+RIVAL_LATENCY = float(os.getenv("RIVAL_LATENCY", 100))
+
+# every message starts with its type and the length of the rest of the message
+FRAME_FORMAT = struct.Struct("<BH")
+
+# types of the messages. The host sends MATCH once with the replay header of the match and then a DELTA after every step of the match, and the rival sends PRESS with its key presses.
+MATCH = 1
+DELTA = 2
+PRESS = 3
+
+# a PRESS message is a list of key presses, each being the index of the lane and the timestamp the key was pressed at
+PRESS_FORMAT = struct.Struct("<Bd")
+
+# a DELTA message is the tick count of the match, from which the rival obtains the timestamp, followed by every change since the last DELTA as a list of events, each starting with its code
+TICK_FORMAT = struct.Struct("<I")
+
+# an arrow has been sent out: owner in the top bit and lane index in the other bits, spawn timestamp relative to the tick and hold length in milliseconds, which is as wide as the hold lengths of a chart. Arrows are numbered in the order they are sent out.
+SPAWN = 1
+SPAWN_FORMAT = struct.Struct("<BBfI")
+
+# an arrow has been killed: its number
+KILL = 2
+KILL_FORMAT = struct.Struct("<BH")
+
+# the hp of the player has changed: the new hp
+HP = 3
+HP_FORMAT = struct.Struct("<Bi")
+
+# a BW arrow has shown a judgement: lane index in the top bits and judgement code in the lowest two bits
+FLASH = 4
+FLASH_FORMAT = struct.Struct("<BB")
+
+# the turn or the result of the match has changed: the flags below
+STATE = 5
+STATE_FORMAT = struct.Struct("<BB")
+
+# the player or the enemy sprite has attacked: 0 for the player and 1 for the enemy
+ATTACK = 6
+ATTACK_FORMAT = struct.Struct("<BB")
+
+# bits of the flags of a STATE event
+PLAYER_TURN = 1
+ENEMY_TURN = 2
+GAME_OVER = 4
+PLAYER_LOST = 8
+
+# owners of an arrow in a SPAWN event
+PLAYER = 0
+ENEMY = 1
+
+# list of the judgements, indexed by their judgement code
+JUDGEMENT_CODES = list(JUDGEMENT_WINDOWS) + [MISS]
+
+# arrows are numbered with 16 bits, which wraps around long before two live arrows could share a number
+ARROW_NUMBERS = 2 ** 16
+
+# tuple representing the RGB values of the waiting screen
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+
+
+def session_flags(session):
+    """
+    This function packs the turn and the result of a session into the flags of a STATE event.
+
+    Args:
+        session (GameSession): the session
+
+    Returns:
+        integer of the flags
+    """
+    return (PLAYER_TURN * session.player_turn) | (ENEMY_TURN * session.enemy_turn) | (GAME_OVER * session.game_over) | (PLAYER_LOST * session.player_lost)
+
+
+def pack_message(message_type: int, payload: bytes = b""):
+    """
+    This function packs a single message.
+
+    Args:
+        message_type (int): type of the message
+        payload (bytes): optional argument for the rest of the message
+
+    Returns:
+        bytes of the message
+    """
+    return FRAME_FORMAT.pack(message_type, len(payload)) + payload
+
+
+class MessageReader:
+    """
+    The MessageReader class reads the messages waiting on a connection without blocking, so that it can be polled once every frame.
+
+    Args:
+        sock (socket): the connected socket
+
+    Attributes:
+        sock (socket): the connected socket
+        buffer (bytearray): bytes received that do not make up a full message yet
+        closed (bool): boolean value indicating that the other side has closed the connection
+    """
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = bytearray()
+        self.closed = False
+
+    def read(self, wait: bool = False):
+        """
+        This method receives the bytes waiting on the connection and returns every complete message.
+
+        Args:
+            wait (bool): optional argument for waiting until at least one message has arrived
+
+        Returns:
+            list of (message type, payload) tuples in the order they were sent
+        """
+        messages = []
+
+        # while loop receiving for as long as there are bytes waiting, or until a message has arrived if waiting
+        while not self.closed and (select.select([self.sock], [], [], None if wait and not messages else 0)[0]):
+            try:
+                data = self.sock.recv(65536)
+            except OSError:
+                data = b""
+
+            # if statement checking if the other side has closed the connection
+            if not data:
+                self.closed = True
+                break
+            self.buffer += data
+
+            # while loop taking every complete message out of the buffer
+            while len(self.buffer) >= FRAME_FORMAT.size:
+                message_type, length = FRAME_FORMAT.unpack_from(self.buffer)
+                if len(self.buffer) < FRAME_FORMAT.size + length:
+                    break
+                messages.append((message_type, bytes(self.buffer[FRAME_FORMAT.size:FRAME_FORMAT.size + length])))
+                del self.buffer[:FRAME_FORMAT.size + length]
+
+        return messages
+
+
+class DeltaEncoder:
+    """
+    The DeltaEncoder class packs the changes of a session since the last time it was encoded into the payload of a DELTA message.
+
+    Only what the rival cannot work out on its own is sent: the arrows are moved by their spawn timestamp on both sides, so an arrow is only sent when it is sent out and when it is killed. Everything else is compared against the last encoded value, so a tick without changes only costs the tick count.
+
+    Args:
+        session (GameSession): the session that is encoded
+
+    Attributes:
+        session (GameSession): the session that is encoded
+        lane_indexes (dict): dictionary mapping the name of each lane to its index
+        arrow_numbers (dict): dictionary mapping every live arrow sent to the rival to a tuple of its number and its spawn timestamp. The spawn timestamp tells an arrow reused from the pool apart from the arrow it was before.
+        next_number (int): number of the next arrow sent out
+        hp (int): hp of the player last sent
+        flags (int): flags of the session last sent
+        flashes (list): the judgement and hit and miss timestamps of every BW arrow last sent
+        attacks (list): the last attack timestamps of the player and the enemy sprites last sent
+    """
+    def __init__(self, session):
+        self.session = session
+        self.lane_indexes = {lane.name: index for index, lane in enumerate(session.lanes)}
+        self.arrow_numbers = {}
+        self.next_number = 0
+        self.hp = session.player_healthbar.hp
+        self.flags = session_flags(session)
+        self.flashes = [self.flash_state(lane.bw_arrow) for lane in session.lanes]
+        self.attacks = [session.player.last_attack, session.enemy.last_attack]
+
+    @staticmethod
+    def flash_state(bw_arrow):
+        """
+        This method returns the state of a BW arrow that changes every time it shows a judgement.
+
+        Args:
+            bw_arrow (ArrowBW): the BW arrow
+
+        Returns:
+            tuple of the last judgement shown and the timestamps of the last hit and miss
+        """
+        return (bw_arrow.judgement, bw_arrow.last_arrow_hit, bw_arrow.last_arrow_miss)
+
+    def encode(self):
+        """
+        This method packs every change of the session since the last call.
+
+        Args:
+            None
+
+        Returns:
+            bytes of the payload of the DELTA message
+        """
+        session = self.session
+        tick_time = session.clock.get_ticks()
+        payload = bytearray(TICK_FORMAT.pack(session.tick_count))
+
+        # for loop sending every arrow that has been killed, or killed and reused from the pool, since the last call
+        for arrow, (number, spawn_time) in list(self.arrow_numbers.items()):
+            if not arrow.alive() or arrow.spawn_time != spawn_time:
+                payload += KILL_FORMAT.pack(KILL, number)
+                del self.arrow_numbers[arrow]
+
+        # for loop sending every arrow that has been sent out since the last call
+        for owner, sprites in ((PLAYER, session.player_arrow_sprites), (ENEMY, session.enemy_arrow_sprites)):
+            for arrow in sprites:
+                if arrow not in self.arrow_numbers:
+                    self.arrow_numbers[arrow] = (self.next_number, arrow.spawn_time)
+                    self.next_number = (self.next_number + 1) % ARROW_NUMBERS
+                    payload += SPAWN_FORMAT.pack(SPAWN, owner << 7 | self.lane_indexes[arrow.arrow_dir], arrow.spawn_time - tick_time, arrow.hold)
+
+        # if statement checking if the hp of the player has changed
+        if session.player_healthbar.hp != self.hp:
+            self.hp = session.player_healthbar.hp
+            payload += HP_FORMAT.pack(HP, self.hp)
+
+        # for loop sending every BW arrow that has shown a judgement
+        for index, lane in enumerate(session.lanes):
+            flash = self.flash_state(lane.bw_arrow)
+            if flash != self.flashes[index]:
+                self.flashes[index] = flash
+                payload += FLASH_FORMAT.pack(FLASH, index << 2 | JUDGEMENT_CODES.index(flash[0]))
+
+        # if statement checking if the turn or the result of the match has changed
+        flags = session_flags(session)
+        if flags != self.flags:
+            self.flags = flags
+            payload += STATE_FORMAT.pack(STATE, flags)
+
+        # for loop sending every sprite that has attacked
+        for index, sprite in enumerate((session.player, session.enemy)):
+            if sprite.last_attack != self.attacks[index]:
+                self.attacks[index] = sprite.last_attack
+                payload += ATTACK_FORMAT.pack(ATTACK, index)
+
+        return bytes(payload)
+
+
+class VersusHost:
+    """
+    The VersusHost class hosts a versus match over the network. The host plays the player's arrows and runs the only GameSession of the match, which judges both players, and the rival plays the enemy's arrows from a VersusGuest.
+
+    The host is added to the session as an observer, and sends the changes of the session to the rival after every step.
+
+    Args:
+        port (int): optional argument for the port the match is hosted on
+
+    Attributes:
+        listener (socket): the listening socket
+        sock (socket | None): the socket connected to the rival, or None if the rival has not joined or has left
+        reader (MessageReader | None): reader of the messages of the rival
+        encoder (DeltaEncoder | None): encoder of the changes of the session
+        last_tick (int): tick count of the session when the last DELTA was sent
+        bytes_sent (int): number of bytes sent to the rival
+    """
+    def __init__(self, port: int = VERSUS_PORT):
+        self.listener = socket.create_server(("", port))
+        self.listener.settimeout(0.05)
+        self.sock = None
+        self.reader = None
+        self.encoder = None
+        self.last_tick = 0
+        self.bytes_sent = 0
+
+    def wait_for_rival(self, screen = None):
+        """
+        This method waits for the rival to join, showing a waiting screen if given one.
+
+        Args:
+            screen (Surface | None): optional argument for the display surface the waiting screen is drawn on
+
+        Returns:
+            True once the rival has joined, or False if the window has been closed first
+        """
+        font = pygame.font.SysFont(None, 28) if screen is not None else None
+
+        # while loop running until the rival has joined
+        while self.sock is None:
+            try:
+                self.sock, _ = self.listener.accept()
+            except socket.timeout:
+                pass
+
+            # if statement checking if the waiting screen is shown
+            if screen is not None:
+                for event in pygame.event.get():
+                    # if statement checking if the window has been closed
+                    if event.type == pygame.QUIT:
+                        return False
+                screen.fill(BLACK)
+                text = font.render(f"Waiting for a rival on port {self.listener.getsockname()[1]}", True, WHITE)
+                screen.blit(text, text.get_rect(center=(screen.get_width() / 2, screen.get_height() / 4)))
+                pygame.display.flip()
+
+        self.sock.settimeout(None)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = MessageReader(self.sock)
+        return True
+
+    def start(self, session):
+        """
+        This method starts sending a session to the rival. The rival creates the same session from its replay header.
+
+        Args:
+            session (GameSession): the session of the match, which must be a versus match
+
+        Returns:
+            None
+        """
+        header_file = io.BytesIO()
+        write_header(header_file, session.header())
+        self.send(pack_message(MATCH, header_file.getvalue()))
+
+        self.encoder = DeltaEncoder(session)
+        self.last_tick = session.tick_count
+        session.add_observer(self)
+
+    def send(self, message: bytes):
+        """
+        This method sends a message to the rival. The rival is taken to have left if it cannot be sent.
+
+        Args:
+            message (bytes): the message
+
+        Returns:
+            None
+        """
+        if self.sock is None:
+            return
+        try:
+            self.sock.sendall(message)
+            self.bytes_sent += len(message)
+        except OSError:
+            self.close_connection()
+
+    def render(self, session):
+        """
+        This method sends the changes of the session to the rival after every step in which a tick has been run.
+
+        Args:
+            session (GameSession): the session of the match
+
+        Returns:
+            None
+        """
+        if session.tick_count != self.last_tick:
+            self.last_tick = session.tick_count
+            self.send(pack_message(DELTA, self.encoder.encode()))
+
+    def poll(self, session):
+        """
+        This method receives the key presses of the rival, to be given to the next step of the session.
+
+        Each key press keeps the timestamp it was pressed at on the rival's screen, but is kept within the times the host can still judge fairly: no later than the end of the next tick, and no earlier than the rival latency before the current timestamp.
+
+        Args:
+            session (GameSession): the session of the match
+
+        Returns:
+            list of InputEvents of the rival actions
+        """
+        if self.reader is None:
+            return []
+
+        curr_time = session.clock.get_ticks()
+        inputs = []
+        for message_type, payload in self.reader.read():
+            if message_type != PRESS:
+                continue
+            for lane_index, press_time in PRESS_FORMAT.iter_unpack(payload):
+                if lane_index < len(session.lanes):
+                    press_time = min(max(press_time, curr_time - session.rival_latency), curr_time + session.tick_ms)
+                    inputs.append(InputEvent(session.lanes[lane_index].rival_action, press_time))
+
+        # if statement checking if the rival has left
+        if self.reader.closed:
+            self.close_connection()
+        return inputs
+
+    def close_connection(self):
+        """
+        This method closes the connection to the rival. The match goes on without the rival, who misses every enemy arrow.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if self.sock is not None:
+            self.sock.close()
+        self.sock = None
+        self.reader = None
+
+    def close(self):
+        """
+        This method closes the connection to the rival and stops hosting.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.close_connection()
+        self.listener.close()
+
+
+class VersusGuest:
+    """
+    The VersusGuest class joins a versus match as the rival, who plays the enemy's arrows.
+
+    The guest holds a GameSession created from the replay header of the match, whose game rules are never run. Instead, the changes sent by the host are applied to it, and its arrows and sprites are moved to the timestamp of the host, so it can be drawn by the same renderers as a local game. Key presses are timestamped with the host timestamp on screen when they were pressed, so the host judges them as they were seen.
+
+    Args:
+        address (str): address of the host, written as "host" or "host:port"
+        input_offset (float): optional argument for the number of milliseconds key presses are moved back by, as measured by the calibration of the rival's machine
+
+    Attributes:
+        sock (socket): the socket connected to the host
+        reader (MessageReader): reader of the messages of the host
+        session (GameSession): the session the match is drawn from
+        input_offset (float): number of milliseconds key presses are moved back by
+        arrows (dict): dictionary mapping the number of every live arrow to the Arrow of the session
+        next_number (int): number of the next arrow sent out
+        host_time (float): timestamp of the last tick received from the host
+        received_at (float): time in milliseconds of time.perf_counter() at which the last tick was received
+        running (bool): boolean value indicating that the match has not been left
+    """
+    def __init__(self, address: str, input_offset: float = 0):
+        host, _, port = address.partition(":")
+        self.sock = socket.create_connection((host, int(port or VERSUS_PORT)))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = MessageReader(self.sock)
+
+        # waiting for the replay header of the match, which is the first message of the host
+        messages = self.reader.read(wait=True)
+        if not messages or messages[0][0] != MATCH:
+            raise ConnectionError(f"{address} is not hosting a versus match")
+        header = read_header(io.BytesIO(messages[0][1]), "versus match")
+
+        # the chart of the host is not read, as its path is only valid on the host's machine and every arrow of it is sent by the host
+        header.chart_path = ""
+        self.session = session_from_header(header)
+
+        self.input_offset = input_offset
+        self.arrows = {}
+        self.next_number = 0
+        self.host_time = 0
+        self.received_at = time.perf_counter() * 1000
+        self.running = True
+
+        # applying the messages that have arrived together with the header
+        self.apply(messages[1:])
+
+    def step(self, lane_indexes = ()):
+        """
+        This method sends the key presses of the rival, applies every change received from the host and draws the session.
+
+        Args:
+            lane_indexes (iterable): optional argument for the indexes of the lanes whose keys have been pressed since the last step
+
+        Returns:
+            None
+        """
+        # timestamping the key presses with the host timestamp on screen, moved back by the calibrated input latency
+        press_time = self.host_time + time.perf_counter() * 1000 - self.received_at - self.input_offset
+        presses = b"".join(PRESS_FORMAT.pack(lane_index, press_time) for lane_index in lane_indexes)
+        if presses:
+            try:
+                self.sock.sendall(pack_message(PRESS, presses))
+            except OSError:
+                self.running = False
+
+        self.apply(self.reader.read())
+
+        # if statement checking if the host has left
+        if self.reader.closed:
+            self.running = False
+
+        # notifying all observers of the new state of the session
+        for observer in self.session.observers:
+            observer.render(self.session)
+
+    def apply(self, messages):
+        """
+        This method applies the DELTA messages of the host to the session.
+
+        Args:
+            messages (list): list of (message type, payload) tuples
+
+        Returns:
+            None
+        """
+        session = self.session
+        lanes = session.lanes
+        updated = False
+
+        for message_type, payload in messages:
+            if message_type != DELTA:
+                continue
+
+            # moving the clock of the session to the timestamp of the tick, which every event of the message happened at
+            (tick,) = TICK_FORMAT.unpack_from(payload)
+            self.host_time = tick * session.tick_ms
+            self.received_at = time.perf_counter() * 1000
+            session.tick_count = tick
+            session.clock.advance(self.host_time - session.clock.get_ticks())
+            updated = True
+
+            offset = TICK_FORMAT.size
+            # while loop applying every event of the message in order
+            while offset < len(payload):
+                code = payload[offset]
+
+                if code == SPAWN:
+                    _, owner_lane, spawn_time, hold = SPAWN_FORMAT.unpack_from(payload, offset)
+                    offset += SPAWN_FORMAT.size
+                    is_player = not owner_lane >> 7
+                    lane = lanes[owner_lane & 0x7F]
+                    arrow = session.arrow_pool.acquire(is_player, arrow_dir=lane.name, image=lane.player_image if is_player else lane.enemy_image, centerx=lane.centerx, spawn_time=self.host_time + spawn_time, hold=hold, size=lane.arrow_size)
+                    (session.player_arrow_sprites if is_player else session.enemy_arrow_sprites).add(arrow)
+                    self.arrows[self.next_number] = arrow
+                    self.next_number = (self.next_number + 1) % ARROW_NUMBERS
+
+                elif code == KILL:
+                    _, number = KILL_FORMAT.unpack_from(payload, offset)
+                    offset += KILL_FORMAT.size
+                    # the arrow may have already left the top of the screen on this side
+                    arrow = self.arrows.pop(number, None)
+                    if arrow is not None:
+                        arrow.kill()
+
+                elif code == HP:
+                    _, hp = HP_FORMAT.unpack_from(payload, offset)
+                    offset += HP_FORMAT.size
+                    session.player_healthbar.set_hp(hp)
+
+                elif code == FLASH:
+                    _, lane_judgement = FLASH_FORMAT.unpack_from(payload, offset)
+                    offset += FLASH_FORMAT.size
+                    lanes[lane_judgement >> 2].bw_arrow.judge(JUDGEMENT_CODES[lane_judgement & 0x3])
+
+                elif code == STATE:
+                    _, flags = STATE_FORMAT.unpack_from(payload, offset)
+                    offset += STATE_FORMAT.size
+                    self.apply_state(flags)
+
+                elif code == ATTACK:
+                    _, sprite = ATTACK_FORMAT.unpack_from(payload, offset)
+                    offset += ATTACK_FORMAT.size
+                    (session.enemy if sprite else session.player).attack()
+
+                else:
+                    raise ValueError(f"unknown versus event code {code}")
+
+        # moving every live arrow and sprite to the timestamp of the host while the match is on, as the session does after every tick
+        if updated and not session.game_over:
+            session.base_game_sprites.update()
+            for number, arrow in list(self.arrows.items()):
+                # if statement checking if the arrow is still to come onto the screen
+                if arrow.spawn_time > self.host_time:
+                    continue
+                arrow.move(self.host_time)
+                # forgetting the arrows that have left the top of the screen, so that a reused arrow is only known by its new number
+                if not arrow.alive():
+                    del self.arrows[number]
+            session.bw_arrow_sprites.update()
+
+    def apply_state(self, flags: int):
+        """
+        This method applies the turn and the result of the match sent by the host.
+
+        Args:
+            flags (int): the flags of the STATE event
+
+        Returns:
+            None
+        """
+        session = self.session
+        session.player_turn = bool(flags & PLAYER_TURN)
+        session.enemy_turn = bool(flags & ENEMY_TURN)
+
+        # if statement checking if the match has just ended, in which case the loser's sprite is changed to its lose sprite
+        if flags & GAME_OVER and not session.game_over:
+            session.game_over = True
+            session.player_lost = bool(flags & PLAYER_LOST)
+            (session.player if session.player_lost else session.enemy).lose()
+
+    def close(self):
+        """
+        This method leaves the match.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.running = False
+        self.sock.close()
+        self.session.close()
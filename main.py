@@ -1,6 +1,6 @@
 import pygame
-from helper.load_img import LoadImage
 import os
+import argparse
 from dotenv import load_dotenv
 
 # Loading .env file to obtain the width and height of the pygame display and the FPS of the game
@@ -9,13 +9,6 @@ WIDTH = int(os.getenv("WIDTH", 400))
 HEIGHT = int(os.getenv("HEIGHT", 600))
 FPS = int(os.getenv("FPS", 60))
 
-# constant variable for the maximum with of the hp bar
-MAX_HP_BAR_LENGTH = WIDTH * 2/3
-
-# tuple representing the RGB values of black and red
-BLACK = (0,0,0)
-RED = (255,0,0)
-
 # initializing pygame
 pygame.init()
 
@@ -24,551 +17,202 @@ pygame.mixer.init()
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 
 # importing rest of the classes. Note that the classes are imported here as the pygame display needs to be created first for the sprites to spawn on or an error will occur.
-from agents.arrows import ArrowBW
-from agents.gamemaster import GameMaster
-from agents.healthbar import HealthBar, GreenHealthBar
-from agents.player import Player, Enemy
-
-# loading in sprite images
-images = LoadImage()
-images.load_images()
-
-# arrow dictionary containing the x coordinate for all arrow sprites
-arrow_dict = {
-    "left" : WIDTH/5,
-    "right" : 4*WIDTH/5,
-    "up" : 2*WIDTH/5,
-    "down" : 3*WIDTH/5
-}
+from agents.session import GameSession, START, SEED_MASK, MAX_CATCHUP_TICKS, replay_match
+from helper.renderer import Renderer, DirtyRenderer
+from helper.profiler import frame_profiler, PROFILE_OUTPUT
+from helper.input_sampler import InputSampler, INPUT_SAMPLING
+from helper.song_clock import SongClock, SONG_FILE
+from agents.judgement import InputEvent
+from helper.calibration import Calibration, run_calibration
+from helper.settings import load_settings, load_profiles, GAME_DIFFICULTY
+from helper.versus import VersusHost, VersusGuest, RIVAL_LATENCY
+
+# boolean value from the .env determining if only the changed parts of the screen are redrawn every frame instead of the whole screen
+DIRTY_RENDERING = os.getenv("DIRTY_RENDERING", "false").lower() == "true"
+
+# path to the chart file played in the game from the .env. Arrows are sent out randomly if no chart is given.
+CHART_FILE = os.getenv("CHART_FILE") or None
 
 # creating pygame clock object for controlling game speed
 clock = pygame.time.Clock()
 
-# variable storing the player's turn
-player_turn = False
+def seed_argument(text: str):
+    """
+    This function reads the seed given on the command line, which has to fit in the 64 bits it is stored with in replay files.
+
+    Args:
+        text (str): the seed as given on the command line
 
-# variable storing the enemy turn
-enemy_turn = False
+    Returns:
+        integer of the seed
+    """
+    seed = int(text)
+
+    # if statement checking if the seed does not fit in 64 bits
+    if not 0 <= seed <= SEED_MASK:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and {SEED_MASK}")
+    return seed
 
-# number of ticks before next character's turn
-turn_break = 5000
 
 if __name__ == "__main__":
-    # creating a pygame sprite Group that will contain the healthbar sprites, player and enemy sprites for the game
-    base_game_sprites = pygame.sprite.Group()
-
-    # creating the player object
-    player = Player()
-
-    # creating the enemy object
-    enemy = Enemy()
-
-    # creating the "lost" healthbar object
-    healthbar = HealthBar()
-
-    # creating the player healthbar object
-    player_healthbar = GreenHealthBar()
-
-    # adding the player, healthbar and player_healthbar into the base_game_sprites
-    base_game_sprites.add(player)
-    base_game_sprites.add(healthbar)
-    base_game_sprites.add(player_healthbar)
-    base_game_sprites.add(enemy)
-
-    # creating respective sprite groups for all 4 directions. These groups are necessary to control their responses to certain collisions in later parts
-    player_left_arrow_sprites = pygame.sprite.Group()
-    player_right_arrow_sprites = pygame.sprite.Group()
-    player_up_arrow_sprites = pygame.sprite.Group()
-    player_down_arrow_sprites = pygame.sprite.Group()
-
-    # creating the arrow_sprites sprite group and adding all 4 arrow sprite groups. This group is used for easier control of all arrow sprites.
-    player_arrow_sprites = pygame.sprite.Group()
-    player_arrow_sprites.add(
-        player_left_arrow_sprites, 
-        player_right_arrow_sprites, 
-        player_up_arrow_sprites, 
-        player_down_arrow_sprites
-        )
-    
-    # creating respective sprite groups for all 4 directions. These groups are necessary to control their responses to certain collisions in later parts
-    enemy_left_arrow_sprites = pygame.sprite.Group()
-    enemy_right_arrow_sprites = pygame.sprite.Group()
-    enemy_up_arrow_sprites = pygame.sprite.Group()
-    enemy_down_arrow_sprites = pygame.sprite.Group()
-
-    # creating the arrow_sprites sprite group and adding all 4 arrow sprite groups. This group is used for easier control of all arrow sprites.
-    enemy_arrow_sprites = pygame.sprite.Group()
-    enemy_arrow_sprites.add(
-        enemy_left_arrow_sprites, 
-        enemy_right_arrow_sprites, 
-        enemy_up_arrow_sprites, 
-        enemy_down_arrow_sprites
-        )
-
-    # creating the GameMaster objects for player and enemy
-    player_game_master = GameMaster(is_player=True)
-    enemy_game_master = GameMaster(is_player=False)
-    
-
-    # creating a ArrowBW object for the left arrow 
-    left_arrow_bw = ArrowBW(centerx = arrow_dict["left"], 
-                            image = images.left_arrow_bw, 
-                            hit_image=images.left_arrow_hit, 
-                            miss_image=images.left_arrow_miss)
-
-    # creating a ArrowBW object for the right arrow
-    right_arrow_bw = ArrowBW(centerx = arrow_dict["right"], 
-                            image = images.right_arrow_bw,
-                            hit_image=images.right_arrow_hit, 
-                            miss_image=images.right_arrow_miss)
-
-    # creating a ArrowBW object for the up arrow
-    up_arrow_bw = ArrowBW(centerx = arrow_dict["up"], 
-                        image = images.up_arrow_bw, 
-                        hit_image=images.up_arrow_hit, 
-                        miss_image=images.up_arrow_miss)
-
-    # creating a ArrowBW object for the down arrow
-    down_arrow_bw = ArrowBW(centerx = arrow_dict["down"], 
-                            image = images.down_arrow_bw, 
-                            hit_image=images.down_arrow_hit, 
-                            miss_image=images.down_arrow_miss)
-
-    # creating a Sprite group and adding the bw arrow sprites
-    bw_arrows = [left_arrow_bw, right_arrow_bw, up_arrow_bw, down_arrow_bw]
-    bw_arrow_sprites = pygame.sprite.Group(bw_arrows)
-    for bw_arrow in bw_arrows:
-        bw_arrow_sprites.add(bw_arrow)
-
-    # boolean value indicating that the game is running 
-    running = True
-
-    # boolean value indicating if the game is over
-    game_over = False
-
-    # boolean value indicating if the player has lost
-    player_lost = False
+    parser = argparse.ArgumentParser(description="Play the game.")
+    parser.add_argument("--seed", type=seed_argument, default=None, help="seed of the random number generator, chosen randomly if not given")
+    parser.add_argument("--record", default=None, metavar="PATH", help="record the inputs of the match to a replay file")
+    parser.add_argument("--replay", default=None, metavar="PATH", help="re-simulate a recorded match without a window and print its result")
+    parser.add_argument("--difficulty", choices=list(load_profiles()), default=GAME_DIFFICULTY, help="game difficulty to play at, overriding GAME_DIFFICULTY in the .env")
+    parser.add_argument("--calibrate", action="store_true", help="measure the audio and visual latency of this machine before playing")
+    parser.add_argument("--host", action="store_true", help="host a versus match, in which the enemy arrows are played by a second player who joins over the network")
+    parser.add_argument("--join", default=None, metavar="ADDRESS", help="join the versus match hosted at ADDRESS, written as host or host:port, and play the enemy arrows")
+    args = parser.parse_args()
+
+    # if statement checking if a recorded match should be re-simulated instead of played
+    if args.replay:
+        session = replay_match(args.replay)
+        result = "lost" if session.player_lost else "won" if session.game_over else "unfinished"
+        print(f"seed {session.seed}: {result} after {session.tick_count} ticks with {session.player_healthbar.hp}/{session.settings.max_hp} hp")
+        print(", ".join(f"{judgement} {count}" for judgement, count in session.judgements.items()))
+        pygame.quit()
+        raise SystemExit
+
+    # obtaining the latency offsets of this machine, measuring them first if asked to
+    calibration = Calibration.load()
+    if args.calibrate:
+        calibration = run_calibration(screen) or calibration
+        print(f"audio offset {calibration.audio_offset} ms, visual offset {calibration.visual_offset} ms")
+
+    # if statement checking if a versus match should be joined as the rival, in which case the match is drawn from the changes sent by the host
+    if args.join:
+        guest = VersusGuest(args.join, input_offset=calibration.input_offset)
+
+        # if statement checking if the host plays on a display of a different size, in which case the window is resized to it, as the match is laid out for the display of the host
+        if screen.get_size() != (guest.session.settings.width, guest.session.settings.height):
+            screen = pygame.display.set_mode((guest.session.settings.width, guest.session.settings.height))
+        guest.session.add_observer(DirtyRenderer(screen) if DIRTY_RENDERING else Renderer(screen))
+
+        # dictionary mapping each lane's keyboard key to the index of its lane
+        key_lanes = {lane.key: index for index, lane in enumerate(guest.session.lanes)}
+
+        # while loop running until the match is left or the host has left
+        while guest.running:
+            clock.tick(FPS)
+            lane_indexes = []
+            for event in pygame.event.get():
+                # if statement checking if the event type is quitting the game
+                if event.type == pygame.QUIT:
+                    guest.close()
+
+                # if statement checking if the event type is pushing any of the lanes' keys down
+                if event.type == pygame.KEYDOWN and event.key in key_lanes:
+                    lane_indexes.append(key_lanes[event.key])
+
+            if guest.running:
+                guest.step(lane_indexes)
+        pygame.quit()
+        raise SystemExit
+
+    # creating the game session and drawing it on screen after every step
+    session = GameSession(chart_path=CHART_FILE, seed=args.seed, settings=load_settings(args.difficulty), input_offset=calibration.input_offset, spawn_offset=calibration.spawn_offset, versus=args.host, rival_latency=RIVAL_LATENCY if args.host else 0, song_sync=SONG_FILE is not None)
+    if args.record:
+        session.start_recording(args.record)
+    renderer = DirtyRenderer(screen) if DIRTY_RENDERING else Renderer(screen)
+    session.add_observer(renderer)
+
+    # waiting for the rival to join if hosting a versus match, after which the changes of the session are sent to the rival after every step
+    versus_host = VersusHost() if args.host else None
+    if versus_host is not None:
+        # if statement checking if the game was closed before the rival joined, in which case the game is closed without playing
+        if not versus_host.wait_for_rival(screen):
+            session.close()
+            versus_host.close()
+            pygame.quit()
+            raise SystemExit
+        versus_host.start(session)
+
+    # dictionary mapping each keyboard key to the input action it performs in the game session. Every lane's key presses its lane, and "1" starts the game.
+    key_actions = {lane.key: lane.name for lane in session.lanes}
+    key_actions[pygame.K_1] = START
+
+    # dictionary mapping each lane's keyboard key to the input action of it being released, which ends hold notes
+    release_actions = {lane.key: lane.release_action for lane in session.lanes}
+
+    # starting the song if one is given in the .env. The game is then advanced by the song's playback position instead of the wall clock, so arrows stay in time with the music.
+    song_clock = SongClock(SONG_FILE) if SONG_FILE else None
+    if song_clock is not None:
+        song_clock.play()
+
+    # restarting the frame clock and creating the input sampler if enabled in the .env, which polls for key presses while waiting for the next frame and timestamps them. Both are started here, so that the time spent on the calibration, waiting for the rival and loading the game is not taken as the first frame.
+    clock.tick()
+    sampler = InputSampler(FPS) if INPUT_SAMPLING else None
 
     # while loop the runs indefinitely until the game is stopped
-    while running:
-        
-        # run the loop at the declared FPS
-        clock.tick(FPS)
-        
-        # obtaining a dict of all collisions between arrow sprites and their corresponding bw arrow sprites. 
-        # Note that the coloured player sprites are not killed upon immediate contact with the BW arrow sprites.
-        collisions = pygame.sprite.groupcollide(player_arrow_sprites, bw_arrow_sprites, False, False)
-        
+    while session.running:
+
+        # if statement checking if the input sampler is used
+        if sampler is not None:
+            # waiting for the next frame while polling, and obtaining every event with the milliseconds since it was polled
+            dt = sampler.tick()
+            events = sampler.drain()
+        else:
+            # run the loop at the declared FPS, obtaining the milliseconds passed since the last frame. Events have no timestamp and are taken to have happened now.
+            dt = clock.tick(FPS)
+            events = [(event, None) for event in pygame.event.get()]
+
+        # if statement checking if the song is the master clock, in which case the game advances to the playback position of the song, counted from the session timestamp the song started at. Time the session has dropped after a stall is caught up with over the next frames.
+        if song_clock is not None:
+            dt = max(song_clock.get_ticks() - (session.clock.get_ticks() + session.accumulator - session.chart_start), 0)
+        frame_profiler.begin_frame()
+
+        # obtaining the session timestamp at the end of this frame's step, which timestamped events are placed back in time from
+        end_time = session.clock.get_ticks() + min(session.accumulator + dt, MAX_CATCHUP_TICKS * session.tick_ms)
+
         ## Game logic for handling keyboard inputs from the player
-        # for loop iterating through each event in this instance of pygame
-        for event in pygame.event.get():
+        inputs = []
+        for event, age in events:
             # if statement checking if the event type is quitting the game
             if event.type == pygame.QUIT:
-                running = False
-            
-            # if statement checking if the event type is pushing any keys down
-            if event.type == pygame.KEYDOWN:
-                
-                # if statement checking if the detected keydown is the button "1"
-                if event.key == pygame.K_1 and not game_over:
-                    # if so, the game_master starts
-                    player_game_master.start = True
-
-                    # setting the round start timestamp
-                    player_game_master.round_start = pygame.time.get_ticks()
-
-                    # player no longer in idle mode
-                    player.idle = False
-
-                    # player has started playing
-                    player_turn = True
-
-                # if statement checking if the player has pressed on the up arrow key
-                if event.key == pygame.K_UP:
-                    # displaying the player attack animation
-                    player.attack()
-
-                    # boolean value storing if the player has failed to time the up arrow key successfully.
-                    # if it's not player's turn, this is set to false so player hp is not lost when up arrow key is pressed during bot's turn
-                    up_fail = True if player_turn else False
-
-                    # for loop iterating through all player arrow sprites
-                    for arrow in player_up_arrow_sprites.sprites():
-                        # if arrow has collide with BW arrow
-                        if arrow in collisions:
-                            # change BW up arrow to score arrow sprite
-                            up_arrow_bw.score()
-
-                            # kill the player arrow sprite
-                            arrow.kill()
-
-                            # player gains health
-                            player_healthbar.gain_health()
-
-                            # player did not fail to press the up key correctly
-                            up_fail = False
-
-                            # break the loop
-                            break
-                    # if loop checking if the user has failed to time the arrow (missed the arrow)
-                    if up_fail:
-                        # changeBW up arrow to fail arrow sprite
-                        up_arrow_bw.fail()
-                        
-                        # player loses health
-                        player_healthbar.lose_health()
-
-                # if statement checking if the player has pressed the down arrow key
-                if event.key == pygame.K_DOWN:
-                    # changing player sprite to attack player sprite
-                    player.attack()
-
-                    # tracks if the user has failed to time the arrow
-                    down_fail = True if player_turn else False
-
-                    # for loop iterating through each player down arrow sprite
-                    for arrow in player_down_arrow_sprites.sprites():
-                        # if statement checking if the down arrow has collided with a BW arrow
-                        if arrow in collisions:
-                            # changing the BW down arrow to the score arrow sprite
-                            down_arrow_bw.score()
-
-                            # killing the player arrow
-                            arrow.kill()
-
-                            # player gains health
-                            player_healthbar.gain_health()
-
-                            # setting down_fail to false as player has timed the arrow properly
-                            down_fail = False
-
-                            # breaking the loop 
-                            break
-                    # if player has failed to time the arrow properly (missed the arrow)
-                    if down_fail:
-                        # change BW down arrow to fail arrow sprite
-                        down_arrow_bw.fail()
-
-                        # player loses health
-                        player_healthbar.lose_health()
-
-                # if statement checking if the user has pressed the left arrow key
-                if event.key == pygame.K_LEFT:
-                    # changing the player sprite to attack
-                    player.attack()
-
-                    # left_fail tracks if user has failed to press the left key properly
-                    left_fail = True if player_turn else False
-
-                    # for loop iterating through each player left arrow sprites
-                    for arrow in player_left_arrow_sprites.sprites():
-                        # if statement checking if arrow has collided with a BW arrow
-                        if arrow in collisions:
-                            # changing the BW left arrow to score arrow sprite
-                            left_arrow_bw.score()
-
-                            # killing the arrow
-                            arrow.kill()
-
-                            # player gains health
-                            player_healthbar.gain_health()
-
-                            # left_fail set to false as player has time it properly 
-                            left_fail = False
-
-                            # break the loop
-                            break
-
-                    # if player has failed to time the arrow properly (missed the arrow)
-                    if left_fail:
-                        # change the bw left arrow to fail arrow sprite
-                        left_arrow_bw.fail()
-
-                        # player loses healths
-                        player_healthbar.lose_health()
-
-                # if statement checking if the user has pressed the right arrow key
-                if event.key == pygame.K_RIGHT:
-                    # changing player sprite to attack player sprite
-                    player.attack()
-
-                    # right_fail tracks if user has failed to press the right key properly
-                    right_fail = True if player_turn else False
-
-                    # for loop iterating through each player right arrow sprite
-                    for arrow in player_right_arrow_sprites.sprites():
-                        # if player arrow has collided with a BW arrow
-                        if arrow in collisions:
-                            # change BW arrow to score arrow sprite
-                            right_arrow_bw.score()
-
-                            # kill player arrow
-                            arrow.kill()
-
-                            # player gains health
-                            player_healthbar.gain_health()
-                            
-                            # right_fail set to False as player has timed the arrow properly
-                            right_fail = False
-
-                            # breaking the for loop
-                            break
-                    # if player has failed to time the arrow properly (missed the arrow)
-                    if right_fail:
-                        # change bw right arrow to fail
-                        right_arrow_bw.fail()
-
-                        # player loses health
-                        player_healthbar.lose_health()
-
-
-        ## Game logic for when a player's arrow sprite has aligned completely with the arrow bw but has not been pressed by the player (aka player has missed the arrow sprite)
-        # for loop iterating through each player right arrows
-        for arrow in player_right_arrow_sprites:
-            # if statement checking if the bottom y coordinate has reached that of the BW right arrow
-            if arrow.rect.bottom <= HEIGHT/2:
-                # change BW arrow sprite to fail sprite
-                right_arrow_bw.fail()
-
-                # player loses health
-                player_healthbar.lose_health()
-        # for loop iterating through each player left arrows
-        for arrow in player_left_arrow_sprites:
-            # if statement checking if the bottom y coordinate has reached that of the BW left arrow
-            if arrow.rect.bottom <= HEIGHT/2:
-                # change BW arrow sprite to fail sprite
-                left_arrow_bw.fail()
-                
-                # player loses health
-                player_healthbar.lose_health()
-        
-        # for loop iterating through each player up arrows
-        for arrow in player_up_arrow_sprites:
-            # if statement checking if the bottom y coordinate has reached that of the BW up arrow
-            if arrow.rect.bottom <= HEIGHT/2:
-                # change BW arrow sprite to fail sprite
-                up_arrow_bw.fail()
-
-                # player loses health
-                player_healthbar.lose_health()
-
-        # for loop iterating through each player down arrows
-        for arrow in player_down_arrow_sprites:
-            # if statement checking if the bottom y coordinate has reached that of the BW down arrow
-            if arrow.rect.bottom <= HEIGHT/2:
-                # change BW arrow sprite to fail sprite
-                down_arrow_bw.fail()
-
-                # player loses health
-                player_healthbar.lose_health()
-        
-        ## Game logic for handling enemy arrow sprites
-        # obtaining boolean value determing if the enemy has succeeded in timing the arrow
-        enemy_success = enemy_game_master.enemy_success()
-
-        # for loop iterating through each right enemy arrow sprite
-        for arrow in enemy_right_arrow_sprites:
-            # if statement checking if the arrow's y coordinate has reached the BW arrow 
-            if arrow.rect.bottom <= HEIGHT/2:
-                # changing current enemy sprite to attack enemy sprite
-                enemy.attack()
-
-                # if statement checking if enemy has succeeded
-                if enemy_success:
-                    # changing right bw arrow to score right arrow
-                    right_arrow_bw.score()
-
-                    # player loses some health
-                    player_healthbar.enemy_score()
-                else:
-                    # changing right bw arrow to fail right arrow
-                    right_arrow_bw.fail()
-
-        # for loop iterating through each right enemy arrow sprite
-        for arrow in enemy_left_arrow_sprites:
-            if arrow.rect.bottom <= HEIGHT/2:
-                enemy.attack()
-                if enemy_success:
-                    left_arrow_bw.score()
-                    player_healthbar.enemy_score()
-                else:
-                    left_arrow_bw.fail()
-                    
-        # for loop iterating through each right enemy arrow sprite
-        for arrow in enemy_up_arrow_sprites:
-            if arrow.rect.bottom <= HEIGHT/2:
-                enemy.attack()
-                if enemy_success:
-                    up_arrow_bw.score()
-                    player_healthbar.enemy_score()
-                else:
-                    up_arrow_bw.fail()
-
-        # for loop iterating through each right enemy arrow sprite
-        for arrow in enemy_down_arrow_sprites:
-            if arrow.rect.bottom <= HEIGHT/2:
-                enemy.attack()
-                if enemy_success:
-                    down_arrow_bw.score()
-                    player_healthbar.enemy_score()
-                else:
-                    down_arrow_bw.fail()
-
-        ## Game logic for checking if it's time for the enemy/player to start their turn
-        # if statement checking if it's not the enemy's turn and if the game is not yet over
-        if not enemy_turn and not game_over:
-            # obtaining boolean value determining if it's time to switch the player
-            enemy_turn = player_game_master.switch_player()
-            
-            # if statement checking if it's the enemy's turn
-            if enemy_turn:
-                # starting up the enemy's gamemaster
-                enemy_game_master.start = True
-                enemy_game_master.round_start = pygame.time.get_ticks()
-
-        # if statement checking if it's the enemy's turn
-        if enemy_turn:
-            # obtaining the next arrow for the enemy, if any
-            arrow = enemy_game_master.choose_next_arrow()
-            
-            # if statement checking if any arrow has been sent out
-            if arrow != None:
-                # obtaining string value of the arrow's direction
-                arrow_direction = arrow.arrow_dir.lower()
-
-                # match case for arrow's direction that adds the arrow to the correct enemy arrow sprite group
-                match arrow_direction:
-                    case "up":
-                        enemy_up_arrow_sprites.add(arrow)
-                    case "down":
-                        enemy_down_arrow_sprites.add(arrow)
-                    case "left":
-                        enemy_left_arrow_sprites.add(arrow)
-                    case "right":
-                        enemy_right_arrow_sprites.add(arrow)
-
-                # adding the enemy arrow sprite into the general enemy arrow sprite group
-                enemy_arrow_sprites.add(arrow)
-
-        # if statement checking if it's not the player's turn and if the game is not yet over
-        if not player_turn and not game_over:
-            # obtaining boolean value determining if it's time to switch the player
-            player_turn = enemy_game_master.switch_player()
-
-            # if statement checking if it's the player's turm
-            if player_turn:
-                # starting up player's gamemaster
-                player_game_master.start = True
-                player_game_master.round_start = pygame.time.get_ticks()
-        
-        if player_turn:
-            # choosing arrows 
-            arrow = player_game_master.choose_next_arrow()
-            
-            # adding arrow to the respective sprite groups
-            if arrow != None:
-                # obtaining the string value indicating the arrow's direction
-                arrow_direction = arrow.arrow_dir.lower()
-
-                # match case for arrow's direction that adds the arrow to the correct player arrow sprite group
-                match arrow_direction:
-                    case "up":
-                        player_up_arrow_sprites.add(arrow)
-                    case "down":
-                        player_down_arrow_sprites.add(arrow)
-                    case "left":
-                        player_left_arrow_sprites.add(arrow)
-                    case "right":
-                        player_right_arrow_sprites.add(arrow)
-                # adding the arrow sprite to the general player arrow sprite group
-                player_arrow_sprites.add(arrow)
-           
-        ## Game logic for additional checks. This ensures that as long as there are any player/enemy arrow sprites still existing in game, it will always be the correct turn.
-        # if statement checking if there are any player arrow sprites
-        if len(player_arrow_sprites.sprites()) > 0:
-            # setting player_turn to true if so
-            player_turn = True
-        else:
-            # setting player_turn to false since no player arrow sprites
-            player_turn = False
+                session.close()
 
-        # if statement checking if there are any enemy arrow sprites
-        if len(enemy_arrow_sprites.sprites()) > 0:
-            # setting enemy_turn to true if so
-            enemy_turn = True
-        else:
-            enemy_turn = False
-
-        ## Game logic for checking if player has won/lost the game through the width of the player's healthbar
-        # if statement checking if the player's healthbar width is less than or equals to 0
-        if player_healthbar.width <= 0:
-            # changing player's sprite to a lose player sprite
-            player.lose()
-            
-            # setting game_over to true as the game has concluded with the player's loss
-            game_over = True
-
-            # setting player_lost to true as player has lost
-            player_lost = True
-
-        # elif statement checking if the player's healthbar has exceeded that of the maximum healthbar length
-        elif player_healthbar.width >= MAX_HP_BAR_LENGTH:
-            # if statement checking it's not the enemy's turn and it's the players turn
-            # this ensures that the player cannot win due to the enemy's mistake. In other words, player only wins in the following round even if player's hp bar is full.
-            if not enemy_turn and player_turn:
-                # changing enemy current sprite to the enemy lose sprite
-                enemy.lose()
-
-                # setting game_over to True as game has concluded with the player's victory
-                game_over = True
-
-                # setting player_lost to false as player has won
-                player_lost = False
-            
-
-        ## Game logic for sprite updates
-        # if statement checking if the game has concluded
-        if game_over == False:
-            # updating all necessary sprite groups
-            base_game_sprites.update()
-            player_arrow_sprites.update()
-            enemy_arrow_sprites.update()
-            bw_arrow_sprites.update()
-
-        # filling screen with black background
-        screen.fill(BLACK)
-
-        #screen.blit(background, background_rect)
-
-        # drawing all necessary sprites on screen. This is placed here to ensure that all sprites are still drawn even upon the game's conclusion
-        base_game_sprites.draw(screen)
-        bw_arrow_sprites.draw(screen)
-        player_arrow_sprites.draw(screen)
-        enemy_arrow_sprites.draw(screen)
-        
-        # if statement checking if the game has concluded
-        if game_over:
-            # setting the pygame font to size 64
-            font = pygame.font.SysFont(None, 64)
-            
-            # if statement checking if the player has lost to display the appropriate game over text
-            if player_lost:
-                text_surface = font.render("YOU LOSE", True, RED)
-            else:
-                text_surface = font.render("YOU WIN", True, RED)
-
-            # setting the text rect
-            text_rect = text_surface.get_rect(center=(WIDTH / 2, HEIGHT / 4))
-
-            # adding the game over text to the screen
-            screen.blit(text_surface, text_rect)
-
-            # stopping all gamemasters
-            enemy_game_master.start = False
-            player_game_master.start = False
-    
-        pygame.display.flip()
+            # if statement checking if the window has been uncovered or resized, in which case the whole screen is redrawn
+            if event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.VIDEOEXPOSE) and DIRTY_RENDERING:
+                renderer.invalidate()
+
+            # obtaining the game action of the event, if any
+            action = None
+
+            # if statement checking if the event type is pushing any of the game's keys down
+            if event.type == pygame.KEYDOWN and event.key in key_actions:
+                action = key_actions[event.key]
+
+            # if statement checking if the event type is releasing any of the lanes' keys
+            if event.type == pygame.KEYUP and event.key in release_actions:
+                action = release_actions[event.key]
+
+            # if statement checking if the event is a game action, which is given the timestamp it was polled at if it has one
+            if action is not None:
+                inputs.append(action if age is None else InputEvent(action, end_time - age))
+
+                # recording the time between the key press being polled and it being judged
+                if age is not None:
+                    frame_profiler.record("input_lag", age)
+
+            # if statement checking if F3 has been pressed, which shows or hides the performance overlay
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                frame_profiler.toggle_overlay()
+        # adding the key presses of the rival if hosting a versus match
+        if versus_host is not None:
+            inputs.extend(versus_host.poll(session))
+        frame_profiler.lap("events")
+
+        # advancing the game session by the time passed since the last frame
+        session.step(dt, inputs)
 
     """Close the game"""
+    if versus_host is not None:
+        versus_host.close()
+    if song_clock is not None:
+        song_clock.stop()
+
+    # writing the frame times to the file given in the .env if any frames have been profiled
+    if PROFILE_OUTPUT and frame_profiler.frame_count:
+        frame_profiler.dump(PROFILE_OUTPUT)
     pygame.quit()
-            
@@ -0,0 +1,63 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# running pygame without a window or sound card, so the tests can run anywhere
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import pytest
+
+# the pygame display has to be created before the game objects are imported, as their sprites are converted for it
+pygame.init()
+pygame.display.set_mode((400, 600))
+
+from agents.session import START, TICK_MS
+from agents.judgement import InputEvent
+from helper.settings import load_settings
+
+
+@pytest.fixture
+def settings():
+    """
+    The settings of the easy difficulty, which the test sessions are played at.
+    """
+    return load_settings("easy")
+
+
+@pytest.fixture
+def write_chart(tmp_path):
+    """
+    Fixture returning a function that writes the given lines to a chart file and returns its path.
+    """
+    def write(*lines):
+        chart_path = tmp_path / "test.chart"
+        chart_path.write_text("\n".join(lines) + "\n")
+        return str(chart_path)
+    return write
+
+
+@pytest.fixture
+def play():
+    """
+    Fixture returning a function that starts a session and plays it tick by tick, pressing the key of every player arrow on the tick it reaches its BW arrow, at the exact time it does.
+
+    The returned function takes the session, the number of ticks to play at most, an optional function deciding if an arrow is hit, and an optional function given a held hold note and the current timestamp deciding if its key is released. Hold notes are held until their tail reaches the BW arrow if no release function is given.
+    """
+    def play_session(session, max_ticks: int, hit = lambda arrow: True, release = None):
+        session.step(TICK_MS, [START])
+        for _ in range(max_ticks):
+            if session.game_over:
+                break
+            now = session.clock.get_ticks()
+            inputs = []
+            for lane in session.lanes:
+                arrow = lane.player_queue.head()
+                if arrow is not None and now < arrow.hit_time <= now + TICK_MS and hit(arrow):
+                    inputs.append(InputEvent(lane.name, arrow.hit_time))
+                if lane.player_hold is not None and release is not None and release(lane.player_hold, now):
+                    inputs.append(InputEvent(lane.release_action, now))
+            session.step(TICK_MS, inputs)
+        return session
+    return play_session
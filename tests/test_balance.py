@@ -0,0 +1,45 @@
+import pytest
+
+from agents.session import GameSession, START, TICK_MS
+from helper.settings import load_settings, load_profiles
+from helper.balance import cycle_schedule, simulate, summarise
+
+# number of player and enemy round pairs the timeline of a session is compared for
+CYCLES = 3
+
+
+@pytest.mark.parametrize("difficulty", list(load_profiles()))
+def test_cycle_schedule_matches_session(difficulty):
+    settings = load_settings(difficulty)
+    session = GameSession(seed=1, settings=settings)
+
+    # recording the time every arrow reaches its BW arrow, including the arrows sent out on the tick the game starts
+    hits = []
+    for game_master, is_player in ((session.player_game_master, True), (session.enemy_game_master, False)):
+        def record(choose_next_arrow = game_master.choose_next_arrow, is_player = is_player):
+            arrow = choose_next_arrow()
+            if arrow is not None:
+                hits.append((arrow.hit_time, is_player))
+            return arrow
+        game_master.choose_next_arrow = record
+
+    cycle_ms, events = cycle_schedule(settings)
+    session.step(TICK_MS, [START])
+    round_start = session.player_game_master.round_start
+
+    # keeping the hp of the player in the middle, so that the match goes on for every cycle whatever the enemy does
+    while session.clock.get_ticks() < round_start + CYCLES * cycle_ms:
+        session.player_healthbar.set_hp(settings.max_hp // 2)
+        session.step(TICK_MS)
+
+    schedule = [(round(cycle * cycle_ms + time, 6), is_player) for cycle in range(CYCLES) for time, is_player, _ in events]
+    played = sorted((round(time - round_start, 6), is_player) for time, is_player in hits)
+    assert played[:len(schedule)] == schedule
+
+
+def test_simulate_is_seeded():
+    settings = load_settings("easy")
+    first = summarise(simulate(settings, matches=2000, seed=3))
+    second = summarise(simulate(settings, matches=2000, seed=3))
+    assert first == second
+    assert first["win_rate"] + first["loss_rate"] + first["unfinished"] == pytest.approx(1)
@@ -0,0 +1,69 @@
+import pytest
+
+from agents.session import GameSession, TICK_MS
+from agents.lanes import HOLD_RELEASE_WINDOW
+from helper.chart import read_notes, NOTE_TIME_MAX
+from helper.note_store import NoteStore, PLAYER
+
+
+def test_hold_completed(settings, write_chart, play):
+    session = play(GameSession(seed=1, settings=settings, chart_path=write_chart("2000 left 1000")), 240)
+
+    # the key press and the completed hold are both judged perfect
+    assert session.judgements["perfect"] == 2 and session.judgements["miss"] == 0
+    assert session.notes.counts(PLAYER)["perfect"] == 1
+    assert session.lane_dict["left"].player_hold is None
+
+
+def test_hold_released_early(settings, write_chart, play):
+    session = play(GameSession(seed=1, settings=settings, chart_path=write_chart("2000 left 1000")), 240, release=lambda hold, now: now >= hold.hit_time + 300)
+
+    assert session.judgements["perfect"] == 1 and session.judgements["miss"] == 1
+    assert session.notes.counts(PLAYER)["miss"] == 1
+    assert session.lane_dict["left"].player_hold is None
+
+
+def test_hold_released_within_release_window(settings, write_chart, play):
+    session = play(GameSession(seed=1, settings=settings, chart_path=write_chart("2000 left 1000")), 240, release=lambda hold, now: now >= hold.hold_end - HOLD_RELEASE_WINDOW + TICK_MS)
+
+    assert session.judgements["perfect"] == 2 and session.judgements["miss"] == 0
+
+
+def test_next_note_pressed_while_holding(settings, write_chart, play):
+    # the key of the lane is pressed for the tap right as the hold ends, which completes the hold instead of being taken as a miss
+    session = play(GameSession(seed=1, settings=settings, chart_path=write_chart("2000 left 500", "2500 left")), 240)
+
+    assert session.judgements["perfect"] == 3 and session.judgements["miss"] == 0
+    assert session.notes.counts(PLAYER)["perfect"] == 2
+
+
+def test_enemy_hold_replaced(settings):
+    session = GameSession(seed=1, settings=settings)
+    lane = session.lanes[0]
+    first, second = (session.arrow_pool.acquire(False, arrow_dir=lane.name, image=lane.enemy_image, centerx=lane.centerx, spawn_time=spawn_time, hold=1000, size=lane.arrow_size) for spawn_time in (0, 100))
+    session.enemy_arrow_sprites.add(first, second)
+
+    session.hold_enemy_arrow(lane, first)
+    session.hold_enemy_arrow(lane, second)
+
+    # the earlier hold note is let go of, so it does not stay on screen without a lane holding it
+    assert lane.enemy_hold is second
+    assert not first.alive() and second.alive()
+
+
+def test_chart_accepts_note_at_hold_end(write_chart):
+    notes = list(read_notes(write_chart("1000 left 500", "1200 up", "1500 left"), ["left", "up"]))
+    assert [(note.time, note.lane, note.hold) for note in notes] == [(1000, "left", 500), (1200, "up", 0), (1500, "left", 0)]
+
+
+@pytest.mark.parametrize("lines, message", [
+    (("1000 left 500", "1200 left"), "line 2: note starts before the hold note on line 1 in lane 'left' has ended at 1500 ms"),
+    (("1000 left", "900 up"), "line 2: notes must be sorted by time"),
+    (("1000 jump",), "line 1: unknown lane 'jump'"),
+    ((f"{NOTE_TIME_MAX} left 1",), "line 1: time and hold cannot add up to more than"),
+    (("1000 left -5",), "line 1: time and hold cannot be negative"),
+    (("1000",), "line 1: expected"),
+])
+def test_chart_errors(write_chart, lines, message):
+    with pytest.raises(ValueError, match=message):
+        NoteStore.load(write_chart(*lines), ["left", "down", "up", "right"])
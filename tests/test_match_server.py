@@ -0,0 +1,132 @@
+import io
+import os
+import socket
+import pytest
+
+from agents.session import GameSession, START, TICK_MS, replay_match
+from helper.replay import ReplayHeader, INPUT_FORMAT, write_header
+from helper.match_server import MatchConnection, FRAME_FORMAT, NEW_MATCH, STEP, SNAPSHOT, ERROR, STEP_FORMAT, MAX_STEP_TICKS, send_message, receive_exactly, pack_snapshot, unpack_snapshot
+
+# directory of the charts of the game
+CHART_DIR = os.path.join(os.path.dirname(__file__), "..", "charts")
+
+
+@pytest.fixture
+def connection(tmp_path):
+    """
+    A MatchConnection serving one end of a socket pair, recording its match to match.kcr in the temporary directory. The other end is stored as its client attribute.
+    """
+    server_sock, client_sock = socket.socketpair()
+    connection = MatchConnection(server_sock, str(tmp_path / "match.kcr"), CHART_DIR)
+    connection.client = client_sock
+    yield connection
+    connection.close()
+    client_sock.close()
+
+
+def request(connection, message_type: int, payload: bytes = b""):
+    """
+    This function sends a message to a MatchConnection, lets it handle the message and returns the type and payload of its answer.
+    """
+    send_message(connection.client, message_type, payload)
+    assert connection.receive()
+    answer_type, length = FRAME_FORMAT.unpack(receive_exactly(connection.client, FRAME_FORMAT.size))
+    return answer_type, receive_exactly(connection.client, length)
+
+
+def header_payload(header: ReplayHeader):
+    """
+    This function packs a replay header into the payload of a NEW_MATCH message.
+    """
+    header_file = io.BytesIO()
+    write_header(header_file, header)
+    return header_file.getvalue()
+
+
+def step_payload(ticks: int, inputs = ()):
+    """
+    This function packs the payload of a STEP message from (tick, action index, timestamp) tuples.
+    """
+    return STEP_FORMAT.pack(ticks) + b"".join(INPUT_FORMAT.pack(*record) for record in inputs)
+
+
+def test_snapshot_round_trip(settings, play):
+    session = play(GameSession(seed=2, settings=settings), 400)
+    snapshot = unpack_snapshot(pack_snapshot(session))
+
+    assert (snapshot.tick, snapshot.time, snapshot.hp, snapshot.max_hp) == (session.tick_count, session.clock.get_ticks(), session.player_healthbar.hp, settings.max_hp)
+    assert (snapshot.game_over, snapshot.player_lost, snapshot.player_turn, snapshot.enemy_turn) == (session.game_over, session.player_lost, session.player_turn, session.enemy_turn)
+    assert snapshot.judgements == session.judgements
+    live = sorted((index, arrow.hit_time, arrow.hold) for index, lane in enumerate(session.lanes) for arrow in lane.player_queue.arrows if arrow.alive())
+    assert sorted(snapshot.arrows) == live
+
+
+def test_match_is_stepped_and_recorded(connection, settings, tmp_path):
+    answer_type, payload = request(connection, NEW_MATCH, header_payload(ReplayHeader(5, TICK_MS, 4, settings)))
+    assert answer_type == SNAPSHOT
+    assert unpack_snapshot(payload).tick == 0
+
+    # starting the game on the first tick, and pressing the key of every arrow on the tick it reaches its BW arrow
+    snapshot = unpack_snapshot(request(connection, STEP, step_payload(1, [(0, 0, TICK_MS)]))[1])
+    assert snapshot.player_turn
+    for _ in range(300):
+        inputs = [(0, lane_index + 1, hit_time) for lane_index, hit_time, hold in snapshot.arrows if snapshot.time < hit_time <= snapshot.time + TICK_MS]
+        snapshot = unpack_snapshot(request(connection, STEP, step_payload(1, inputs))[1])
+    assert snapshot.tick == 301
+    assert snapshot.judgements["perfect"] > 0 and snapshot.judgements["miss"] == 0
+
+    connection.session.close()
+    replayed = replay_match(str(tmp_path / "match.kcr"))
+    assert (replayed.tick_count, replayed.player_healthbar.hp, replayed.judgements) == (snapshot.tick, snapshot.hp, snapshot.judgements)
+
+
+def test_message_split_across_reads(connection, settings):
+    payload = header_payload(ReplayHeader(5, TICK_MS, 4, settings))
+    message = FRAME_FORMAT.pack(NEW_MATCH, len(payload)) + payload
+    connection.client.sendall(message[:7])
+    assert connection.receive()
+    assert connection.session is None
+
+    connection.client.sendall(message[7:])
+    assert connection.receive()
+    assert connection.session is not None
+    answer_type, _ = FRAME_FORMAT.unpack(receive_exactly(connection.client, FRAME_FORMAT.size))
+    assert answer_type == SNAPSHOT
+
+
+def test_step_before_start_is_an_error(connection):
+    answer_type, payload = request(connection, STEP, step_payload(1))
+    assert answer_type == ERROR
+    assert b"has not been started" in payload
+
+
+@pytest.mark.parametrize("lane_count", [0, 5, 255])
+def test_unsupported_lane_count_is_an_error(connection, settings, lane_count):
+    answer_type, payload = request(connection, NEW_MATCH, header_payload(ReplayHeader(5, TICK_MS, lane_count, settings)))
+    assert answer_type == ERROR
+    assert b"unsupported number of lanes" in payload
+    assert connection.session is None
+
+
+def test_step_tick_limit(connection, settings):
+    request(connection, NEW_MATCH, header_payload(ReplayHeader(5, TICK_MS, 4, settings)))
+    answer_type, payload = request(connection, STEP, step_payload(MAX_STEP_TICKS + 1))
+    assert answer_type == ERROR
+    assert connection.session.tick_count == 0
+
+    answer_type, payload = request(connection, STEP, step_payload(MAX_STEP_TICKS))
+    assert answer_type == SNAPSHOT
+    assert unpack_snapshot(payload).tick == MAX_STEP_TICKS
+
+
+def test_chart_inside_chart_dir(connection, settings):
+    answer_type, _ = request(connection, NEW_MATCH, header_payload(ReplayHeader(5, TICK_MS, 4, settings, "demo.chart")))
+    assert answer_type == SNAPSHOT
+    assert connection.session.notes is not None
+
+
+@pytest.mark.parametrize("chart_name", ["../requirements.txt", "/etc/passwd", "missing.chart"])
+def test_chart_outside_chart_dir_is_an_error(connection, settings, chart_name):
+    answer_type, payload = request(connection, NEW_MATCH, header_payload(ReplayHeader(5, TICK_MS, 4, settings, chart_name)))
+    assert answer_type == ERROR
+    assert b"unknown chart" in payload
@@ -0,0 +1,105 @@
+import io
+import os
+import random
+import dataclasses
+import pytest
+
+from agents.session import GameSession, START, replay_match
+from helper.replay import ReplayHeader, ReplayRecorder, INPUT_FORMAT, write_header, read_header, load_replay
+from helper.note_store import PLAYER
+
+# path to the demo chart of the game
+DEMO_CHART = os.path.join(os.path.dirname(__file__), "..", "charts", "demo.chart")
+
+
+def final_state(session):
+    """
+    The state of a session that a replay has to reproduce.
+    """
+    return (session.tick_count, session.clock.get_ticks(), session.player_healthbar.hp, session.judgements, session.game_over, session.player_lost)
+
+
+def test_header_round_trip(settings):
+    settings = dataclasses.replace(settings, arrow_speed=310.5, width=480, height=720)
+    header = ReplayHeader(2**64 - 1, 1000 / 60, 6, settings, "songs/demo.chart", 12.5, -3.25, True, 80, True)
+    header_file = io.BytesIO()
+    write_header(header_file, header)
+    header_file.seek(0)
+
+    read = read_header(header_file)
+    assert (read.seed, read.tick_ms, read.lane_count, read.chart_path, read.input_offset, read.spawn_offset, read.versus, read.rival_latency, read.song_sync) == (2**64 - 1, 1000 / 60, 6, "songs/demo.chart", 12.5, -3.25, True, 80, True)
+    assert read.settings == settings
+    assert read.difficulty == "easy"
+
+
+def test_header_rejects_other_files(settings):
+    header_file = io.BytesIO()
+    write_header(header_file, ReplayHeader(1, 1000 / 60, 4, settings))
+    data = bytearray(header_file.getvalue())
+    data[:4] = b"NOPE"
+
+    with pytest.raises(ValueError, match="is not a version"):
+        read_header(io.BytesIO(bytes(data)))
+
+
+def test_header_rejects_display_too_small(settings):
+    header_file = io.BytesIO()
+    write_header(header_file, ReplayHeader(1, 1000 / 60, 4, dataclasses.replace(settings, height=20)))
+    header_file.seek(0)
+
+    with pytest.raises(ValueError, match="too small"):
+        read_header(header_file)
+
+
+def test_recorder_rejects_unknown_action(tmp_path, settings):
+    recorder = ReplayRecorder(str(tmp_path / "match.kcr"), ReplayHeader(1, 1000 / 60, 4, settings), [START, "left"])
+    with pytest.raises(ValueError, match="unknown input action"):
+        recorder.record(1, [("jump", 0.0)])
+    recorder.close(1)
+
+
+@pytest.mark.parametrize("seed, hit_rate", [(1, 0.3), (2, 0.9)])
+def test_replay_reproduces_match(tmp_path, settings, play, seed, hit_rate):
+    replay_path = str(tmp_path / "match.kcr")
+    session = GameSession(seed=seed, settings=settings)
+    session.start_recording(replay_path)
+    rng = random.Random(seed)
+    play(session, 6000, hit=lambda arrow: rng.random() < hit_rate)
+    session.close()
+
+    assert final_state(replay_match(replay_path)) == final_state(session)
+
+
+def test_replay_reproduces_chart_match(tmp_path, settings, play):
+    replay_path = str(tmp_path / "match.kcr")
+    session = GameSession(seed=3, settings=settings, chart_path=DEMO_CHART)
+    session.start_recording(replay_path)
+    rng = random.Random(3)
+    play(session, 6000, hit=lambda arrow: rng.random() < 0.6)
+    session.close()
+
+    replayed = replay_match(replay_path)
+    assert final_state(replayed) == final_state(session)
+    assert replayed.notes.counts(PLAYER) == session.notes.counts(PLAYER)
+
+
+def test_session_is_deterministic(settings, play):
+    first = play(GameSession(seed=7, settings=settings), 3000)
+    second = play(GameSession(seed=7, settings=settings), 3000)
+    assert final_state(first) == final_state(second)
+
+
+def test_truncated_replay_stops_at_last_input(tmp_path, settings, play):
+    replay_path = tmp_path / "match.kcr"
+    session = GameSession(seed=4, settings=settings)
+    session.start_recording(str(replay_path))
+    play(session, 1200)
+    session.close()
+
+    # cutting the replay off in the middle of its last records, as if the game had crashed while writing it
+    header, records = load_replay(str(replay_path))
+    data = replay_path.read_bytes()
+    replay_path.write_bytes(data[:-INPUT_FORMAT.size - 5])
+
+    replayed = replay_match(str(replay_path))
+    assert replayed.tick_count == records[-3][0]
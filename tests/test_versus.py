@@ -0,0 +1,93 @@
+import threading
+import pytest
+
+from agents.session import GameSession, START, TICK_MS
+from helper.versus import DeltaEncoder, VersusHost, VersusGuest, TICK_FORMAT, SPAWN, SPAWN_FORMAT, KILL, KILL_FORMAT, HP, HP_FORMAT, FLASH, FLASH_FORMAT, STATE, STATE_FORMAT, ATTACK, ATTACK_FORMAT
+
+# format of every event of a DELTA message, by the code it starts with
+EVENT_FORMATS = {SPAWN: SPAWN_FORMAT, KILL: KILL_FORMAT, HP: HP_FORMAT, FLASH: FLASH_FORMAT, STATE: STATE_FORMAT, ATTACK: ATTACK_FORMAT}
+
+# milliseconds of the hold note of the test chart, which is longer than a 16 bit field can store
+LONG_HOLD = 70000
+
+
+def decode_events(payload: bytes):
+    """
+    This function splits the payload of a DELTA message into its tick and the tuples of its events.
+    """
+    (tick,) = TICK_FORMAT.unpack_from(payload)
+    events = []
+    offset = TICK_FORMAT.size
+    while offset < len(payload):
+        event_format = EVENT_FORMATS[payload[offset]]
+        events.append(event_format.unpack_from(payload, offset))
+        offset += event_format.size
+    return tick, events
+
+
+def test_spawn_keeps_long_hold(settings, write_chart):
+    session = GameSession(seed=1, settings=settings, chart_path=write_chart("2000 left", f"2500 down {LONG_HOLD}"))
+    encoder = DeltaEncoder(session)
+    session.step(TICK_MS, [START])
+
+    spawns = []
+    for _ in range(120):
+        session.step(TICK_MS)
+        tick, events = decode_events(encoder.encode())
+        assert tick == session.tick_count
+        spawns.extend(event for event in events if event[0] == SPAWN)
+
+    # every spawn event carries the owner and lane index of its arrow and its hold, with the spawn timestamp relative to its tick
+    lane_indexes = {lane.name: index for index, lane in enumerate(session.lanes)}
+    assert [(owner_lane, hold) for _, owner_lane, _, hold in spawns] == [(lane_indexes["left"], 0), (lane_indexes["down"], LONG_HOLD)]
+    arrows = sorted(session.player_arrow_sprites, key=lambda arrow: arrow.spawn_time)
+    assert arrows[1].hold == LONG_HOLD
+
+
+def test_unchanged_tick_only_sends_tick_count(settings):
+    session = GameSession(seed=1, settings=settings)
+    encoder = DeltaEncoder(session)
+    session.step(TICK_MS)
+    assert encoder.encode() == TICK_FORMAT.pack(session.tick_count)
+
+
+@pytest.fixture
+def versus_match(settings, write_chart):
+    """
+    A versus match played over the loopback interface: a VersusHost hosting a versus session of a chart with a long hold note, and the VersusGuest that has joined it.
+    """
+    session = GameSession(seed=1, settings=settings, chart_path=write_chart("2000 left", "2600 up", f"3000 down {LONG_HOLD}"), versus=True, rival_latency=100)
+    host = VersusHost(port=0)
+
+    # the guest waits for the header of the match while joining, so it joins from another thread
+    guests = []
+    joining = threading.Thread(target=lambda: guests.append(VersusGuest(f"127.0.0.1:{host.listener.getsockname()[1]}")))
+    joining.start()
+    assert host.wait_for_rival()
+    host.start(session)
+    joining.join(timeout=10)
+    guest, = guests
+
+    yield session, host, guest
+    guest.close()
+    host.close()
+    session.close()
+
+
+def test_guest_mirrors_host(versus_match):
+    session, host, guest = versus_match
+    session.step(TICK_MS, [START])
+
+    # playing until the first arrow has been missed and the others, including the hold note, are still on their way
+    for _ in range(150):
+        session.step(TICK_MS, host.poll(session))
+        guest.step()
+
+    assert guest.session.tick_count == session.tick_count
+    assert guest.session.player_healthbar.hp == session.player_healthbar.hp < session.settings.max_hp // 2
+    host_arrows = sorted((arrow.spawn_time, arrow.arrow_dir, arrow.hold) for arrow in session.player_arrow_sprites)
+    guest_arrows = sorted((arrow.spawn_time, arrow.arrow_dir, arrow.hold) for arrow in guest.session.player_arrow_sprites)
+    assert [(lane, hold) for _, lane, hold in guest_arrows] == [(lane, hold) for _, lane, hold in host_arrows] == [("up", 0), ("down", LONG_HOLD)]
+
+    # the spawn timestamps are sent relative to their tick as 32 bit floats
+    assert [spawn_time for spawn_time, _, _ in guest_arrows] == pytest.approx([spawn_time for spawn_time, _, _ in host_arrows], abs=1e-3)